@@ -0,0 +1,282 @@
+"""
+Adaptive fetch-tier escalation, learned per host.
+
+Scrapers used to hard-code one fetch method each, so a site that only needed
+a browser-like TLS fingerprint went through Scrappey on every request. fetch()
+instead tries the cheapest tier first and escalates on block signals:
+
+    plain     http_client.get (pooled requests.Session)
+    cffi      http_client.cffi_get (Chrome TLS impersonation)
+    scrappey  scrappey_client (proxy + captcha solving; costs credits)
+    browser   browser_pool (pooled undetected Chrome)
+
+A response counts as blocked on a 401/403/407/429/503, on a Cloudflare /
+captcha challenge page, on a near-empty body, or when the caller's accept()
+check rejects it (e.g. a JS-rendered page missing the element the scraper
+parses). Other HTTP errors (404, 500...) are real answers and are returned
+as a failure without escalating. An unverified Scrappey solution counts as
+a block. A tier that raises (timeout, connection reset) on a host's learned
+tier is retried TIER_ATTEMPTS times with backoff and then fails the fetch.
+While no tier is known to work for the host (first fetches, re-probes) an
+erroring tier is skipped for the next one instead, but a tier reached that
+way is never learned — only blocks move a host up.
+
+The cheapest tier that worked is stored per host in cache/fetch_tiers.sqlite3
+and used as the starting tier next time. Once a learned tier is older than
+REPROBE_SECONDS the next fetch starts from the bottom again, so a host that
+stops blocking drops back to the cheap tiers.
+
+    html = adaptive_fetch.fetch(url, headers=HEADERS, accept=lambda h: "articleBody" in h)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import http_client
+import scrappey_client
+
+TIERS = ("plain", "cffi", "scrappey", "browser")
+
+CACHE_DIR = Path(__file__).parent / "cache"
+TIERS_PATH = CACHE_DIR / "fetch_tiers.sqlite3"
+
+# How long a learned tier is trusted before cheaper tiers are re-probed
+REPROBE_SECONDS = int(os.getenv("FETCH_TIER_REPROBE_SECONDS", str(7 * 24 * 3600)))
+
+BLOCK_STATUSES = {401, 403, 407, 429, 503}
+CHALLENGE_MARKERS = (
+    "cf-browser-verification",
+    "challenge-platform",
+    "cf_chl_opt",
+    "<title>just a moment...</title>",
+    "attention required! | cloudflare",
+    "_incapsula_resource",
+    "px-captcha",
+    "g-recaptcha",
+    "h-captcha",
+    "captcha-delivery.com",
+)
+MIN_BODY_CHARS = 256
+# Attempts on a host's learned tier when the fetch itself errors
+TIER_ATTEMPTS = int(os.getenv("FETCH_TIER_ATTEMPTS", "3"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+
+DEFAULT_SCRAPPEY_OPTIONS = {
+    "premiumProxy": True,
+    "proxyCountry": "UnitedKingdom",
+    "automaticallySolveCaptcha": True,
+}
+
+_lock = threading.Lock()
+_learned = None  # {host: (tier, learned_at epoch seconds)}
+
+
+# ----------------------------------------------------------
+# Learned tiers (local SQLite)
+# ----------------------------------------------------------
+def _connect():
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(TIERS_PATH, timeout=30)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS host_tiers (
+            host        TEXT PRIMARY KEY,
+            tier        TEXT NOT NULL,
+            learned_at  REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _load():
+    global _learned
+    if _learned is None:
+        conn = _connect()
+        try:
+            rows = conn.execute("SELECT host, tier, learned_at FROM host_tiers").fetchall()
+        finally:
+            conn.close()
+        _learned = {host: (tier, learned_at) for host, tier, learned_at in rows if tier in TIERS}
+    return _learned
+
+
+def get_tier(host):
+    """Return (tier, learned_at) for a host, or (None, None) if not learned yet."""
+    with _lock:
+        return _load().get(host, (None, None))
+
+
+def _learn(host, tier):
+    learned_at = time.time()
+    with _lock:
+        previous = _load().get(host, (None, None))[0]
+        _learned[host] = (tier, learned_at)
+        conn = _connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO host_tiers (host, tier, learned_at) VALUES (?, ?, ?)
+                ON CONFLICT (host) DO UPDATE SET
+                    tier = excluded.tier,
+                    learned_at = excluded.learned_at
+                """,
+                (host, tier, learned_at),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    if previous != tier:
+        print(f"🪜 {host}: fetch tier {previous or 'unknown'} → {tier}")
+
+
+# ----------------------------------------------------------
+# Tiers — each returns (status code, body text, block reason or None)
+# ----------------------------------------------------------
+def _fetch_plain(url, headers, timeout, scrappey_options):
+    resp = http_client.get(url, headers=headers, proxies=http_client.get_proxies(), timeout=timeout)
+    return resp.status_code, resp.text, None
+
+
+def _fetch_cffi(url, headers, timeout, scrappey_options):
+    resp = http_client.cffi_get(url, headers=headers, proxies=http_client.get_proxies(), timeout=timeout)
+    return resp.status_code, resp.text, None
+
+
+def _fetch_scrappey(url, headers, timeout, scrappey_options):
+    payload = {"cmd": "request.get", "url": url, **scrappey_options}
+    data = scrappey_client.request(payload, timeout=max(timeout, 90))
+    solution = data.get("solution", {})
+    if data.get("data") == "error":
+        raise RuntimeError(data.get("error", "Unknown Scrappey error"))
+    status = solution.get("statusCode") or 200
+    text = solution.get("response") or ""
+    # An unverified solution means the challenge wasn't passed — a block
+    return status, text, None if solution.get("verified", False) else "Scrappey solution not verified"
+
+
+def _fetch_browser(url, headers, timeout, scrappey_options):
+    import browser_pool
+
+    return 200, browser_pool.get_page_source(url), None
+
+
+TIER_FETCHERS = {
+    "plain": _fetch_plain,
+    "cffi": _fetch_cffi,
+    "scrappey": _fetch_scrappey,
+    "browser": _fetch_browser,
+}
+
+
+def _fetch_with_retries(tier, url, headers, timeout, scrappey_options, attempts):
+    """
+    Fetch on one tier, retrying errors (timeouts, connection resets, failed
+    Scrappey calls) with backoff. Returns (status, text, block reason), or
+    None if every attempt raised.
+    """
+    for attempt in range(attempts):
+        try:
+            return TIER_FETCHERS[tier](url, headers, timeout, scrappey_options)
+        except Exception as e:
+            print(f"⚠️  {tier} fetch failed for {url} ({attempt + 1}/{attempts}): {e}")
+            if attempt < attempts - 1:
+                scrappey_client.backoff(attempt)
+    return None
+
+
+def _available(tier):
+    return tier != "scrappey" or bool(os.getenv("SCRAPPEY_API_KEY"))
+
+
+def block_reason(status, text, accept=None):
+    """Return why a response looks blocked, or None if it looks like real content."""
+    if status in BLOCK_STATUSES:
+        return f"HTTP {status}"
+    if status >= 400:
+        return None
+    body = (text or "").strip()
+    if len(body) < MIN_BODY_CHARS:
+        return "empty body"
+    head = body[:20000].lower()
+    for marker in CHALLENGE_MARKERS:
+        if marker in head:
+            return f"challenge page ({marker})"
+    if accept is not None and not accept(body):
+        return "expected content missing"
+    return None
+
+
+# ----------------------------------------------------------
+# Fetch
+# ----------------------------------------------------------
+def fetch(url, headers=None, accept=None, timeout=30, min_tier="plain", max_tier="browser", scrappey_options=None):
+    """
+    Fetch a page from the cheapest tier that isn't blocked, starting at the
+    host's learned tier (never below min_tier, for hosts known to reject
+    cheaper ones). Returns the body text, or None on failure.
+    """
+    host = urlparse(url).hostname or ""
+    headers = headers or DEFAULT_HEADERS
+    scrappey_options = {**DEFAULT_SCRAPPEY_OPTIONS, **(scrappey_options or {})}
+    first_tier = TIERS.index(min_tier)
+    last_tier = TIERS.index(max_tier)
+
+    learned, learned_at = get_tier(host)
+    reprobe = learned is not None and time.time() - learned_at >= REPROBE_SECONDS
+    start = first_tier if learned is None or reprobe else min(max(TIERS.index(learned), first_tier), last_tier)
+
+    # Probing: no tier is known to work for this host (or it is being
+    # re-checked), so a tier that errors is skipped rather than retried
+    probing = learned is None or reprobe
+    blocked = errored = False
+    for tier in TIERS[start:last_tier + 1]:
+        if not _available(tier):
+            continue
+        attempts = 1 if probing else TIER_ATTEMPTS
+        result = _fetch_with_retries(tier, url, headers, timeout, scrappey_options, attempts)
+        if result is None:
+            if probing:
+                print(f"⚠️  {tier} fetch failed for {url} — trying the next tier")
+                errored = True
+                continue
+            # The learned tier works for this host: an error there is transient
+            print(f"❌ {tier} fetch failed for {url} after {attempts} attempts")
+            return None
+        status, text, reason = result
+
+        reason = reason or block_reason(status, text, accept)
+        if reason:
+            print(f"⚠️  {tier} blocked for {url}: {reason}")
+            blocked = True
+            continue
+
+        if status >= 400:
+            print(f"❌ HTTP {status} for {url}")
+            return None
+
+        # A host only moves up after a real block; a re-probe can move it back
+        # down. Tiers reached by skipping errors are never learned, though a
+        # re-probe that ends on the learned tier still refreshes it.
+        if errored:
+            if reprobe and tier == learned:
+                _learn(host, tier)
+        elif (blocked or reprobe or learned is None) and (tier != learned or reprobe):
+            _learn(host, tier)
+        return text
+
+    print(f"❌ All fetch tiers failed for {url}")
+    return None
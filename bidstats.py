@@ -2,11 +2,12 @@ import os
 import time
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import scrappey_client
+import html_parse
 
 load_dotenv()
 
@@ -56,16 +57,12 @@ def current_month_label() -> str:
     return datetime.now().strftime("%B %Y")
 
 
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
-
-
 def scrappey_get(url: str) -> str:
     """
     Fetch a URL via Scrappey (JS-rendered).
     Falls back to plain requests if SCRAPPEY_API_KEY is not set.
     """
-    scrappey_key = os.getenv("SCRAPPEY_API_KEY")
-    if scrappey_key:
+    if os.getenv("SCRAPPEY_API_KEY"):
         payload = {
             "cmd": "request.get",
             #"requestType": "request",
@@ -74,15 +71,10 @@ def scrappey_get(url: str) -> str:
             "premiumProxy": True,
             "proxyCountry": "UnitedKingdom",
         }
-        resp = requests.post(
-            f"{SCRAPPEY_API_URL}?key={scrappey_key}",
-            json=payload,
-            timeout=120,
-        )
-        resp.raise_for_status()
-        return resp.json().get("solution", {}).get("response", "")
+        data = scrappey_client.request(payload, timeout=120)
+        return data.get("solution", {}).get("response", "")
     else:
-        r = requests.get(url, headers=HEADERS, timeout=30)
+        r = http_client.get(url, headers=HEADERS, timeout=30)
         r.raise_for_status()
         return r.text
 
@@ -99,7 +91,7 @@ def fetch_listing() -> list[tuple[str, str]]:
     try:
         time.sleep(1)
         html = scrappey_get(search_url)
-        soup = BeautifulSoup(html, "html.parser")
+        soup = html_parse.soup(html)
 
         batch = soup.select_one("div.nl-batch")
         if not batch:
@@ -149,10 +141,9 @@ def scrape_notice(url: str, fallback_title: str, max_retries: int = 3):
     """
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = html_parse.soup(resp.text)
 
             article = soup.select_one("article#view-notice")
             if not article:
@@ -195,7 +186,7 @@ def scrape_notice(url: str, fallback_title: str, max_retries: int = 3):
 def main():
     print("🔍 Fetching Bidstats landscape / grounds tenders...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
     seen_slugs = {url_slug(u) for u in known_urls}
@@ -1,11 +1,7 @@
 import os
-import time
-import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import (
@@ -14,6 +10,10 @@ from db import (
     is_subscription_active,
     update_latest_timestamp,
 )
+import http_cache
+import http_client
+import html_parse
+from sitemap_stream import iter_entries, iter_sitemap, response_stream
 
 load_dotenv()
 
@@ -32,6 +32,9 @@ ALLOWED_PREFIXES = (
 
 PROXIES = None
 
+# Pages are read up to this many bytes; anything past it is never downloaded
+MAX_DOC_BYTES = 2_000_000
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -42,9 +45,6 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-
-
 def parse_lastmod(lastmod_str: str) -> str:
     """Normalise lastmod to YYYY-MM-DDTHH:MM:SS (strip tz offset)."""
     s = lastmod_str.strip()
@@ -58,103 +58,116 @@ def parse_lastmod(lastmod_str: str) -> str:
     return s[:19]
 
 
-def fetch_sitemap_items() -> list[dict]:
+def fetch_sitemap_items(fetched: list | None = None, since: str | None = None) -> list[dict]:
     """
     Fetch BOEM sitemap (index or direct), filter by ALLOWED_PREFIXES,
-    return list of {url, lastmod}.
+    return list of {url, lastmod} newer than `since`.
+    Sitemaps are stream-parsed, so entries are filtered as they are read.
+    Child sitemaps are fetched conditionally; unchanged ones (304) contribute
+    no items. Each (url, response) that was downloaded is appended to
+    `fetched` so main() can save its validators once the run succeeds.
     """
     print(f"  📡 Fetching sitemap: {SITEMAP_URL}")
+    items = []
+    child_sitemaps = []
     try:
-        resp = requests.get(SITEMAP_URL, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(
+            SITEMAP_URL, headers=HEADERS, proxies=PROXIES, timeout=30, stream=True
+        )
         resp.raise_for_status()
-        root = ET.fromstring(resp.content)
+        with resp:
+            # The root is either a sitemap index or a single URL sitemap
+            for kind, loc, lastmod in iter_entries(response_stream(resp)):
+                if kind == "sitemap":
+                    child_sitemaps.append(loc)
+                else:
+                    item = _filter_entry(loc, lastmod, since)
+                    if item:
+                        items.append(item)
     except Exception as e:
         print(f"  ❌ Failed to fetch sitemap: {e}")
         return []
 
-    # Check if it's a sitemap index
-    child_sitemaps = root.findall(".//sm:sitemap/sm:loc", NS)
-    if not child_sitemaps:
-        child_sitemaps = root.findall(".//sitemap/loc")
-
-    if child_sitemaps:
-        # Sitemap index — fetch each child and aggregate
-        all_items = []
-        for loc_el in child_sitemaps:
-            child_url = loc_el.text.strip() if loc_el.text else ""
-            if not child_url:
-                continue
-            child_items = _parse_url_sitemap(child_url)
-            all_items.extend(child_items)
-        return all_items
-    else:
-        # Single sitemap
-        return _parse_url_sitemap_root(root)
+    # Sitemap index — fetch each child and aggregate
+    for child_url in child_sitemaps:
+        items.extend(_parse_url_sitemap(child_url, fetched, since))
+    return items
 
 
-def _parse_url_sitemap(sitemap_url: str) -> list[dict]:
-    """Fetch and parse a single URL sitemap, filtering by ALLOWED_PREFIXES."""
+def _parse_url_sitemap(
+    sitemap_url: str, fetched: list | None = None, since: str | None = None
+) -> list[dict]:
+    """Fetch and stream-parse a single URL sitemap, filtering by ALLOWED_PREFIXES."""
+    items = []
     try:
-        time.sleep(0.5)
-        resp = requests.get(sitemap_url, headers=HEADERS, proxies=PROXIES, timeout=30)
+        cache_headers = http_cache.validator_headers(SCRAPER_ID, sitemap_url)
+        resp = http_client.get(
+            sitemap_url,
+            headers={**HEADERS, **cache_headers},
+            proxies=PROXIES,
+            timeout=30,
+            stream=True,
+        )
         resp.raise_for_status()
-        root = ET.fromstring(resp.content)
+        with resp:
+            if http_cache.is_not_modified(resp):
+                print(f"  💤 Unchanged since last run: {sitemap_url}")
+                return []
+            for loc, lastmod in iter_sitemap(response_stream(resp)):
+                item = _filter_entry(loc, lastmod, since)
+                if item:
+                    items.append(item)
     except Exception as e:
         print(f"  ⚠️  Failed to fetch child sitemap {sitemap_url}: {e}")
         return []
-    return _parse_url_sitemap_root(root)
-
-
-def _parse_url_sitemap_root(root: ET.Element) -> list[dict]:
-    """Parse <url> entries from a sitemap XML root, filtering by ALLOWED_PREFIXES."""
-    items = []
-    url_els = root.findall(".//sm:url", NS)
-    if not url_els:
-        url_els = root.findall(".//url")
-
-    for url_el in url_els:
-        loc_el = url_el.find("sm:loc", NS)
-        if loc_el is None:
-            loc_el = url_el.find("loc")
-        lastmod_el = url_el.find("sm:lastmod", NS)
-        if lastmod_el is None:
-            lastmod_el = url_el.find("lastmod")
-
-        if loc_el is None or not loc_el.text:
-            continue
-
-        loc = loc_el.text.strip()
+    if fetched is not None:
+        fetched.append((sitemap_url, resp))
+    return items
 
-        # Extract path portion for prefix matching
-        path = loc.replace("https://www.boem.gov", "").replace("http://www.boem.gov", "")
-        if not any(path.startswith(prefix) for prefix in ALLOWED_PREFIXES):
-            continue
 
-        lastmod = ""
-        if lastmod_el is not None and lastmod_el.text:
-            lastmod = parse_lastmod(lastmod_el.text)
+def _filter_entry(loc: str, raw_lastmod: str | None, since: str | None) -> dict | None:
+    """
+    Return {url, lastmod} for a sitemap entry under ALLOWED_PREFIXES that is
+    newer than `since` (undated entries are kept), else None.
+    """
+    # Extract path portion for prefix matching
+    path = loc.replace("https://www.boem.gov", "").replace("http://www.boem.gov", "")
+    if not any(path.startswith(prefix) for prefix in ALLOWED_PREFIXES):
+        return None
 
-        items.append({"url": loc, "lastmod": lastmod})
+    lastmod = parse_lastmod(raw_lastmod) if raw_lastmod else ""
+    if since and lastmod and lastmod <= since:
+        return None
 
-    return items
+    return {"url": loc, "lastmod": lastmod}
 
 
-def scrape_article(url: str, lastmod: str) -> dict | None:
-    """Scrape a BOEM press release or state activity page."""
+def scrape_article(url: str, lastmod: str, fetched: list | None = None) -> dict | None:
+    """
+    Scrape a BOEM press release or state activity page. The page is fetched
+    conditionally; an unchanged page (304) returns None. Each downloaded
+    (url, response) is appended to `fetched` like the child sitemaps.
+    """
     try:
-        time.sleep(1)
-        resp = requests.get(
+        resp = http_client.get(
             url,
-            headers=HEADERS,
+            headers={**HEADERS, **http_cache.validator_headers(SCRAPER_ID, url)},
             proxies=PROXIES,
             timeout=30,
+            stream=True,
         )
         resp.raise_for_status()
     except Exception as e:
         print(f"  ❌ Failed to fetch {url}: {e}")
         return None
+    if http_cache.is_not_modified(resp):
+        resp.close()
+        print(f"  💤 Unchanged since last scrape: {url}")
+        return None
+    if fetched is not None:
+        fetched.append((url, resp))
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.parse(html_parse.read_capped(resp, MAX_DOC_BYTES))
 
     # Title
     title_el = soup.select_one("h1.page-title__text")
@@ -201,6 +214,12 @@ def scrape_article(url: str, lastmod: str) -> dict | None:
     }
 
 
+def _save_validators(fetched: list) -> None:
+    """Remember ETag / Last-Modified of the sitemaps and pages processed this run."""
+    for sitemap_url, resp in fetched:
+        http_cache.save_validators(SCRAPER_ID, sitemap_url, resp)
+
+
 def main():
     if not is_subscription_active(SCRAPER_ID, COMPANY_ID):
         print("⏭️  Skipping BOEM — subscription is inactive")
@@ -211,31 +230,25 @@ def main():
     latest_ts = get_latest_timestamp(SCRAPER_ID, COMPANY_ID)
     print(f"🕒 Latest saved timestamp: {latest_ts or 'none (first run)'}")
 
-    items = fetch_sitemap_items()
-    print(f"  📰 {len(items)} matching URL(s) found in sitemap.")
-    if not items:
-        print("⛔ No items found.")
-        return
-
-    # Filter: only items newer than latest timestamp
+    # Only items newer than latest timestamp — filtered while streaming
     latest_ts_clean = parse_lastmod(latest_ts) if latest_ts else None
-    new_items = []
-    for item in items:
-        if latest_ts_clean and item["lastmod"] and item["lastmod"] <= latest_ts_clean:
-            continue
-        new_items.append(item)
+    fetched_sitemaps = []
+    new_items = fetch_sitemap_items(fetched_sitemaps, since=latest_ts_clean)
+    print(f"  📰 {len(new_items)} matching URL(s) found in sitemap.")
 
     if not new_items:
         print("⛔ No new articles since last run.")
+        _save_validators(fetched_sitemaps)
         return
 
     print(f"  🆕 {len(new_items)} new article(s) to scrape.")
 
     articles = []
+    fetched_pages = []
 
     def scrape_one(item: dict):
         print(f"  Scraping: {item['url']}")
-        result = scrape_article(item["url"], item["lastmod"])
+        result = scrape_article(item["url"], item["lastmod"], fetched_pages)
         if result:
             print(f"  ✅ {result['title'][:70]}")
         return result
@@ -253,6 +266,7 @@ def main():
 
     inserted = insert_articles(articles)
     print(f"✅ Inserted {inserted} articles into database.")
+    _save_validators(fetched_pages)
 
     # Update timestamp to the newest lastmod seen
     newest_ts = max(
@@ -263,6 +277,8 @@ def main():
         update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_ts)
         print(f"🕒 Updated latest timestamp to: {newest_ts}")
 
+    _save_validators(fetched_sitemaps)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,122 @@
+"""
+Long-lived headless browser pool for SeleniumBase-backed scrapers.
+
+Starting an undetected Chrome costs several seconds and a few hundred MB,
+which used to dwarf the work a browser scraper did per run. This module
+keeps BROWSER_POOL_SIZE browsers alive for the life of the process (the
+scheduler in main.py owns them and shuts them down on exit) and leases
+them out one scraper call at a time:
+
+    html = browser_pool.get_page_source(url)
+    posts = browser_pool.get_json(url)
+
+    with browser_pool.lease() as driver:   # for multi-step interactions
+        driver.get(url)
+        ...
+
+A browser is recycled after BROWSER_MAX_USES leases, or straight away if
+the code holding the lease raises, so a crashed or wedged Chrome is never
+handed to the next scraper. seleniumbase is only imported when the first
+browser is started.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from rate_limiter import throttle
+import html_parse
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "50"))
+
+
+class _Slot:
+    """One pooled browser and how many leases it has served."""
+
+    def __init__(self):
+        self.driver = None
+        self.uses = 0
+
+
+_slots = queue.Queue()
+_all_slots = []
+_init_lock = threading.Lock()
+
+
+def _ensure_slots():
+    with _init_lock:
+        while len(_all_slots) < BROWSER_POOL_SIZE:
+            slot = _Slot()
+            _all_slots.append(slot)
+            _slots.put(slot)
+
+
+def _start_driver():
+    from seleniumbase import Driver
+
+    return Driver(uc=True, headless=True)
+
+
+def _retire(slot):
+    """Quit a slot's browser; the next lease starts a fresh one."""
+    driver, slot.driver, slot.uses = slot.driver, None, 0
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"⚠️  Failed to close pooled browser: {e}")
+
+
+@contextmanager
+def lease():
+    """Borrow a browser (blocks until one is free)."""
+    _ensure_slots()
+    slot = _slots.get()
+    try:
+        if slot.driver is None:
+            print("🌐 Starting pooled browser...")
+            slot.driver = _start_driver()
+        yield slot.driver
+        slot.uses += 1
+        if slot.uses >= BROWSER_MAX_USES:
+            _retire(slot)
+    except BaseException:
+        _retire(slot)
+        raise
+    finally:
+        _slots.put(slot)
+
+
+def get_page_source(url):
+    """Open a URL in a pooled browser and return the rendered page source."""
+    with lease() as driver:
+        throttle(url)
+        driver.get(url)
+        return driver.page_source
+
+
+def get_json(url):
+    """Open a JSON URL in a pooled browser and parse the body Chrome renders."""
+    page_text = get_page_source(url).strip()
+
+    # Chrome wraps raw JSON in <html><body><pre>
+    if page_text.startswith("<"):
+        pre_tag = html_parse.soup(page_text).find("pre")
+        if pre_tag:
+            page_text = pre_tag.get_text()
+
+    return json.loads(page_text)
+
+
+def shutdown():
+    """Quit every pooled browser (called by the scheduler on exit)."""
+    with _init_lock:
+        for slot in _all_slots:
+            _retire(slot)
+
+
+atexit.register(shutdown)
@@ -5,11 +5,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from calendar import monthrange
 
-from curl_cffi import requests as cffi_requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -47,8 +48,7 @@ def fetch_with_cffi(url, max_retries=MAX_RETRIES):
     proxies = get_proxies()
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 headers=HEADERS,
                 impersonate="chrome131",
@@ -119,7 +119,7 @@ def scrape_article(url):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     ld_data = None
     for script in soup.find_all("script", type="application/ld+json"):
@@ -252,7 +252,7 @@ def main():
                 company_articles.append(article)
 
         if company_articles:
-            inserted_count = insert_articles(company_articles)
+            inserted_count = insert_articles(company_articles, dedupe_near=True)
             print(f"✅ Inserted {inserted_count} articles for {label}")
 
         update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
@@ -4,11 +4,12 @@ import time
 from datetime import datetime
 
 import requests
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import adaptive_fetch
+import scrappey_client
+import html_parse
 
 load_dotenv()
 
@@ -70,7 +71,6 @@ COMPANY_CONFIGS = [
     },
 ]
 # "&language=en"
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 SCRAPPEY_PROXY_COUNTRY = "UnitedKingdom"
 
 HEADERS = {
@@ -88,8 +88,7 @@ HEADERS = {
 # Scrappey fetch (for listing pages — JS-rendered)
 # ----------------------------------------------------------
 def fetch_with_scrappey(url, max_retries=3):
-    scrappey_api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not scrappey_api_key:
+    if not os.getenv("SCRAPPEY_API_KEY"):
         raise RuntimeError("SCRAPPEY_API_KEY not set")
 
     payload = {
@@ -102,14 +101,7 @@ def fetch_with_scrappey(url, max_retries=3):
 
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = requests.post(
-                f"{SCRAPPEY_API_URL}?key={scrappey_api_key}",
-                json=payload,
-                timeout=90,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=90)
             solution = data.get("solution", {})
 
             status_code = solution.get("statusCode")
@@ -129,44 +121,25 @@ def fetch_with_scrappey(url, max_retries=3):
         except (requests.RequestException, RuntimeError) as e:
             if attempt < max_retries - 1:
                 print(f"⚠️  Retry {attempt + 1}/{max_retries}: {e}")
-                time.sleep(2)
+                scrappey_client.backoff(attempt)
             else:
                 print(f"❌ Failed after {max_retries} attempts: {e}")
                 return None
 
 
 # ----------------------------------------------------------
-# curl_cffi fetch with proxy (for individual article pages)
+# Article pages — cheapest fetch tier that gets through
 # ----------------------------------------------------------
-def fetch_url(url, max_retries=3):
-    proxy = os.getenv("SCRAPER_PROXY")
-    proxies = {"http": proxy, "https": proxy} if proxy else None
-    for attempt in range(max_retries):
-        try:
-            time.sleep(1)
-            resp = cffi_requests.get(
-                url,
-                headers=HEADERS,
-                proxies=proxies,
-                impersonate="chrome131",
-                timeout=30,
-            )
-            resp.raise_for_status()
-            return resp.text
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️  Retry {attempt + 1}/{max_retries}: {e}")
-                time.sleep(2)
-            else:
-                print(f"❌ Failed after {max_retries} attempts: {e}")
-                return None
+def fetch_url(url):
+    # The host rejects non-browser TLS, so plain requests are never tried
+    return adaptive_fetch.fetch(url, headers=HEADERS, accept=lambda html: "bw-release" in html, min_tier="cffi")
 
 
 # ----------------------------------------------------------
 # Parse listing page → list of (full_url, title, date_str)
 # ----------------------------------------------------------
 def parse_listing_html(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     results = []
     seen = set()
 
@@ -229,7 +202,7 @@ def scrape_article(url, fallback_title=""):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title — try <h1>, fall back to og:title, then listing title
     h1 = soup.select_one("h1")
@@ -303,7 +276,7 @@ def run_for_company(config: dict):
     print(f"🏢 Running for: {label}")
     print(f"{'='*60}")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
@@ -352,7 +325,7 @@ def run_for_company(config: dict):
     print(f"\n🆕 Found {len(scraped)} new article(s) in total.")
 
     articles = [{**a, "company_id": company_id} for a in scraped]
-    inserted_count = insert_articles(articles)
+    inserted_count = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted_count} articles for {label}")
 
 
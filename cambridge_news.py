@@ -1,13 +1,14 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import requests
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import scrappey_client
+import html_parse
 
 
 load_dotenv()
@@ -17,7 +18,7 @@ SCRAPER_ID = 28
 COMPANY_ID = os.getenv("PLEA_COMPANY_ID")
 
 API_URL = "https://api.mantis-intelligence.com/reach/search"
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
+MAX_WORKERS = 5
 
 KEYWORDS = [
     "planning permission",
@@ -83,7 +84,7 @@ def fetch_keyword_results(keyword: str) -> tuple[int, list[dict]]:
         "indexAlias": "12-months",
     }
     try:
-        resp = requests.get(
+        resp = http_client.get(
             API_URL,
             params=params,
             headers={**HEADERS, "Accept": "application/json"},
@@ -101,8 +102,7 @@ def fetch_keyword_results(keyword: str) -> tuple[int, list[dict]]:
 
 def scrape_article(url: str, max_retries: int = 3):
     """Scrape body text from a cambridge-news.co.uk article page via Scrappey."""
-    api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not api_key:
+    if not os.getenv("SCRAPPEY_API_KEY"):
         raise RuntimeError("SCRAPPEY_API_KEY not set")
 
     payload = {
@@ -117,19 +117,12 @@ def scrape_article(url: str, max_retries: int = 3):
 
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.post(
-                f"{SCRAPPEY_API_URL}?key={api_key}",
-                json=payload,
-                timeout=90,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=90)
             html = data.get("solution", {}).get("response", "")
             if not html:
                 raise RuntimeError("Empty Scrappey response")
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = html_parse.soup(html)
 
             # Selecting only content paragraphs naturally excludes all ad boxes
             paragraphs = soup.find_all(
@@ -153,7 +146,7 @@ def scrape_article(url: str, max_retries: int = 3):
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"  ⚠️  Retry {attempt + 1}/{max_retries} for {url}: {e}")
-                time.sleep(2)
+                scrappey_client.backoff(attempt)
             else:
                 print(f"  ❌ Failed to scrape {url}: {e}")
                 return None
@@ -162,7 +155,7 @@ def scrape_article(url: str, max_retries: int = 3):
 def main():
     print("🔍 Fetching Cambridge News articles...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
     seen_urls = set(known_urls)
@@ -195,10 +188,16 @@ def main():
 
     print(f"  🆕 {len(new_articles_meta)} new article(s) to scrape.")
 
-    articles = []
-    for full_url, meta in new_articles_meta.items():
+    def scrape_one(full_url):
         print(f"  Scraping: {full_url}")
-        body = scrape_article(full_url)
+        return scrape_article(full_url)
+
+    # Scrappey calls dominate the run; the shared client caps concurrency
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        bodies = list(executor.map(scrape_one, new_articles_meta))
+
+    articles = []
+    for (full_url, meta), body in zip(new_articles_meta.items(), bodies):
         if body is None:
             continue
         articles.append({
@@ -216,7 +215,7 @@ def main():
         return
 
     print(f"\n🆕 Found {len(articles)} new article(s) in total.")
-    inserted_count = insert_articles(articles)
+    inserted_count = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted_count} articles into database")
 
 
@@ -2,11 +2,11 @@ import os
 import time
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -74,8 +74,7 @@ def fetch_region_entries(cc):
         f"press-release_search_results?filteryear={current_year}"
     )
     try:
-        time.sleep(1)
-        resp = requests.get(
+        resp = http_client.get(
             url,
             headers={**HEADERS, "referer": f"https://www.capgemini.com/{cc}/news/press-releases/"},
             timeout=30,
@@ -103,10 +102,9 @@ def scrape_article_body(url, max_retries=3):
     """Scrape body text from a Capgemini article page."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = html_parse.soup(resp.text)
 
             for tag in soup.select("script, style, iframe"):
                 tag.decompose()
@@ -177,7 +175,7 @@ def fetch_region(label, cc, known_urls, seen_slugs):
 def main():
     print("🔍 Fetching Capgemini press releases (all regions)...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
     seen_slugs = {url_slug(u) for u in known_urls}
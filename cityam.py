@@ -4,9 +4,6 @@ import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
-from curl_cffi import requests as cffi_requests
 from dotenv import load_dotenv
 
 from db import (
@@ -15,6 +12,8 @@ from db import (
     is_subscription_active,
     update_latest_timestamp,
 )
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -60,7 +59,7 @@ def fetch_sitemap() -> list[dict]:
     """Fetch the sitemap index, pick the latest daily sitemap URL, and return [{url, lastmod}]."""
     print(f"  📅 Fetching sitemap index: {SITEMAP_INDEX}")
     try:
-        resp = requests.get(SITEMAP_INDEX, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(SITEMAP_INDEX, headers=HEADERS, proxies=PROXIES, timeout=30)
         resp.raise_for_status()
         root = ET.fromstring(resp.content)
         locs = []
@@ -83,7 +82,7 @@ def fetch_sitemap() -> list[dict]:
         return []
 
     try:
-        resp = requests.get(daily_url, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(daily_url, headers=HEADERS, proxies=PROXIES, timeout=30)
         resp.raise_for_status()
         root = ET.fromstring(resp.content)
         items = []
@@ -116,8 +115,7 @@ def scrape_article(url: str, max_retries: int = 3) -> dict | None:
     """Scrape a single City AM article. Returns {title, date, text} or None."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 impersonate="chrome131",
                 proxies=PROXIES,
@@ -125,7 +123,7 @@ def scrape_article(url: str, max_retries: int = 3) -> dict | None:
             )
             resp.raise_for_status()
             html = resp.text
-            soup = BeautifulSoup(html, "html.parser")
+            soup = html_parse.soup(html)
 
             # Title
             title_el = soup.select_one("h1.article-header__title")
@@ -239,7 +237,7 @@ def main():
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted = insert_articles(articles)
+    inserted = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted} articles into database.")
 
     # Update the stored timestamp to the newest lastmod seen
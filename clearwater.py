@@ -3,11 +3,11 @@ import time
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -47,8 +47,7 @@ def fetch_with_cffi(url, max_retries=MAX_RETRIES):
     proxies = get_proxies()
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 headers=HEADERS,
                 impersonate="chrome131",
@@ -68,7 +67,7 @@ def fetch_with_cffi(url, max_retries=MAX_RETRIES):
 
 def parse_news_listing(html):
     """Extract article links and titles from the news listing page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     items = []
     seen = set()
 
@@ -86,7 +85,7 @@ def parse_news_listing(html):
 
 def parse_transactions_listing(html):
     """Extract transaction links and titles from the transactions listing page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     items = []
     seen = set()
 
@@ -108,7 +107,7 @@ def scrape_article(url, title):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Date from meta tag
     date = ""
@@ -164,7 +163,7 @@ def scrape_transaction(url, title):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Date from meta tag (transactions may not have one)
     date = ""
@@ -237,7 +236,7 @@ def url_slug(url):
 def main():
     print("🔍 Fetching Clearwater listings...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
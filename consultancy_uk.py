@@ -3,10 +3,11 @@ import time
 from datetime import datetime
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -36,8 +37,7 @@ HEADERS = {
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            response = requests.get(url, headers=HEADERS, timeout=30)
+            response = http_client.get(url, headers=HEADERS, timeout=30)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -65,7 +65,7 @@ def get_article_links():
     if not html:
         raise Exception("Failed to fetch news page.")
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     links = []
     for a in soup.select(".news-grid .news-item-info > a"):
         href = a.get("href", "").strip()
@@ -88,7 +88,7 @@ def scrape_article(url):
         print(f"❌ Failed to fetch {url}")
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     for tag in soup.select("script, style, iframe"):
         tag.decompose()
@@ -147,7 +147,7 @@ def main():
     print(f"📰 Found {len(article_links)} article links on page.")
 
     # Fetch last 32 known URLs from DB for this scraper (one query)
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=32)
+    known_urls = get_known_article_urls(SCRAPER_ID)
 
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
@@ -185,5 +185,5 @@ def main():
         print(f"{'='*60}")
 
         company_articles = [dict(a, company_id=company_id) for a in scraped]
-        inserted_count = insert_articles(company_articles)
+        inserted_count = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted_count} articles for {label}")
\ No newline at end of file
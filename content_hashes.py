@@ -0,0 +1,136 @@
+"""
+Local content fingerprints for stored articles.
+
+Sitemap-driven scrapers treat every lastmod bump as a new article: the page
+is re-fetched, re-parsed and sent to insert_articles(), where the URL dedup
+then drops it. This module remembers a hash of the normalised title + text
+of every (company_id, url) written, so the pipeline can tell an unchanged
+page apart from a real change:
+
+  - db.insert_articles() drops articles whose fingerprint matches the one
+    stored for that company and URL, and records the fingerprints of what
+    it writes
+  - scrapers can skip the page fetch as well by sending the page's stored
+    validators (http_cache.validator_headers) and treating a 304 as
+    unchanged; validators are saved only after the insert succeeds
+
+This module only touches the local file; the Supabase side lives in db.py.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+STORE_PATH = CACHE_DIR / "content_hashes.sqlite3"
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH, timeout=30)
+    if not _initialized:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content_hashes (
+                company_id   TEXT NOT NULL,
+                url          TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at   TEXT NOT NULL,
+                PRIMARY KEY (company_id, url)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def normalize(text):
+    """Casefold and collapse whitespace so cosmetic markup changes don't count."""
+    return " ".join((text or "").split()).casefold()
+
+
+def fingerprint(article):
+    """Hash of an article's normalised title and text."""
+    body = normalize(article.get("title")) + "\n" + normalize(article.get("text"))
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _stored_hashes(keys):
+    with _lock:
+        conn = _connect()
+        try:
+            stored = {}
+            for company_id, url in keys:
+                row = conn.execute(
+                    "SELECT content_hash FROM content_hashes WHERE company_id = ? AND url = ?",
+                    (company_id, url),
+                ).fetchone()
+                if row:
+                    stored[(company_id, url)] = row[0]
+        finally:
+            conn.close()
+    return stored
+
+
+def filter_changed(articles):
+    """
+    Return the articles (dicts with company_id, url, title, text) that are
+    new or whose content differs from what was last stored for that company.
+    If the store can't be read every article is returned.
+    """
+    if not articles:
+        return []
+
+    keys = {(str(a["company_id"]), a["url"]) for a in articles}
+    try:
+        stored = _stored_hashes(keys)
+    except sqlite3.Error as e:
+        print(f"⚠️  Content hash read failed: {e}")
+        return list(articles)
+
+    changed = [
+        a for a in articles
+        if stored.get((str(a["company_id"]), a["url"])) != fingerprint(a)
+    ]
+    skipped = len(articles) - len(changed)
+    if skipped:
+        print(f"♻️  Skipped {skipped} unchanged article(s)")
+    return changed
+
+
+def record(articles):
+    """Store the fingerprints of articles that were written to the DB."""
+    rows = [
+        (str(a["company_id"]), a["url"], fingerprint(a), datetime.utcnow().isoformat())
+        for a in articles
+        if a.get("url")
+    ]
+    if not rows:
+        return
+
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO content_hashes (company_id, url, content_hash, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (company_id, url) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        updated_at = excluded.updated_at
+                    """,
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Content hash write failed: {e}")
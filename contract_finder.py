@@ -1,22 +1,34 @@
+import io
 import time
 import os
+import re
 import requests
-from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import routing
+import html_parse
+from sitemap_stream import response_stream
 
 BASE_URL = "https://www.contractsfinder.service.gov.uk"
 SEARCH_URL = f"{BASE_URL}/Search/Results"
 SOURCE_NAME = "CONTRACT_FINDER"
 SCRAPER_ID = 2
 
+# "union": one broad search per search profile, routed to companies locally
+# "per_company": the original full search flow for each company config
+SEARCH_MODE = os.getenv("CONTRACT_FINDER_MODE", "union")
+
 # ----------------------------------------------------------
-# Company configs — each runs a separate search with its own
-# CPV codes, keywords, min value, and company_id.
+# Company configs — CPV codes, keywords, min value, and company_id.
+# In union mode configs that share notice types / regions share one
+# search; keywords, CPV codes and value_low are then applied locally.
 # ----------------------------------------------------------
 DEFAULT_NOTICE_TYPES = ["awarded", "open", "public_notice", "supplychain_notice"]
 
+# Checkboxes that narrow a search (SME suitability) rather than widen it
+NARROWING_NOTICE_TYPES = {"organisation_sme", "supplier_sme"}
+
 COMPANY_CONFIGS = [
     {
         "label": "Solo Search (Digital Health / IT)",
@@ -136,16 +148,13 @@ def get_form_token(session: requests.Session) -> str:
     r = session.get(SEARCH_URL, headers=HEADERS, timeout=200)
     r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    token = soup.find("input", {"name": "form_token"})
+    token = html_parse.parse(r.text).select_one('input[name="form_token"]')
     if not token:
         raise RuntimeError("form_token not found")
 
     return token["value"]
 def extract_sort_token(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-
-    token = soup.find("input", {"name": "form_token"})
+    token = html_parse.parse(html).select_one('input[name="form_token"]')
     if not token:
         raise RuntimeError("Sort form_token not found")
 
@@ -257,7 +266,11 @@ def submit_sort(session: requests.Session, sort_token: str) -> str:
 
     r.raise_for_status()
     return r.text
-def download_xml(session: requests.Session, filename="contracts_finder_results.xml"):
+def download_xml(session: requests.Session):
+    """
+    Start the XML export download and return (response, stream). The body is
+    read incrementally by iter_contracts(); close the response when done.
+    """
     xml_url = f"{BASE_URL}/Search/GetXmlFile"
 
     headers = {
@@ -266,174 +279,201 @@ def download_xml(session: requests.Session, filename="contracts_finder_results.x
         "referer": SEARCH_URL,
     }
 
-    r = session.get(xml_url, headers=headers, timeout=200)
+    r = session.get(xml_url, headers=headers, timeout=200, stream=True)
     r.raise_for_status()
 
-    if not r.text.strip().startswith("<?xml"):
+    stream = io.BufferedReader(response_stream(r))
+    if not stream.peek(64).lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<?xml"):
+        r.close()
         raise RuntimeError("Did not receive XML content")
 
-    print("📄 XML downloaded")
-    return r.text
+    print("📄 XML download started")
+    return r, stream
 
 
-def parse_xml_and_extract_contracts(xml_content):
+CPV_CODE_RE = re.compile(r"\b\d{8}\b")
+XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+
+
+def _to_number(value):
+    try:
+        return float(str(value).replace(",", "").replace("£", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_nil(element) -> bool:
+    return element.get(XSI_NIL) == "true"
+
+
+def _leaf_text(element) -> str:
+    return element.text.strip() if element.text else ""
+
+
+def _child_groups(element):
     """
-    Parse XML content and extract contract information dynamically.
-    Captures all fields without hardcoding specific field names.
-    Returns a list of contract dictionaries with all required fields.
+    Group an element's non-nil children by tag, in order of each tag's first
+    non-nil occurrence. A tag that occurs again after that renders as a list.
+    Returns [(tag, [children], is_list)].
     """
-    root = ET.fromstring(xml_content)
-    contracts = []
-    
-    def element_to_dict(element, skip_nil=True):
-        """
-        Recursively convert XML element to dictionary.
-        Captures all fields dynamically.
-        """
-        result = {}
-        
-        # Check if element is nil
-        if skip_nil and element.get('{http://www.w3.org/2001/XMLSchema-instance}nil') == 'true':
-            return None
-        
-        # If element has no children, return its text
-        if len(element) == 0:
-            return element.text.strip() if element.text else ""
-        
-        # Process all child elements
-        for child in element:
-            tag = child.tag
-            value = element_to_dict(child, skip_nil)
-            
-            # Handle multiple children with same tag (like CPV codes)
-            if tag in result:
-                # Convert to list if not already
-                if not isinstance(result[tag], list):
-                    result[tag] = [result[tag]]
-                if value is not None:
-                    result[tag].append(value)
-            else:
-                if value is not None:
-                    result[tag] = value
-        
-        return result
-    
-    def dict_to_text(data, indent=0, parent_key=""):
-        """
-        Convert dictionary to formatted text with proper indentation.
-        """
+    groups = {}
+    for child in element:
+        group = groups.get(child.tag)
+        if group is None:
+            if not _is_nil(child):
+                groups[child.tag] = [[child], False]
+            continue
+        group[1] = True
+        if not _is_nil(child):
+            group[0].append(child)
+    return [(tag, children, is_list) for tag, (children, is_list) in groups.items()]
+
+
+def render_element(element, indent=0, lines=None):
+    """
+    Render an element's children as indented "key: value" lines, straight
+    from the tree (repeated tags become numbered / bulleted lists, nil
+    elements are skipped).
+    """
+    if lines is None:
         lines = []
-        indent_str = "  " * indent
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, dict):
-                    lines.append(f"{indent_str}{key}:")
-                    lines.extend(dict_to_text(value, indent + 1, key))
-                elif isinstance(value, list):
-                    lines.append(f"{indent_str}{key}:")
-                    for i, item in enumerate(value):
-                        if isinstance(item, dict):
-                            lines.append(f"{indent_str}  [{i+1}]:")
-                            lines.extend(dict_to_text(item, indent + 2, key))
-                        else:
-                            lines.append(f"{indent_str}  - {item}")
-                else:
-                    lines.append(f"{indent_str}{key}: {value}")
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                if isinstance(item, dict):
-                    lines.append(f"{indent_str}[{i+1}]:")
-                    lines.extend(dict_to_text(item, indent + 1, parent_key))
-                else:
-                    lines.append(f"{indent_str}- {item}")
-        else:
-            lines.append(f"{indent_str}{data}")
-        
-        return lines
-    
-    for full_notice in root.findall('FullNotice'):
+    indent_str = "  " * indent
+
+    for tag, children, is_list in _child_groups(element):
+        if not is_list:
+            child = children[0]
+            if len(child):
+                lines.append(f"{indent_str}{tag}:")
+                render_element(child, indent + 1, lines)
+            else:
+                lines.append(f"{indent_str}{tag}: {_leaf_text(child)}")
+            continue
+
+        lines.append(f"{indent_str}{tag}:")
+        for i, child in enumerate(children):
+            if len(child):
+                lines.append(f"{indent_str}  [{i+1}]:")
+                render_element(child, indent + 2, lines)
+            else:
+                lines.append(f"{indent_str}  - {_leaf_text(child)}")
+
+    return lines
+
+
+def _notice_field(notice, tag):
+    """Text of a leaf child of Notice, or None if missing / nil."""
+    if notice is None:
+        return None
+    child = notice.find(tag)
+    if child is None or _is_nil(child):
+        return None
+    return _leaf_text(child)
+
+
+def contract_from_notice(full_notice):
+    """Build a contract dict from one FullNotice element, or None to skip it."""
+    if _is_nil(full_notice) or not len(full_notice):
+        return None
+
+    # Extract key fields for database (with fallbacks)
+    notice = full_notice.find("Notice")
+    if notice is not None and (_is_nil(notice) or not len(notice)):
+        notice = None
+
+    notice_id = _notice_field(notice, "Id") or ""
+    title = _notice_field(notice, "Title") or ""
+    published_date = _notice_field(notice, "PublishedDate") or ""
+    # Strip Z / timezone offset to get plain ISO datetime
+    published_date = published_date[:19] if published_date else ""
+    last_update = _notice_field(notice, "LastNotifiableUpdate")
+    if last_update is None:
+        last_update = published_date
+    last_update = last_update[:19] if last_update else ""
+
+    if not notice_id or not title:
+        return None
+
+    # Build comprehensive text field with ALL data
+    text_parts = [
+        f"TITLE: {title}",
+        "",
+        "=" * 80,
+        "COMPLETE NOTICE DETAILS",
+        "=" * 80,
+        "",
+    ]
+    render_element(full_notice, 0, text_parts)
+
+    # Fields used by union mode to route the notice to companies
+    cpv_codes = set()
+    values = []
+    for child in notice:
+        if "cpv" in child.tag.lower():
+            cpv_codes.update(CPV_CODE_RE.findall(" ".join(child.itertext())))
+        elif child.tag in ("ValueLow", "ValueHigh") and not _is_nil(child):
+            value = _to_number(_leaf_text(child))
+            if value is not None:
+                values.append(value)
+
+    return {
+        "url": f"{BASE_URL}/Notice/{notice_id}",
+        "date": published_date,
+        "title": title,
+        "text": "\n".join(text_parts),
+        "lastmod": last_update or published_date,
+        "company_id": None,  # set per company before insert
+        "scraper_id": SCRAPER_ID,
+        "match_text": f"{title}\n{_notice_field(notice, 'Description') or ''}",
+        "cpv_codes": cpv_codes,
+        "value": max(values) if values else None,
+    }
+
+
+def iter_contracts_xml(stream):
+    """
+    Stream FullNotice elements from the export and yield one contract dict
+    at a time. Each notice is cleared once rendered, so memory stays flat
+    however many notices the export holds.
+    """
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        # Only direct children of the root are notices
+        if depth != 1 or elem.tag != "FullNotice":
+            continue
+
         try:
-            # Convert entire FullNotice to dictionary
-            notice_data = element_to_dict(full_notice)
-            
-            if not notice_data:
-                continue
-            
-            # Extract key fields for database (with fallbacks)
-            notice = notice_data.get('Notice', {})
-            
-            notice_id = notice.get('Id', '')
-            title = notice.get('Title', '')
-            published_date = notice.get('PublishedDate', '')
-            # Strip Z / timezone offset to get plain ISO datetime
-            published_date = published_date[:19] if published_date else ''
-            last_update = notice.get('LastNotifiableUpdate', published_date)
-            last_update = last_update[:19] if last_update else ''
-            
-            if not notice_id or not title:
-                continue
-            
-            # Build comprehensive text field with ALL data
-            text_parts = []
-            
-            # Start with title
-            text_parts.append(f"TITLE: {title}")
-            text_parts.append("")
-            text_parts.append("=" * 80)
-            text_parts.append("COMPLETE NOTICE DETAILS")
-            text_parts.append("=" * 80)
-            text_parts.append("")
-            
-            # Add all notice data dynamically
-            text_parts.extend(dict_to_text(notice_data))
-            
-            # Create contract URL
-            contract_url = f"{BASE_URL}/Notice/{notice_id}"
-            
-            # Create contract dictionary
-            contract = {
-                "url": contract_url,
-                "date": published_date,
-                "title": title,
-                "text": "\n".join(text_parts),
-                "lastmod": last_update or published_date,
-                "company_id": None,  # set per-run by run_for_company()
-                "scraper_id": SCRAPER_ID
-            }
-            
-            contracts.append(contract)
-            
+            contract = contract_from_notice(elem)
+            if contract:
+                yield contract
         except Exception as e:
             print(f"Error parsing contract: {e}")
             import traceback
             traceback.print_exc()
-            continue
-    
-    return contracts
+        finally:
+            elem.clear()
+            root.clear()
 
 
-def run_for_company(config: dict):
-    """Run the full contract-finder flow for a single company config."""
-    company_id = config["company_id"]
-    label = config["label"]
-
-    if not is_subscription_active(SCRAPER_ID, company_id):
-        print(f"\n⏭️  Skipping {label} — subscription is inactive")
-        return
-
-    keywords = config["keywords"]
-    cpv_codes = config["cpv_codes"]
-    value_low = config["value_low"]
-    notice_types = config.get("notice_types", DEFAULT_NOTICE_TYPES)
-    regions = config.get("regions")
-
-    print(f"\n{'='*60}")
-    print(f"🏢 Running for: {label}")
-    print(f"{'='*60}")
+def parse_xml_and_extract_contracts(xml_content):
+    """Parse an export held in memory (str or bytes) into a list of contracts."""
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode("utf-8")
+    return list(iter_contracts_xml(io.BytesIO(xml_content)))
 
-    saved_timestamp = get_latest_timestamp(SCRAPER_ID, company_id)
 
+def iter_contracts(keywords: str, cpv_codes: list, value_low: str, notice_types: list = None, regions: list = None):
+    """
+    Run one full portal search (token → search → sort → XML) and yield the
+    notices as they are parsed from the streamed export.
+    """
     session = requests.Session()
 
     time.sleep(2)
@@ -459,23 +499,27 @@ def run_for_company(config: dict):
 
     time.sleep(2)
     print("Step 5: Download XML")
-    xml_filename = f"contracts_finder_{company_id[:8]}.xml"
-    xml_content = download_xml(session, xml_filename)
+    response, stream = download_xml(session)
 
     print("Step 6: Parsing XML and extracting contracts")
-    contracts = parse_xml_and_extract_contracts(xml_content)
+    try:
+        yield from iter_contracts_xml(stream)
+    finally:
+        response.close()
+
 
-    # Stamp each contract with this company's id
-    for c in contracts:
-        c["company_id"] = company_id
+def save_for_company(config: dict, contracts: list):
+    """Apply the timestamp flow for one company to its contracts."""
+    company_id = config["company_id"]
+    saved_timestamp = get_latest_timestamp(SCRAPER_ID, company_id)
 
     if not contracts:
-        print("⛔ No contracts found in XML")
+        print("⛔ No contracts found")
         return
 
     print(f"📊 Found {len(contracts)} contracts")
 
-    contracts.sort(key=lambda x: x["lastmod"], reverse=True)
+    contracts = sorted(contracts, key=lambda x: x["lastmod"], reverse=True)
     newest_timestamp = contracts[0]["lastmod"]
 
     # ----------------------------
@@ -492,7 +536,7 @@ def run_for_company(config: dict):
     # ----------------------------
     print("Previously saved timestamp:", saved_timestamp)
 
-    new_contracts = [c for c in contracts if c["lastmod"] > saved_timestamp]
+    new_contracts = [dict(c, company_id=company_id) for c in contracts if c["lastmod"] > saved_timestamp]
 
     if not new_contracts:
         print("⛔ No new contracts found.")
@@ -508,10 +552,115 @@ def run_for_company(config: dict):
     print("✅ DONE")
 
 
-def main():
+def run_for_company(config: dict):
+    """Run the full contract-finder flow for a single company config."""
+    label = config["label"]
+
+    if not is_subscription_active(SCRAPER_ID, config["company_id"]):
+        print(f"\n⏭️  Skipping {label} — subscription is inactive")
+        return
+
+    print(f"\n{'='*60}")
+    print(f"🏢 Running for: {label}")
+    print(f"{'='*60}")
+
+    contracts = list(iter_contracts(
+        config["keywords"],
+        config["cpv_codes"],
+        config["value_low"],
+        config.get("notice_types", DEFAULT_NOTICE_TYPES),
+        config.get("regions"),
+    ))
+    save_for_company(config, contracts)
+
+
+# ----------------------------------------------------------
+# Union mode — one search per profile, local routing
+# ----------------------------------------------------------
+def search_profile(config: dict) -> tuple:
+    """
+    The filters a search cannot drop: notice types (incl. SME flags) and
+    regions. Configs with the same profile share one broad search.
+    """
+    notice_types = config.get("notice_types", DEFAULT_NOTICE_TYPES)
+    return tuple(sorted(notice_types)), tuple(sorted(config.get("regions") or []))
+
+
+def cpv_prefixes(cpv_codes: list) -> tuple:
+    """A selected CPV code also covers its children (72000000 → 72xxxxxx)."""
+    return tuple(code.rstrip("0") or code for code in cpv_codes)
+
+
+def make_filter(config: dict):
+    """Return a predicate for the non-keyword filters (CPV codes, value_low)."""
+    prefixes = cpv_prefixes(config["cpv_codes"])
+    value_low = _to_number(config["value_low"])
+
+    def matches(contract: dict) -> bool:
+        if prefixes and not any(code.startswith(prefixes) for code in contract["cpv_codes"]):
+            return False
+        # Notices without a value are kept — there is nothing to filter on
+        if value_low and contract["value"] is not None and contract["value"] < value_low:
+            return False
+        return True
+
+    return matches
+
+
+def route_contracts(configs: list, contracts) -> dict:
+    """
+    Return {company_id: [contracts]} — keywords via one compiled matcher per
+    search. Contracts can be streamed; ones no company wants are not kept.
+    """
+    router = routing.compile_rules(configs)
+    filters = {c["company_id"]: make_filter(c) for c in configs}
+    routed = {c["company_id"]: [] for c in configs}
+
+    total = 0
+    for contract in contracts:
+        total += 1
+        for company_id in router.route(contract["match_text"]):
+            if filters[company_id](contract):
+                routed[company_id].append(contract)
+    print(f"📊 {total} contracts in union search")
+    return routed
+
+
+def run_union():
+    """Search once per profile and route every notice to its companies locally."""
+    profiles = {}
     for config in COMPANY_CONFIGS:
-        run_for_company(config)
-        time.sleep(5)  # brief pause between company runs
+        if not is_subscription_active(SCRAPER_ID, config["company_id"]):
+            print(f"\n⏭️  Skipping {config['label']} — subscription is inactive")
+            continue
+        profiles.setdefault(search_profile(config), []).append(config)
+
+    for (notice_types, regions), configs in profiles.items():
+        print(f"\n{'='*60}")
+        print(f"🔍 Union search for: {', '.join(c['label'] for c in configs)}")
+        print(f"{'='*60}")
+
+        # Loosest value filter of the group; an empty one means no filter
+        value_lows = [_to_number(c["value_low"]) or 0 for c in configs]
+        value_low = min(value_lows)
+
+        contracts = iter_contracts("", [], f"{value_low:.0f}" if value_low else "", list(notice_types), list(regions))
+        routed = route_contracts(configs, contracts)
+        for config in configs:
+            print(f"\n🏢 Routing for: {config['label']}")
+            save_for_company(config, routed[config["company_id"]])
+
+        time.sleep(5)  # brief pause between searches
+
+
+def main():
+    if SEARCH_MODE == "per_company":
+        for config in COMPANY_CONFIGS:
+            run_for_company(config)
+            time.sleep(5)  # brief pause between company runs
+        return
+
+    run_union()
 
 if __name__ == "__main__":
     main()
@@ -2,11 +2,11 @@ import os
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -25,8 +25,7 @@ PROXIES = {"http": PROXY, "https": PROXY} if PROXY else None
 def fetch_html(url: str, max_retries: int = 3) -> str:
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 impersonate="chrome131",
                 proxies=PROXIES,
@@ -51,7 +50,7 @@ def get_listing_urls(page: int) -> str:
 
 def parse_listing_page(html: str) -> list[str]:
     """Extract article URLs from a listing page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     urls = []
     for a in soup.select("article.card a.headline-link"):
         href = a.get("href", "")
@@ -71,7 +70,7 @@ def scrape_article(url: str) -> dict | None:
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.parse(html)
 
     # Title
     title_el = soup.select_one("h1.article-heading")
@@ -118,7 +117,7 @@ def main():
 
     print("🔍 Scraping Data Center Dynamics (North America)...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs in DB.")
 
     # Collect all new article URLs from listing pages
@@ -170,7 +169,7 @@ def main():
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted = insert_articles(articles)
+    inserted = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted} articles into database.")
 
 
@@ -1,8 +1,14 @@
+import json
 import os
+import threading
 from supabase import create_client, Client
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+import content_hashes
+import near_duplicates
+import seen_urls
+
 load_dotenv()
 
 # Initialize Supabase client
@@ -19,9 +25,30 @@ def _utc_now_iso():
     return datetime.utcnow().isoformat()
 
 
+_scraper_ids: dict = {}  # {source_name: scraper_id}
+_scraper_ids_lock = threading.Lock()
+
+
+def load_scraper_ids() -> None:
+    """
+    Load the full source_name → id map from the scrapers table in one query.
+    Called at the start of each scheduler run and on a lookup miss.
+    """
+    global _scraper_ids
+    result = supabase.table("scrapers").select("id,source_name").execute()
+    with _scraper_ids_lock:
+        _scraper_ids = {
+            row["source_name"]: int(row["id"])
+            for row in (result.data or [])
+            if row.get("source_name")
+        }
+
+
 def _resolve_scraper_id(scraper_ref):
     """
     Resolve scraper ID from either numeric scraper_id or source_name.
+    Names are served from the in-process map; the map is reloaded only
+    when a name is not in it.
     """
     if isinstance(scraper_ref, int):
         return scraper_ref
@@ -32,18 +59,35 @@ def _resolve_scraper_id(scraper_ref):
     if not isinstance(scraper_ref, str):
         raise ValueError("scraper_ref must be scraper_id (int) or source_name (str)")
 
-    result = (
-        supabase.table("scrapers")
-        .select("id")
-        .eq("source_name", scraper_ref)
-        .limit(1)
-        .execute()
-    )
+    with _scraper_ids_lock:
+        scraper_id = _scraper_ids.get(scraper_ref)
+    if scraper_id is not None:
+        return scraper_id
 
-    if not result.data:
+    # Miss — the scraper may have been added since the map was loaded
+    load_scraper_ids()
+    with _scraper_ids_lock:
+        scraper_id = _scraper_ids.get(scraper_ref)
+
+    if scraper_id is None:
         raise ValueError(f"Scraper not found for source_name: {scraper_ref}")
 
-    return int(result.data[0]["id"])
+    return scraper_id
+
+
+# ----------------------------------------------------------
+# Run-scoped watermark cache
+# ----------------------------------------------------------
+# Filled by load_active_subscriptions() from the same company_scrapers query.
+# While it is loaded, get_latest_timestamp reads from memory and
+# update_latest_timestamp buffers the write until flush_watermarks() is
+# called (main.run_scraper does this after each scraper). Standalone runs
+# never load it and keep reading / writing the table directly.
+
+_watermarks: dict = {}  # {(company_id, scraper_id): latest_timestamp}
+_watermarks_loaded = False
+_pending_watermarks: dict = {}  # {scraper_id: {company_id: timestamp}}
+_watermarks_lock = threading.Lock()
 
 
 # ----------------------------------------------------------
@@ -58,6 +102,13 @@ def get_latest_timestamp(scraper_ref, company_id):
     try:
         scraper_id = _resolve_scraper_id(scraper_ref)
 
+        if _watermarks_loaded:
+            with _watermarks_lock:
+                pending = _pending_watermarks.get(scraper_id, {})
+                if company_id in pending:
+                    return pending[company_id]
+                return _watermarks.get((company_id, scraper_id))
+
         result = (
             supabase.table("company_scrapers")
             .select("latest_timestamp")\
@@ -81,45 +132,153 @@ def update_latest_timestamp(scraper_ref, company_id, timestamp):
     Update the latest timestamp for a company + scraper pair.
     scraper_ref can be either scraper_id (int) or source_name (str).
     Creates a new record if it doesn't exist.
+    During a scheduler run the write is buffered until flush_watermarks().
     """
     try:
         scraper_id = _resolve_scraper_id(scraper_ref)
-        now_iso = _utc_now_iso()
 
-        # Try to update existing record
-        result = (
-            supabase.table("company_scrapers")
-            .update({"latest_timestamp": timestamp, "updated_at": now_iso})
-            .eq("company_id", company_id)
-            .eq("scraper_id", scraper_id)
-            .execute()
-        )
+        if _watermarks_loaded:
+            with _watermarks_lock:
+                _pending_watermarks.setdefault(scraper_id, {})[company_id] = timestamp
+            return
 
-        # If no rows affected, insert new record
-        if not result.data:
-            supabase.table("company_scrapers")\
-                .insert({
-                    "company_id": company_id,
-                    "scraper_id": scraper_id,
-                    "latest_timestamp": timestamp,
-                    "subscribed_at": now_iso,
-                    "updated_at": now_iso,
-                    "is_active": True
-                })\
-                .execute()
+        _write_latest_timestamp(scraper_id, company_id, timestamp)
     except Exception as e:
         print(f"Error updating timestamp: {e}")
         raise
 
 
+def _write_latest_timestamp(scraper_id, company_id, timestamp):
+    """Write one watermark straight to company_scrapers (update, else insert)."""
+    now_iso = _utc_now_iso()
+
+    # Try to update existing record
+    result = (
+        supabase.table("company_scrapers")
+        .update({"latest_timestamp": timestamp, "updated_at": now_iso})
+        .eq("company_id", company_id)
+        .eq("scraper_id", scraper_id)
+        .execute()
+    )
+
+    # If no rows affected, insert new record
+    if not result.data:
+        supabase.table("company_scrapers")\
+            .insert({
+                "company_id": company_id,
+                "scraper_id": scraper_id,
+                "latest_timestamp": timestamp,
+                "subscribed_at": now_iso,
+                "updated_at": now_iso,
+                "is_active": True
+            })\
+            .execute()
+
+
+def flush_watermarks(scraper_ref=None):
+    """
+    Write buffered watermarks for one scraper (default: all scrapers).
+
+    Pairs that already exist are updated with one bulk upsert; new pairs
+    are created with one bulk insert (so is_active / subscribed_at of
+    existing rows are never touched). Needs the unique index from
+    sql/company_scrapers_unique.sql.
+    """
+    with _watermarks_lock:
+        if scraper_ref is None:
+            pending = dict(_pending_watermarks)
+            _pending_watermarks.clear()
+        else:
+            scraper_id = _resolve_scraper_id(scraper_ref)
+            pending = {}
+            if scraper_id in _pending_watermarks:
+                pending[scraper_id] = _pending_watermarks.pop(scraper_id)
+        known_pairs = set(_watermarks)
+
+    if not pending:
+        return
+
+    now_iso = _utc_now_iso()
+    updates, inserts = [], []
+    for scraper_id, by_company in pending.items():
+        for company_id, timestamp in by_company.items():
+            row = {
+                "company_id": company_id,
+                "scraper_id": scraper_id,
+                "latest_timestamp": timestamp,
+                "updated_at": now_iso,
+            }
+            if (company_id, scraper_id) in known_pairs:
+                updates.append(row)
+            else:
+                inserts.append(dict(row, subscribed_at=now_iso, is_active=True))
+
+    try:
+        if updates:
+            supabase.table("company_scrapers").upsert(
+                updates, on_conflict="company_id,scraper_id"
+            ).execute()
+        if inserts:
+            supabase.table("company_scrapers").upsert(
+                inserts, on_conflict="company_id,scraper_id", ignore_duplicates=True
+            ).execute()
+    except Exception as e:
+        # Bulk write failed — fall back to one write per pair
+        print(f"⚠️  Bulk watermark flush failed ({e}) — writing one by one")
+        for row in updates + inserts:
+            _write_latest_timestamp(row["scraper_id"], row["company_id"], row["latest_timestamp"])
+
+    with _watermarks_lock:
+        for row in updates + inserts:
+            _watermarks[(row["company_id"], row["scraper_id"])] = row["latest_timestamp"]
+
+
 # ----------------------------------------------------------
 # Insert articles into database
 # ----------------------------------------------------------
+# Batches sent to the insert_articles_batch RPC (sql/insert_articles_batch.sql)
+# are sized by JSON payload, not row count — the body is POSTed, so there is
+# no URI limit, only the request-size limit of the API gateway.
+RPC_FUNCTION = "insert_articles_batch"
+RPC_MAX_PAYLOAD_BYTES = int(os.getenv("RPC_MAX_PAYLOAD_BYTES", str(1_000_000)))
+
+# Fallback path (RPC not deployed): .in_("url", ...) filters go in the URI
 BATCH_SIZE = 20
 
+_rpc_available = True
+
+
+def _payload_batches(normalized, max_bytes=RPC_MAX_PAYLOAD_BYTES):
+    """Split normalized articles into batches whose JSON body fits max_bytes."""
+    batch = []
+    batch_bytes = 2  # "[]"
+    for article in normalized:
+        size = len(json.dumps(article, default=str).encode("utf-8")) + 1
+        if batch and batch_bytes + size > max_bytes:
+            yield batch
+            batch = []
+            batch_bytes = 2
+        batch.append(article)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _insert_articles_rpc(batch, now_iso):
+    """Upsert + link one batch in a single round trip. Returns inserted company_articles count."""
+    result = supabase.rpc(
+        RPC_FUNCTION,
+        {"p_articles": batch, "p_now": now_iso},
+    ).execute()
+    return int(result.data or 0)
+
 
 def _insert_articles_batch(normalized, now_iso):
-    """Process a single batch of normalized articles. Returns inserted company_articles count."""
+    """
+    Process a single batch of normalized articles with plain table calls
+    (4 round trips). Used when the RPC is unavailable. Returns inserted
+    company_articles count.
+    """
     urls = list({a["url"] for a in normalized})
 
     existing_res = (
@@ -191,7 +350,45 @@ def _insert_articles_batch(normalized, now_iso):
     return len(link_result.data) if link_result.data else 0
 
 
-def insert_articles(articles, company_id=None, scraper_id=None):
+def _write_articles(rows, now_iso):
+    """Send normalized rows in payload-sized batches. Returns inserted company_articles count."""
+    global _rpc_available
+
+    total_inserted = 0
+    for batch in _payload_batches(rows):
+        if _rpc_available:
+            try:
+                total_inserted += _insert_articles_rpc(batch, now_iso)
+                continue
+            except Exception as e:
+                # PGRST202: function not found in the schema cache — stop
+                # trying it for the rest of this process
+                if "PGRST202" not in str(e):
+                    raise
+                print(f"⚠️  {RPC_FUNCTION} RPC unavailable ({e}) — using table calls")
+                _rpc_available = False
+
+        for i in range(0, len(batch), BATCH_SIZE):
+            total_inserted += _insert_articles_batch(batch[i : i + BATCH_SIZE], now_iso)
+    return total_inserted
+
+
+def _existing_article_urls(urls):
+    """Return the subset of urls that have a row in articles."""
+    urls = list(urls)
+    existing = set()
+    for i in range(0, len(urls), BATCH_SIZE):
+        result = (
+            supabase.table("articles")
+            .select("url")
+            .in_("url", urls[i : i + BATCH_SIZE])
+            .execute()
+        )
+        existing.update(row["url"] for row in (result.data or []))
+    return existing
+
+
+def insert_articles(articles, company_id=None, scraper_id=None, dedupe_near=False):
     """
     Insert articles into global articles table and link them in company_articles.
 
@@ -199,7 +396,16 @@ def insert_articles(articles, company_id=None, scraper_id=None):
     - Global dedupe is by URL in articles.
     - Company-specific access is stored in company_articles.
     - If URL already exists globally but company link is missing, it is created.
-    - Articles are processed in batches of BATCH_SIZE to avoid URI-too-long errors.
+    - Articles whose title + text hash matches what was last written for
+      that company and URL are dropped before any DB call (content_hashes).
+    - With dedupe_near=True (wire and news scrapers only — templated
+      sources such as tender notices or filings look alike without being
+      the same item), near-duplicates of a stored article are linked to
+      that canonical article instead of being stored as a new one
+      (near_duplicates), provided the canonical article is in the DB.
+    - Each payload-sized batch is upserted and linked in one RPC call
+      (insert_articles_batch). If the function is not deployed, batches of
+      BATCH_SIZE fall back to separate select/upsert calls.
 
     Returns the number of company_articles rows inserted for this call.
     """
@@ -231,11 +437,39 @@ def insert_articles(articles, company_id=None, scraper_id=None):
                 }
             )
 
-        total_inserted = 0
-        for i in range(0, len(normalized), BATCH_SIZE):
-            batch = normalized[i : i + BATCH_SIZE]
-            total_inserted += _insert_articles_batch(batch, now_iso)
-
+        normalized = content_hashes.filter_changed(normalized)
+        if not normalized:
+            return 0
+
+        # Republished copies are linked to their canonical article instead
+        # of being stored again (only for sources that opt in)
+        canonical = near_duplicates.canonical_urls(normalized) if dedupe_near else {}
+        if canonical:
+            # The local index can drift from the DB (row deleted, cache copied,
+            # earlier insert failed). Only link to canonical articles that
+            # exist or are written in this call; the rest keep their own URL.
+            own_urls = {a["url"] for a in normalized if a["url"] not in canonical}
+            stored = _existing_article_urls(set(canonical.values()) - own_urls)
+            canonical = {
+                url: target for url, target in canonical.items()
+                if target in stored or target in own_urls
+            }
+        if canonical:
+            print(f"🔗 Linked {len(canonical)} near-duplicate article(s) to canonical copies")
+
+        # Canonical copies are written first; duplicates follow under the
+        # canonical URL, where the article upsert is a no-op and only the
+        # company link is created — never the duplicate's title and text
+        to_write = [a for a in normalized if a["url"] not in canonical]
+        links = [dict(a, url=canonical[a["url"]]) for a in normalized if a["url"] in canonical]
+        total_inserted = _write_articles(to_write, now_iso)
+        if links:
+            total_inserted += _write_articles(links, now_iso)
+
+        _record_seen_urls(normalized)
+        content_hashes.record(normalized)
+        if dedupe_near:
+            near_duplicates.record([a for a in normalized if a["url"] not in canonical])
         return total_inserted
     except Exception as e:
         print(f"Error inserting articles: {e}")
@@ -265,6 +499,85 @@ def get_recent_article_urls(scraper_id, limit=32):
         return set()
 
 
+# ----------------------------------------------------------
+# Known article URLs for a scraper (local seen-URL index)
+# ----------------------------------------------------------
+SYNC_PAGE_SIZE = 1000
+
+# Re-read a little before the last synced created_at: rows from one insert
+# share a timestamp and other writers' clocks may lag slightly
+SYNC_OVERLAP = timedelta(minutes=10)
+
+
+def _record_seen_urls(normalized):
+    """Add freshly inserted article URLs to the local index."""
+    by_scraper = {}
+    for a in normalized:
+        by_scraper.setdefault(a["scraper_id"], []).append(a["url"])
+    try:
+        for scraper_id, urls in by_scraper.items():
+            seen_urls.add_urls(scraper_id, urls)
+    except Exception as e:
+        print(f"⚠️  Failed to update seen-URL index: {e}")
+
+
+def _sync_seen_urls(scraper_id):
+    """Pull articles created since the last sync into the local index."""
+    synced_until, _ = seen_urls.get_sync_state(scraper_id)
+
+    since = None
+    if synced_until:
+        try:
+            since = (datetime.fromisoformat(synced_until) - SYNC_OVERLAP).isoformat()
+        except ValueError:
+            since = synced_until
+
+    newest = synced_until
+    offset = 0
+    while True:
+        query = (
+            supabase.table("articles")
+            .select("url,created_at")
+            .eq("scraper_id", scraper_id)
+        )
+        if since:
+            query = query.gte("created_at", since)
+        result = (
+            query.order("created_at")
+            .range(offset, offset + SYNC_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows = result.data or []
+        seen_urls.add_urls(scraper_id, [row["url"] for row in rows])
+        if rows:
+            newest = rows[-1]["created_at"]
+        if len(rows) < SYNC_PAGE_SIZE:
+            break
+        offset += SYNC_PAGE_SIZE
+
+    seen_urls.set_sync_state(scraper_id, newest)
+
+
+def get_known_article_urls(scraper_id):
+    """
+    Return the set of every article URL stored for a scraper.
+
+    Served from the local seen-URL index (seen_urls.py), which
+    insert_articles keeps current. The index is reconciled with the
+    articles table incrementally (by created_at) when it is older than
+    seen_urls.SYNC_INTERVAL_SECONDS, so there is no row limit and
+    normally no network query.
+    """
+    scraper_id = int(scraper_id)
+    try:
+        if seen_urls.needs_sync(scraper_id):
+            _sync_seen_urls(scraper_id)
+        return seen_urls.get_urls(scraper_id)
+    except Exception as e:
+        print(f"⚠️  Seen-URL index unavailable ({e}) — loading recent URLs from DB")
+        return get_recent_article_urls(scraper_id, limit=500)
+
+
 # ----------------------------------------------------------
 # Check if a company already has access to an article URL
 # ----------------------------------------------------------
@@ -307,20 +620,29 @@ _active_subscriptions: dict = {}  # {(company_id, scraper_id): is_active}
 
 def load_active_subscriptions() -> None:
     """
-    Fetch all company_scrapers rows and cache is_active per (company_id, scraper_id).
-    Call once at the start of each scheduler run before any scrapers execute.
+    Fetch all company_scrapers rows and cache is_active and latest_timestamp
+    per (company_id, scraper_id). Call once at the start of each scheduler run
+    before any scrapers execute; it also switches watermark reads/writes to
+    the run-scoped cache (see flush_watermarks).
     """
-    global _active_subscriptions
+    global _active_subscriptions, _watermarks, _watermarks_loaded
     try:
         result = (
             supabase.table("company_scrapers")
-            .select("company_id,scraper_id,is_active")
+            .select("company_id,scraper_id,is_active,latest_timestamp")
             .execute()
         )
+        rows = result.data or []
         _active_subscriptions = {
             (row["company_id"], row["scraper_id"]): row["is_active"]
-            for row in (result.data or [])
+            for row in rows
         }
+        with _watermarks_lock:
+            _watermarks = {
+                (row["company_id"], row["scraper_id"]): row["latest_timestamp"]
+                for row in rows
+            }
+            _watermarks_loaded = True
         active_count = sum(1 for v in _active_subscriptions.values() if v)
         total = len(_active_subscriptions)
         print(
@@ -330,6 +652,15 @@ def load_active_subscriptions() -> None:
     except Exception as e:
         print(f"⚠️  Failed to load active subscriptions: {e} — defaulting to allow all")
         _active_subscriptions = {}
+        with _watermarks_lock:
+            _watermarks = {}
+            _watermarks_loaded = False
+
+    # Refresh the source_name → id map for this run
+    try:
+        load_scraper_ids()
+    except Exception as e:
+        print(f"⚠️  Failed to load scraper IDs: {e} — resolving names on demand")
 
 
 def is_subscription_active(scraper_id: int, company_id: str) -> bool:
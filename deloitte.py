@@ -1,10 +1,9 @@
 import os
-import time
 
-import requests
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
 
 load_dotenv()
 
@@ -73,8 +72,7 @@ def fetch_region(label, cc, known_urls, seen_slugs):
     }
 
     try:
-        time.sleep(1)
-        resp = requests.post(
+        resp = http_client.post(
             API_URL,
             json=payload,
             headers={**HEADERS, "referer": f"{BASE_URL}/{cc}/en/about/press-room.html"},
@@ -133,7 +131,7 @@ def fetch_region(label, cc, known_urls, seen_slugs):
 def main():
     print("🔍 Fetching Deloitte press room articles (all regions)...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
     seen_slugs = {url_slug(u) for u in known_urls}
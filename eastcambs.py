@@ -2,11 +2,11 @@ import os
 import time
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -75,9 +75,9 @@ def fetch_keyword_links(keyword: str) -> list[str]:
             params = {"s": keyword, "type": 1, "sort_by": "changed_1"}
             if page > 0:
                 params["page"] = page
-            resp = requests.get(SEARCH_URL, params=params, headers=HEADERS, timeout=30)
+            resp = http_client.get(SEARCH_URL, params=params, headers=HEADERS, timeout=30)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = html_parse.soup(resp.text)
 
             articles = soup.select("ol.search-results li article h2 a")
             if not articles:
@@ -115,10 +115,9 @@ def scrape_article(url, max_retries=3):
     """Scrape title, date, and body from an eastcambs.gov.uk article."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = html_parse.soup(resp.text)
 
             # Title
             h1 = soup.select_one("h1.news-article__title span") or soup.select_one("h1")
@@ -149,7 +148,7 @@ def scrape_article(url, max_retries=3):
 def main():
     print("🔍 Fetching East Cambridgeshire articles...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
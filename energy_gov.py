@@ -3,11 +3,11 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -37,6 +37,9 @@ MAX_PAGES = 2
 
 PROXIES = None
 
+# Pages are read up to this many bytes; anything past it is never downloaded
+MAX_DOC_BYTES = 2_000_000
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -55,7 +58,7 @@ def fetch_listing() -> list[dict]:
     for page in range(MAX_PAGES):
         url = API_BASE.format(page=page)
         try:
-            resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
             resp.raise_for_status()
             data = resp.json()
         except Exception as e:
@@ -68,7 +71,7 @@ def fetch_listing() -> list[dict]:
 
         for row in rows:
             title_html = row.get("title", "")
-            soup = BeautifulSoup(title_html, "html.parser")
+            soup = html_parse.soup(title_html)
             a_tag = soup.find("a")
             if not a_tag:
                 continue
@@ -97,14 +100,13 @@ def parse_date(raw: str) -> str:
 def scrape_body(url: str) -> str:
     """Fetch an energy.gov article page and extract body text only."""
     try:
-        time.sleep(1)
-        resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30, stream=True)
         resp.raise_for_status()
     except Exception as e:
         print(f"  ❌ Failed to fetch {url}: {e}")
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.parse(html_parse.read_capped(resp, MAX_DOC_BYTES))
 
     article_el = soup.select_one("article")
     if article_el:
@@ -131,7 +133,7 @@ def main():
 
     print("🔍 Scraping Energy.gov (Clean Energy Press Releases & Articles)...")
 
-    recent_urls = set(get_recent_article_urls(SCRAPER_ID, limit=500))
+    recent_urls = get_known_article_urls(SCRAPER_ID)
 
     items = fetch_listing()
     print(f"  📰 {len(items)} article(s) found across {MAX_PAGES} page(s).")
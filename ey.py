@@ -4,10 +4,13 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_cache
+import http_client
+import html_parse
+from sitemap_stream import iter_sitemap, response_stream
 
 load_dotenv()
 
@@ -31,8 +34,6 @@ HEADERS = {
 PROXY = os.getenv("SCRAPER_PROXY")
 PROXIES = {"http": PROXY, "https": PROXY} if PROXY else None
 
-NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-
 
 def parse_lastmod(lastmod_str):
     """Convert lastmod to YYYY-MM-DDTHH:MM:SS format."""
@@ -43,14 +44,19 @@ def parse_lastmod(lastmod_str):
         return None
 
 
-def fetch_url(url, max_retries=3):
-    """Fetch URL content with retries."""
+def fetch_response(url, max_retries=3, extra_headers=None, stream=False):
+    """Fetch URL with retries and return the response object."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+            resp = http_client.get(
+                url,
+                headers={**HEADERS, **(extra_headers or {})},
+                proxies=PROXIES,
+                timeout=30,
+                stream=stream,
+            )
             resp.raise_for_status()
-            return resp.text
+            return resp
         except requests.RequestException as e:
             if attempt < max_retries - 1:
                 print(f"⚠️  Retry {attempt + 1}/{max_retries}: {e}")
@@ -60,41 +66,39 @@ def fetch_url(url, max_retries=3):
                 return None
 
 
-def parse_sitemap(xml_content):
-    """Parse sitemap XML and return list of entries with url and lastmod."""
-    import xml.etree.ElementTree as ET
-
-    root = ET.fromstring(xml_content)
-    entries = []
-
-    for url_elem in root.findall("sm:url", NS):
-        loc = url_elem.find("sm:loc", NS)
-        lastmod = url_elem.find("sm:lastmod", NS)
-
-        if loc is None:
-            continue
-
-        url = loc.text.strip()
-        lastmod_text = lastmod.text.strip() if lastmod is not None else ""
-        timestamp = parse_lastmod(lastmod_text)
-
-        if not timestamp:
-            continue
-
-        entries.append({"url": url, "lastmod": timestamp})
+def parse_sitemap(stream, since=None):
+    """
+    Stream-parse the sitemap and return entries with url and lastmod,
+    newest first. Entries at or below `since` are dropped while parsing.
+    """
+    entries = [
+        {"url": url, "lastmod": timestamp}
+        for url, timestamp in iter_sitemap(
+            stream, since=since, normalize_lastmod=parse_lastmod
+        )
+    ]
 
     entries.sort(key=lambda x: x["lastmod"], reverse=True)
     return entries
 
 
-def scrape_article(entry):
-    """Scrape a single EY article."""
+def scrape_article(entry, fetched=None):
+    """
+    Scrape a single EY article. The page is fetched conditionally; an
+    unchanged page (304) returns None. Each downloaded (url, response) is
+    appended to `fetched` so main() can save its validators after insert.
+    """
     url = entry["url"]
-    html = fetch_url(url)
-    if not html:
+    resp = fetch_response(url, extra_headers=http_cache.validator_headers(SCRAPER_ID, url))
+    if resp is None:
         return None
+    if http_cache.is_not_modified(resp):
+        print(f"  💤 Unchanged since last scrape: {url}")
+        return None
+    if fetched is not None:
+        fetched.append((url, resp))
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(resp.text)
 
     # Remove script and style elements
     for tag in soup.select("script, style, iframe"):
@@ -141,43 +145,55 @@ def main():
         print("⏭️  Skipping EY — subscription is inactive")
         return
 
-    xml_content = fetch_url(SITEMAP_URL)
-    if not xml_content:
+    # Conditional fetch — a 304 means nothing changed since last run
+    cache_headers = http_cache.validator_headers(SCRAPER_ID, SITEMAP_URL)
+    sitemap_resp = fetch_response(SITEMAP_URL, extra_headers=cache_headers, stream=True)
+    if sitemap_resp is None:
         print("⛔ Failed to fetch sitemap.")
         return
-
-    entries = parse_sitemap(xml_content)
-    print(f"📋 Found {len(entries)} insight article(s) in sitemap.")
-
-    if not entries:
-        print("⛔ No articles found in sitemap.")
+    if http_cache.is_not_modified(sitemap_resp):
+        sitemap_resp.close()
+        print("⛔ Sitemap unchanged since last run — no new articles.")
         return
 
-    newest_timestamp = entries[0]["lastmod"]
     saved_timestamp = get_latest_timestamp(SCRAPER_ID, COMPANY_ID)
 
+    # Entries at or below the watermark are dropped while streaming
+    with sitemap_resp:
+        entries = parse_sitemap(response_stream(sitemap_resp), since=saved_timestamp)
+    print(f"📋 Found {len(entries)} insight article(s) in sitemap.")
+
     # ----------------------------
     # FIRST RUN — NO SCRAPING
     # ----------------------------
     if saved_timestamp is None:
+        if not entries:
+            print("⛔ No articles found in sitemap.")
+            return
+
+        newest_timestamp = entries[0]["lastmod"]
         print("🟢 First run detected — NOT saving any articles.")
         print("Saving latest timestamp:", newest_timestamp)
         update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
+        http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, sitemap_resp)
         return
 
     print("Previously saved timestamp:", saved_timestamp)
 
-    new_entries = [e for e in entries if e["lastmod"] > saved_timestamp]
+    new_entries = entries
 
     if not new_entries:
         print("⛔ No new articles found.")
+        http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, sitemap_resp)
         return
 
+    newest_timestamp = new_entries[0]["lastmod"]
     print(f"🆕 Found {len(new_entries)} new article(s). Scraping...")
 
     scraped = []
+    fetched_pages = []
     with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        futures = {executor.submit(scrape_article, e): e for e in new_entries}
+        futures = {executor.submit(scrape_article, e, fetched_pages): e for e in new_entries}
         for future in as_completed(futures):
             result = future.result()
             if result:
@@ -191,8 +207,11 @@ def main():
     articles = [dict(a, company_id=COMPANY_ID) for a in scraped]
     inserted = insert_articles(articles)
     print(f"✅ Inserted {inserted} article(s) for ERP Recruit")
+    for page_url, page_resp in fetched_pages:
+        http_cache.save_validators(SCRAPER_ID, page_url, page_resp)
 
     update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
+    http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, sitemap_resp)
     print("🕒 New latest timestamp saved:", newest_timestamp)
 
 
@@ -2,11 +2,11 @@ import os
 import time
 from datetime import datetime
 
-from curl_cffi import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -45,8 +45,7 @@ def get_proxies():
 def fetch(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(
+            resp = http_client.cffi_get(
                 url,
                 headers=HEADERS,
                 proxies=get_proxies(),
@@ -79,7 +78,7 @@ def url_slug(url: str) -> str:
 
 def parse_listing(html: str) -> list:
     """Return list of (url, title, date_str) from a search results page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     results = []
     for li in soup.select("ol.search-list li.search-item"):
         a = li.select_one("a.search-item__clickthrough")
@@ -101,7 +100,7 @@ def scrape_article(url: str, fallback_title: str = "", fallback_date: str = "")
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title
     h1 = soup.select_one("h1.page-header")
@@ -142,7 +141,7 @@ def main():
 
     print("🔍 Scraping FCA News (Consumer Duty / Financial crime / Insurance)...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs in DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
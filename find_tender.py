@@ -1,15 +1,22 @@
 import time
 import os
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import scrappey_client
+import html_parse
+import http_client
+import routing
+from sitemap_stream import response_stream
 import re
 
 BASE_URL = "https://www.find-tender.service.gov.uk"
 SEARCH_URL = f"{BASE_URL}/Search/Results"
 SOURCE_NAME = "FIND_TENDER"
 SCRAPER_ID = 5
+# "form" runs the HTML search once per company; "ocds" reads the release
+# API once and routes locally
+MODE = os.getenv("FIND_TENDER_MODE", "form")
 
 # ----------------------------------------------------------
 # Company configs — each runs a separate search with its own
@@ -90,14 +97,14 @@ def get_form_token(session: requests.Session) -> str:
     r = session.get(SEARCH_URL, headers=HEADERS, timeout=120)
     r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = html_parse.soup(r.text)
     token = soup.find("input", {"name": "form_token"})
     if not token:
         raise RuntimeError("form_token not found")
 
     return token["value"]
 def extract_sort_token(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     token = soup.find("input", {"name": "form_token"})
     if not token:
@@ -213,9 +220,6 @@ def get_last_page(soup):
     return max(pages) if pages else 1
 
 
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
-
-
 def scrape_notice_details(session, notice_url):
     """
     Fetch notice detail page via Scrappey (bypasses bot protection).
@@ -224,8 +228,7 @@ def scrape_notice_details(session, notice_url):
     full_url = f"{BASE_URL}{notice_url}" if notice_url.startswith("/") else notice_url
 
     try:
-        scrappey_key = os.getenv("SCRAPPEY_API_KEY")
-        if scrappey_key:
+        if os.getenv("SCRAPPEY_API_KEY"):
             payload = {
                 "cmd": "request.get",
                 "requestType": "request",
@@ -235,20 +238,14 @@ def scrape_notice_details(session, notice_url):
                 "premiumProxy": True,
                 "proxyCountry": "UnitedKingdom",
             }
-            resp = requests.post(
-                f"{SCRAPPEY_API_URL}?key={scrappey_key}",
-                json=payload,
-                timeout=120,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=120)
             html = data.get("solution", {}).get("response", "")
         else:
             r = session.get(full_url, headers=HEADERS, timeout=120  )
             r.raise_for_status()
             html = r.text
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = html_parse.soup(html)
         content_div = soup.select_one(".notice-view.govuk-main-wrapper.app-main-class")
         if not content_div:
             return ""
@@ -269,7 +266,7 @@ def extract_notices_from_page(session, page_url):
     try:
         resp = session.get(page_url, headers=HEADERS, timeout=120)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = html_parse.soup(resp.text)
 
         for result in soup.select(".search-result"):
             # Title + URL
@@ -343,7 +340,7 @@ def run_for_company(config: dict):
     if "Something went wrong" in sorted_html:
         raise RuntimeError("Sort failed")
 
-    soup = BeautifulSoup(sorted_html, "html.parser")
+    soup = html_parse.soup(sorted_html)
     last_page = get_last_page(soup)
     print(f"Step 5: Last page detected: {last_page}")
 
@@ -420,10 +417,386 @@ def run_for_company(config: dict):
     print("✅ DONE")
 
 
-def main():
+# ----------------------------------------------------------
+# OCDS mode — one incremental walk of the release API for all
+# companies, routed locally by keywords, stage, CPV codes and
+# value. The form's notice-type selections are not applied.
+# ----------------------------------------------------------
+OCDS_API_URL = f"{BASE_URL}/api/1.0/ocdsReleasePackages"
+OCDS_PAGE_SIZE = 100
+# How far back to read when no company has a watermark yet (the form searched two days back)
+FIRST_RUN_DAYS = 2
+# A stale watermark is never walked further back than this
+MAX_CATCHUP_DAYS = 14
+MAX_RETRIES = 3
+
+OCDS_HEADERS = HEADERS | {"Accept": "application/json"}
+
+# The search form's stage checkboxes → OCDS release tags
+STAGE_TAGS = {
+    "1": {"planning", "planningUpdate"},                        # Pipeline
+    "2": {"planning", "planningUpdate"},                        # Planning
+    "3": {"tender", "tenderUpdate", "tenderAmendment", "tenderCancellation"},
+    "4": {"award", "awardUpdate", "awardCancellation"},
+    "5": {"contract", "contractUpdate", "contractAmendment", "contractTermination",
+          "implementation", "implementationUpdate"},
+}
+
+
+def normalize_release_date(raw):
+    """Parse an OCDS date (any offset) and return it as UTC YYYY-MM-DDTHH:MM:SSZ."""
+    if not raw:
+        return ""
+    raw = re.sub(r"\.\d+", "", raw)
+    for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            dt = datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc)
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return ""
+
+
+def ocds_updated_from(saved_timestamps) -> str:
+    """
+    updatedFrom for the walk: the oldest company watermark, or FIRST_RUN_DAYS
+    back if a company has none, but never more than MAX_CATCHUP_DAYS back.
+    """
+    now = datetime.utcnow()
+    starts = []
+    for saved in saved_timestamps:
+        try:
+            starts.append(datetime.strptime(saved[:19], "%Y-%m-%dT%H:%M:%S"))
+        except (TypeError, ValueError):
+            starts.append(now - timedelta(days=FIRST_RUN_DAYS))
+    start = min(starts) if starts else now - timedelta(days=FIRST_RUN_DAYS)
+    start = max(start, now - timedelta(days=MAX_CATCHUP_DAYS))
+    return start.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def get_release_page(url, params=None):
+    """GET one release package (streamed), waiting out 429s."""
+    proxy_url = os.getenv("FIND_TENDER_PROXY")
+    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+
+    for attempt in range(MAX_RETRIES):
+        resp = http_client.get(
+            url, params=params, headers=OCDS_HEADERS, proxies=proxies, timeout=120, stream=True
+        )
+        if resp.status_code == 429 and attempt < MAX_RETRIES - 1:
+            retry_after = resp.headers.get("Retry-After", "")
+            wait = int(retry_after) if retry_after.isdigit() else 30
+            resp.close()
+            print(f"  ⏳ Rate limited — waiting {wait}s")
+            time.sleep(wait)
+            continue
+        resp.raise_for_status()
+        return resp
+
+
+def iter_package(resp):
+    """
+    Yield ("release", dict) for every release in one package and ("next", url)
+    for its cursor link. With ijson installed the body is parsed as it
+    arrives, one release at a time; otherwise the page is parsed whole.
+    """
+    try:
+        import ijson
+    except ImportError:
+        package = resp.json()
+        for release in package.get("releases") or []:
+            yield "release", release
+        yield "next", (package.get("links") or {}).get("next")
+        return
+
+    builder = None
+    for prefix, event, value in ijson.parse(response_stream(resp)):
+        if prefix == "links.next" and event == "string":
+            yield "next", value
+        elif prefix == "releases.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif builder is not None:
+            builder.event(event, value)
+            if prefix == "releases.item" and event == "end_map":
+                yield "release", builder.value
+                builder = None
+
+
+def iter_releases(updated_from: str):
+    """Yield every release updated since updated_from, following the cursor links."""
+    url = OCDS_API_URL
+    params = {"updatedFrom": updated_from, "limit": OCDS_PAGE_SIZE}
+    page = 0
+
+    while url:
+        page += 1
+        resp = get_release_page(url, params)
+        next_url = None
+        count = 0
+        try:
+            for kind, value in iter_package(resp):
+                if kind == "next":
+                    next_url = value
+                else:
+                    count += 1
+                    yield value
+        finally:
+            resp.close()
+
+        print(f"  📄 Page {page}: {count} release(s)")
+        if not count:
+            break
+        # The next link carries the cursor and the original filters
+        url, params = next_url, None
+
+
+def _to_number(value):
+    try:
+        return float(str(value).replace(",", "").replace("£", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def release_cpv_codes(node, codes=None) -> list:
+    """Collect the CPV codes of every classification in a release (tender, lots, items)."""
+    if codes is None:
+        codes = []
+    if isinstance(node, dict):
+        if str(node.get("scheme", "")).upper() == "CPV" and node.get("id"):
+            code = str(node["id"])
+            if code not in codes:
+                codes.append(code)
+        for value in node.values():
+            release_cpv_codes(value, codes)
+    elif isinstance(node, list):
+        for value in node:
+            release_cpv_codes(value, codes)
+    return codes
+
+
+def release_value(release: dict):
+    """The tender's estimated value, else the largest award value, else None."""
+    tender_value = ((release.get("tender") or {}).get("value") or {}).get("amount")
+    if tender_value is not None:
+        return _to_number(tender_value)
+    amounts = [
+        _to_number((award.get("value") or {}).get("amount"))
+        for award in release.get("awards") or []
+    ]
+    amounts = [a for a in amounts if a is not None]
+    return max(amounts) if amounts else None
+
+
+def render_release(node, indent=0, lines=None) -> list:
+    """
+    Render a release as indented "key: value" lines (lists become numbered /
+    bulleted entries, empty values are skipped).
+    """
+    if lines is None:
+        lines = []
+    indent_str = "  " * indent
+
+    for key, value in node.items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, dict):
+            lines.append(f"{indent_str}{key}:")
+            render_release(value, indent + 1, lines)
+        elif isinstance(value, list):
+            lines.append(f"{indent_str}{key}:")
+            for i, item in enumerate(value):
+                if isinstance(item, dict):
+                    lines.append(f"{indent_str}  [{i+1}]:")
+                    render_release(item, indent + 2, lines)
+                else:
+                    lines.append(f"{indent_str}  - {item}")
+        else:
+            lines.append(f"{indent_str}{key}: {value}")
+
+    return lines
+
+
+def release_match_text(release: dict) -> str:
+    """Title and descriptions of the tender, its lots and its items, for keyword routing."""
+    tender = release.get("tender") or {}
+    parts = [tender.get("title"), tender.get("description")]
+    for lot in tender.get("lots") or []:
+        parts += [lot.get("title"), lot.get("description")]
+    for item in tender.get("items") or []:
+        parts.append(item.get("description"))
+    return "\n".join(str(p) for p in parts if p)
+
+
+def notice_from_release(release: dict):
+    """Build a notice dict from one OCDS release, or None to skip it."""
+    notice_id = release.get("id")
+    tender = release.get("tender") or {}
+    title = (tender.get("title") or "").strip()
+    date = normalize_release_date(release.get("date"))
+    if not notice_id or not title or not date:
+        return None
+
+    text_parts = [
+        f"TITLE: {title}",
+        "",
+        "FULL NOTICE DETAILS:",
+        *render_release(release),
+    ]
+
+    return {
+        "url": f"{BASE_URL}/Notice/{notice_id}",
+        "date": date,
+        "title": title,
+        "text": "\n".join(text_parts),
+        "lastmod": date,
+        "scraper_id": SCRAPER_ID,
+        # Routing fields
+        "match_text": release_match_text(release),
+        "release_tags": release.get("tag") or [],
+        "cpv_codes": release_cpv_codes(release),
+        "value": release_value(release),
+    }
+
+
+def iter_notices(updated_from: str):
+    """Stream notices parsed from the releases updated since updated_from."""
+    for release in iter_releases(updated_from):
+        try:
+            notice = notice_from_release(release)
+        except Exception as e:
+            print(f"Error parsing release {release.get('id')}: {e}")
+            continue
+        if notice:
+            yield notice
+
+
+def cpv_prefixes(cpv_codes: list) -> tuple:
+    """A selected CPV code also covers its children (72000000 → 72xxxxxx)."""
+    return tuple(code.rstrip("0") or code for code in cpv_codes)
+
+
+def stage_tags(stages) -> set:
+    """Release tags covered by a config's form stages (empty → no stage filter)."""
+    return set().union(*(STAGE_TAGS.get(str(stage), set()) for stage in stages or []))
+
+
+def make_filter(config: dict):
+    """Return a predicate for the non-keyword filters (stages, CPV codes, value_low)."""
+    tags = stage_tags(config.get("stages"))
+    prefixes = cpv_prefixes(config["cpv_codes"])
+    value_low = _to_number(config["value_low"])
+
+    def matches(notice: dict) -> bool:
+        if tags and not tags.intersection(notice["release_tags"]):
+            return False
+        if prefixes and not any(code.startswith(prefixes) for code in notice["cpv_codes"]):
+            return False
+        # Notices without a value are kept — there is nothing to filter on
+        if value_low and notice["value"] is not None and notice["value"] < value_low:
+            return False
+        return True
+
+    return matches
+
+
+def route_notices(configs: list, notices) -> dict:
+    """
+    Return {company_id: [notices]} — keywords via one compiled matcher.
+    Notices can be streamed; ones no company wants are not kept.
+    """
+    router = routing.compile_rules(configs)
+    filters = {c["company_id"]: make_filter(c) for c in configs}
+    routed = {c["company_id"]: [] for c in configs}
+
+    total = 0
+    for notice in notices:
+        total += 1
+        for company_id in router.route(notice["match_text"]):
+            if filters[company_id](notice):
+                routed[company_id].append(notice)
+    print(f"📊 {total} notices in release walk")
+    return routed
+
+
+def save_for_company(config: dict, notices: list, saved_timestamp):
+    """Apply the timestamp flow for one company to its routed notices."""
+    company_id = config["company_id"]
+
+    if not notices:
+        print("⛔ No notices found")
+        return
+
+    print(f"📊 Found {len(notices)} notices")
+
+    notices = sorted(notices, key=lambda x: x["lastmod"], reverse=True)
+    newest_timestamp = notices[0]["lastmod"]
+
+    # ----------------------------
+    # FIRST RUN — NO SCRAPING
+    # ----------------------------
+    if saved_timestamp is None:
+        print("🟢 First run detected — NOT saving any notices to database.")
+        print("Saving latest timestamp:", newest_timestamp)
+        update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
+        return
+
+    # ----------------------------
+    # SUBSEQUENT RUNS — save new notices
+    # ----------------------------
+    print("Previously saved timestamp:", saved_timestamp)
+
+    new_notices = [dict(n, company_id=company_id) for n in notices if n["lastmod"] > saved_timestamp]
+
+    if not new_notices:
+        print("⛔ No new notices found.")
+        return
+
+    print(f"🆕 Found {len(new_notices)} new notices.")
+
+    inserted_count = insert_articles(new_notices)
+    print(f"✅ Inserted {inserted_count} notices into database")
+
+    update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
+    print("🕒 New latest timestamp saved:", newest_timestamp)
+    print("✅ DONE")
+
+
+def run_ocds():
+    """Walk the releases updated since the oldest watermark and route them to every company."""
+    configs = []
+    saved = {}
     for config in COMPANY_CONFIGS:
-        run_for_company(config)
-        time.sleep(5)
+        if not is_subscription_active(SCRAPER_ID, config["company_id"]):
+            print(f"\n⏭️  Skipping {config['label']} — subscription is inactive")
+            continue
+        configs.append(config)
+        saved[config["company_id"]] = get_latest_timestamp(SCRAPER_ID, config["company_id"])
+
+    if not configs:
+        return
+
+    updated_from = ocds_updated_from(saved.values())
+    print(f"\n{'='*60}")
+    print(f"🔍 OCDS releases updated since {updated_from} for: {', '.join(c['label'] for c in configs)}")
+    print(f"{'='*60}")
+
+    routed = route_notices(configs, iter_notices(updated_from))
+    for config in configs:
+        print(f"\n🏢 Routing for: {config['label']}")
+        save_for_company(config, routed[config["company_id"]], saved[config["company_id"]])
+
+
+def main():
+    if MODE == "form":
+        for config in COMPANY_CONFIGS:
+            run_for_company(config)
+            time.sleep(5)
+        return
+
+    run_ocds()
 
 
 if __name__ == "__main__":
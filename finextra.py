@@ -5,11 +5,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import scrappey_client
+import html_parse
 
 load_dotenv()
 
@@ -41,7 +42,6 @@ COMPANY_CONFIGS = [
     },
 ]
 
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 
 HEADERS = {
     "User-Agent": (
@@ -82,8 +82,7 @@ def fetch_rss(channel_url: str, max_retries: int = 3) -> list[dict]:
     """Fetch and parse an RSS channel. Returns list of {url, title, date, description}."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(channel_url, headers=HEADERS, timeout=30)
+            resp = http_client.get(channel_url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
             root = ET.fromstring(resp.content)
             items = []
@@ -118,8 +117,7 @@ def fetch_rss(channel_url: str, max_retries: int = 3) -> list[dict]:
 
 def scrape_article(url: str, max_retries: int = 3) -> str:
     """Fetch article body via Scrappey. Returns body text or empty string."""
-    api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not api_key:
+    if not os.getenv("SCRAPPEY_API_KEY"):
         raise RuntimeError("SCRAPPEY_API_KEY not set")
 
     payload = {
@@ -138,19 +136,12 @@ def scrape_article(url: str, max_retries: int = 3) -> str:
 
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.post(
-                f"{SCRAPPEY_API_URL}?key={api_key}",
-                json=payload,
-                timeout=90,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=90)
             html = data.get("solution", {}).get("response", "")
             if not html:
                 raise RuntimeError("Empty Scrappey response")
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = html_parse.soup(html)
             body_div = soup.find("div", id="ctl00_ctl00_body_main_NewsArticle_pnlBody")
             if body_div:
                 for tag in body_div.select("script, style"):
@@ -167,7 +158,7 @@ def scrape_article(url: str, max_retries: int = 3) -> str:
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"  ⚠️  Retry {attempt + 1}/{max_retries} for {url}: {e}")
-                time.sleep(2)
+                scrappey_client.backoff(attempt)
             else:
                 print(f"  ❌ Failed to scrape {url}: {e}")
                 return ""
@@ -186,7 +177,7 @@ def run_for_company(config: dict):
     print(f"🏢 Running for: {label}")
     print(f"{'='*60}")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs in DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
@@ -242,7 +233,7 @@ def run_for_company(config: dict):
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted = insert_articles(articles)
+    inserted = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted} articles for {label}.")
 
 
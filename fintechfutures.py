@@ -3,11 +3,13 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import scrappey_client
+import html_parse
 
 load_dotenv()
 
@@ -44,15 +46,13 @@ def get_sitemap_url():
     return f"https://www.fintechfutures.com/article/archive/{year}/{month_name}.xml"
 
 
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 
 
 # ----------------------------------------------------------
 # Scrappey fetch (for XML sitemap — blocked by 403 on direct)
 # ----------------------------------------------------------
 def fetch_with_scrappey(url, max_retries=3):
-    api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not api_key:
+    if not os.getenv("SCRAPPEY_API_KEY"):
         raise RuntimeError("SCRAPPEY_API_KEY not set")
 
     payload = {
@@ -67,14 +67,7 @@ def fetch_with_scrappey(url, max_retries=3):
 
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = requests.post(
-                f"{SCRAPPEY_API_URL}?key={api_key}",
-                json=payload,
-                timeout=90,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=90)
             solution = data.get("solution", {})
 
             status_code = solution.get("statusCode")
@@ -88,7 +81,7 @@ def fetch_with_scrappey(url, max_retries=3):
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"⚠️  Retry {attempt + 1}/{max_retries}: {e}")
-                time.sleep(2)
+                scrappey_client.backoff(attempt)
             else:
                 print(f"❌ Failed after {max_retries} attempts: {e}")
                 return None
@@ -100,7 +93,7 @@ def fetch_with_scrappey(url, max_retries=3):
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
             resp.raise_for_status()
             return resp.text
         except Exception as e:
@@ -164,7 +157,7 @@ def scrape_article(url, lastmod):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title
     title_tag = soup.select_one("span.ArticleBase-LargeTitle")
@@ -290,7 +283,7 @@ def main():
         print(f"🆕 Found {len(new_articles)} new article(s).")
 
         company_articles = [dict(a, company_id=company_id) for a in new_articles]
-        inserted = insert_articles(company_articles)
+        inserted = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted} article(s) for {label}")
 
         update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
@@ -3,11 +3,11 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -64,7 +64,7 @@ HEADERS = {
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
             resp.raise_for_status()
             return resp.text
         except Exception as e:
@@ -80,7 +80,7 @@ def fetch_url(url, max_retries=3):
 # Parse listing page → [(url, date_str), ...]  (English only)
 # ----------------------------------------------------------
 def parse_listing_page(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     results = []
     seen = set()
 
@@ -168,7 +168,7 @@ def scrape_article(url):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title
     h1 = soup.select_one("h1.article-headline")
@@ -309,7 +309,7 @@ def main():
         print(f"🆕 Found {len(new_articles)} new article(s).")
 
         company_articles = [dict(a, company_id=company_id) for a in new_articles]
-        inserted = insert_articles(company_articles)
+        inserted = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted} article(s) for {label}")
 
         update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
@@ -0,0 +1,238 @@
+"""
+Shared engine for GOV.UK organisation feeds.
+
+Scrapers for government bodies publishing on www.gov.uk used to parse the
+/search/all finder HTML and then fetch every article page with retries.
+GOV.UK exposes both as JSON instead:
+
+    Search API   /api/search.json?filter_organisations=…&order=-public_timestamp
+                 &fields=link&fields=title… — compact, newest first
+    Content API  /api/content/<path> — the page's structured content,
+                 body as an HTML fragment
+
+    articles, search_resp = govuk.fetch_new_articles("homes-england", SCRAPER_ID)
+    insert_articles(...)
+    govuk.save_search_validators("homes-england", SCRAPER_ID, search_resp)
+
+fetch_new_articles() pages through the search results newest first and
+stops at the watermark: the first page holding no URL that isn't already
+stored (get_known_article_urls). Bodies of the new results are then
+fetched from the Content API concurrently. The first search page is
+requested conditionally with http_cache validators, so an unchanged feed
+costs one 304; its validators are saved once the articles are stored
+(save_search_validators).
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
+
+from db import get_known_article_urls
+import http_cache
+import http_client
+import html_parse
+
+BASE_URL = "https://www.gov.uk"
+SEARCH_API_URL = f"{BASE_URL}/api/search.json"
+CONTENT_API_URL = f"{BASE_URL}/api/content"
+
+SEARCH_FIELDS = ("link", "title", "description", "public_timestamp", "format")
+PAGE_SIZE = 50
+MAX_PAGES = 5
+MAX_WORKERS = 5
+MAX_RETRIES = 3
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "application/json",
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+
+# Publications are document collections (PDFs, forms), not articles
+DEFAULT_EXCLUDE = ("/publications/",)
+
+
+def normalize_date(raw: str) -> str:
+    """Parse an ISO 8601 date string and return it as YYYY-MM-DDTHH:MM:SS."""
+    if not raw:
+        return ""
+    # public_timestamp carries milliseconds: 2026-04-13T10:00:00.000+01:00
+    raw = re.sub(r"\.\d+", "", raw)
+    for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            dt = datetime.strptime(raw[:25], fmt)
+            return dt.strftime("%Y-%m-%dT%H:%M:%S")
+        except ValueError:
+            continue
+    return raw
+
+
+def url_slug(url):
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _get_json(url, extra_headers=None):
+    """GET a GOV.UK API URL with retries. Returns the response (raised for status)."""
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            resp = http_client.get(
+                url, headers={**HEADERS, **(extra_headers or {})}, timeout=30
+            )
+            resp.raise_for_status()
+            return resp
+        except Exception as e:
+            last_error = e
+            if attempt < MAX_RETRIES - 1:
+                print(f"  ⚠️  Retry {attempt + 1}/{MAX_RETRIES} for {url}: {e}")
+                time.sleep(2)
+    raise last_error
+
+
+# ----------------------------------------------------------
+# Search API
+# ----------------------------------------------------------
+def search_params(organisation, start=0):
+    """Query parameters for one page of an organisation's newest documents."""
+    params = [
+        ("filter_organisations", organisation),
+        ("order", "-public_timestamp"),
+        ("count", PAGE_SIZE),
+        ("start", start),
+    ]
+    params.extend(("fields", field) for field in SEARCH_FIELDS)
+    return params
+
+
+def search_url(organisation, start=0):
+    return f"{SEARCH_API_URL}?{urlencode(search_params(organisation, start))}"
+
+
+def iter_search_pages(organisation, scraper_id, max_pages=MAX_PAGES):
+    """
+    Yield (response, results) per search page, newest first. The first page
+    is conditional; a 304 yields nothing.
+    """
+    for page in range(max_pages):
+        url = search_url(organisation, start=page * PAGE_SIZE)
+        extra = http_cache.validator_headers(scraper_id, url) if page == 0 else None
+        resp = _get_json(url, extra_headers=extra)
+        if http_cache.is_not_modified(resp):
+            print("  💤 Search results unchanged since last run.")
+            return
+        results = resp.json().get("results", [])
+        yield resp, results
+        if len(results) < PAGE_SIZE:
+            return
+
+
+def fetch_listing(organisation, scraper_id, known_urls, exclude=DEFAULT_EXCLUDE):
+    """
+    Return (new_items, first_page_response). new_items are search results
+    ({url, title, description, date}) not yet stored, newest first. Paging
+    stops at the first page with nothing new (the watermark).
+    """
+    seen_slugs = {url_slug(u) for u in known_urls}
+    items = []
+    first_resp = None
+
+    for page, (resp, results) in enumerate(iter_search_pages(organisation, scraper_id), start=1):
+        if first_resp is None:
+            first_resp = resp
+        page_new = 0
+        for result in results:
+            link = result.get("link") or ""
+            if not link:
+                continue
+            full_url = BASE_URL + link if link.startswith("/") else link
+            if any(part in full_url for part in exclude):
+                continue
+            slug = url_slug(full_url)
+            if full_url in known_urls or slug in seen_slugs:
+                continue
+            seen_slugs.add(slug)
+            page_new += 1
+            items.append({
+                "url": full_url,
+                "path": link,
+                "title": result.get("title") or "",
+                "description": result.get("description") or "",
+                "date": normalize_date(result.get("public_timestamp") or ""),
+            })
+        print(f"  📄 Page {page}: {len(results)} result(s), {page_new} new.")
+        if not page_new:
+            break
+
+    return items, first_resp
+
+
+# ----------------------------------------------------------
+# Content API
+# ----------------------------------------------------------
+def _body_html(content):
+    details = content.get("details") or {}
+    body = details.get("body")
+    if isinstance(body, list):
+        # Multi-format bodies: [{"content_type": "text/html", "content": ...}]
+        body = next((b.get("content") for b in body if b.get("content_type") == "text/html"), "")
+    if body:
+        return body
+    # Guides and similar formats split the body into parts
+    return "\n".join(part.get("body", "") for part in details.get("parts") or [])
+
+
+def fetch_article(item, scraper_id):
+    """Fetch one search result's body from the Content API. Returns an article dict or None."""
+    try:
+        content = _get_json(CONTENT_API_URL + item["path"]).json()
+    except Exception as e:
+        print(f"  ❌ Failed to fetch content for {item['url']}: {e}")
+        return None
+
+    body_html = _body_html(content)
+    text = html_parse.parse(body_html).get_text(" ", strip=True) if body_html else ""
+    return {
+        "url": item["url"],
+        "date": item["date"],
+        "title": content.get("title") or item["title"],
+        "text": text or content.get("description") or item["description"],
+        "scraper_id": scraper_id,
+    }
+
+
+def fetch_new_articles(organisation, scraper_id, exclude=DEFAULT_EXCLUDE):
+    """
+    Return (articles, search_response) for an organisation's documents not
+    yet stored. Articles carry no company_id; pass search_response to
+    save_search_validators() once they are inserted.
+    """
+    known_urls = get_known_article_urls(scraper_id)
+    print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
+
+    items, search_resp = fetch_listing(organisation, scraper_id, known_urls, exclude)
+    if not items:
+        return [], search_resp
+
+    print(f"  🆕 {len(items)} new article(s) to fetch.")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda item: fetch_article(item, scraper_id), items))
+
+    articles = [a for a in results if a]
+    for article in articles:
+        print(f"  ✅ {article['title'][:60]}...")
+    if len(articles) < len(items):
+        # Failed bodies are retried next run, which a 304 would prevent
+        search_resp = None
+    return articles, search_resp
+
+
+def save_search_validators(organisation, scraper_id, search_resp):
+    """Remember the first search page's validators after a successful run."""
+    if search_resp is not None:
+        http_cache.save_validators(scraper_id, search_url(organisation), search_resp)
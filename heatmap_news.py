@@ -1,12 +1,8 @@
 import os
-import time
 import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
-from curl_cffi import requests as cffi_requests
 from dotenv import load_dotenv
 
 from db import (
@@ -15,6 +11,8 @@ from db import (
     is_subscription_active,
     update_latest_timestamp,
 )
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -55,7 +53,7 @@ def fetch_sitemap() -> list[dict]:
     """Fetch the news sitemap and return list of {url, title, date}."""
     print(f"  📡 Fetching sitemap: {SITEMAP_URL}")
     try:
-        resp = requests.get(SITEMAP_URL, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(SITEMAP_URL, headers=HEADERS, proxies=PROXIES, timeout=30)
         resp.raise_for_status()
         root = ET.fromstring(resp.content)
     except Exception as e:
@@ -90,8 +88,7 @@ def fetch_sitemap() -> list[dict]:
 def scrape_article(url: str) -> str:
     """Scrape article body text from a Heatmap News article page."""
     try:
-        time.sleep(1)
-        resp = cffi_requests.get(
+        resp = http_client.cffi_get(
             url,
             impersonate="chrome131",
             proxies=PROXIES,
@@ -102,7 +99,7 @@ def scrape_article(url: str) -> str:
         print(f"  ❌ Failed to fetch article {url}: {e}")
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.parse(resp.text)
 
     body_el = soup.select_one("div.body")
     if not body_el:
@@ -176,7 +173,7 @@ def main():
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted = insert_articles(articles)
+    inserted = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted} articles into database.")
 
     # Update timestamp to the newest article date seen
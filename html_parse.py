@@ -0,0 +1,266 @@
+"""
+Shared HTML parsing facade.
+
+Scrapers used to build BeautifulSoup(html, "html.parser") trees, the
+slowest backend bs4 has. Two entry points replace that:
+
+    soup = html_parse.soup(html)        # compatibility path: a real BeautifulSoup
+                                        # tree built by lxml (find_all, .string,
+                                        # find_next_sibling... all still work)
+
+    doc = html_parse.parse(html)        # fast path: selectolax (lexbor) when
+    title = doc.select_one("h1")        # installed, otherwise the lxml-built soup
+    if title:
+        print(title.get_text(" ", strip=True))
+    for noise in doc.select("script, style"):
+        noise.decompose()
+
+parse() returns a Node exposing only what the scrapers' hot paths use —
+select(), select_one(), get_text(), get(), [attr], attrs, decompose() — with the
+same names and semantics as bs4, so a scrape function switches over by
+changing the line that builds the tree. Code that needs anything else
+stays on soup(). Both backends are optional; the module falls back to
+html.parser when lxml is missing.
+
+For documents that can be very large, pass a stream=True response instead
+of its text: read_capped(resp, max_bytes) stops downloading at the cap, and
+stream_text(resp, max_bytes, max_chars) feeds chunks to an incremental
+parser and stops as soon as enough text has been collected.
+"""
+
+import importlib.util
+
+# Checked without importing lxml; bs4 itself is imported on first use so
+# importing this module (main.py → browser_pool) stays cheap
+SOUP_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Text inside these never counts as page text (bs4 skips it too)
+_SKIP_TEXT_PARENTS = {"script", "style", "template", "noscript"}
+
+
+def soup(markup):
+    """Parse markup into a BeautifulSoup tree with the fastest available builder."""
+    from bs4 import BeautifulSoup
+
+    if markup is None:
+        markup = ""
+    return BeautifulSoup(markup, SOUP_PARSER)
+
+
+def _selectolax_parser():
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        return None
+    return LexborHTMLParser
+
+
+class Node:
+    """bs4-compatible subset over either a selectolax node or a bs4 Tag."""
+
+    __slots__ = ("_node", "_fast")
+
+    def __init__(self, node, fast):
+        self._node = node
+        self._fast = fast
+
+    def __bool__(self):
+        return self._node is not None
+
+    @property
+    def name(self):
+        return self._node.tag if self._fast else self._node.name
+
+    @property
+    def attrs(self):
+        return dict(self._node.attributes) if self._fast else self._node.attrs
+
+    def __getitem__(self, key):
+        value = self.attrs.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self.attrs.get(key)
+        return default if value is None else value
+
+    def select(self, css):
+        if self._fast:
+            return [Node(n, True) for n in self._node.css(css)]
+        return [Node(n, False) for n in self._node.select(css)]
+
+    def select_one(self, css):
+        found = self._node.css_first(css) if self._fast else self._node.select_one(css)
+        return Node(found, self._fast) if found is not None else None
+
+    def get_text(self, separator="", strip=False):
+        if not self._fast:
+            return self._node.get_text(separator, strip=strip)
+
+        parts = []
+        for node in self._node.traverse(include_text=True):
+            if node.tag != "-text" or (node.parent and node.parent.tag in _SKIP_TEXT_PARENTS):
+                continue
+            text = node.text_content or ""
+            if strip:
+                text = text.strip()
+                if not text:
+                    continue
+            parts.append(text)
+        return separator.join(parts)
+
+    def decompose(self):
+        # lexbor only unlinks removed nodes (the document owns their memory),
+        # so decomposing a node nested inside one already removed is safe
+        self._node.decompose()
+
+    @property
+    def html(self):
+        return self._node.html if self._fast else str(self._node)
+
+
+def parse(markup):
+    """Parse markup for the fast path (see module docstring)."""
+    parser = _selectolax_parser()
+    if parser is None:
+        # bs4 sniffs the encoding of bytes itself
+        return Node(soup(markup), False)
+
+    if isinstance(markup, bytes):
+        markup = markup.decode("utf-8", errors="replace")
+    return Node(parser(markup or "").root, True)
+
+
+# ----------------------------------------------------------
+# Size-capped streaming (documents that can be megabytes)
+# ----------------------------------------------------------
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Text inside these is never document text; the head only holds metadata
+_SKIP_STREAM_TAGS = _SKIP_TEXT_PARENTS | {"head", "title"}
+
+
+def _iter_chunks(resp, max_bytes):
+    """Yield body chunks of a stream=True response until max_bytes have been read."""
+    read = 0
+    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        if not chunk:
+            continue
+        if read + len(chunk) > max_bytes:
+            yield chunk[:max_bytes - read]
+            return
+        read += len(chunk)
+        yield chunk
+
+
+def _decoder(resp):
+    import codecs
+
+    try:
+        return codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def read_capped(resp, max_bytes):
+    """
+    Read at most max_bytes of a stream=True response's body and return it
+    decoded; the connection is closed without downloading the rest. The
+    truncated markup parses fine with parse()/soup() — only what was never
+    received is missing.
+    """
+    decoder = _decoder(resp)
+    parts = []
+    try:
+        for chunk in _iter_chunks(resp, max_bytes):
+            parts.append(decoder.decode(chunk))
+    finally:
+        resp.close()
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+class _TextCollector:
+    """Parser target collecting document text until max_chars, outside _SKIP_STREAM_TAGS."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.parts = []
+        self.chars = 0
+        self.skip_depth = 0
+
+    @property
+    def done(self):
+        return self.chars >= self.max_chars
+
+    def start(self, tag, attrs=None):
+        # Element boundaries separate words, like get_text(" ")
+        self.parts.append(" ")
+        if tag.lower() in _SKIP_STREAM_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        self.parts.append(" ")
+        if tag.lower() in _SKIP_STREAM_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        # A text node can arrive in several pieces when it spans chunks
+        if self.skip_depth or self.done:
+            return
+        self.parts.append(data)
+        self.chars += len(data)
+
+    def close(self):
+        return " ".join("".join(self.parts).split())[:self.max_chars]
+
+
+def _feed_parser(collector):
+    """Incremental HTML parser driving the collector: lxml's C parser, else html.parser."""
+    try:
+        from lxml import etree
+    except ImportError:
+        from html.parser import HTMLParser
+
+        class _Parser(HTMLParser):
+            def handle_starttag(self, tag, attrs):
+                collector.start(tag)
+
+            def handle_endtag(self, tag):
+                collector.end(tag)
+
+            def handle_data(self, data):
+                collector.data(data)
+
+            def close(self):
+                # Don't flush a tag cut off by the byte cap as text
+                pass
+
+        return _Parser(convert_charrefs=True)
+    return etree.HTMLParser(target=collector)
+
+
+def stream_text(resp, max_bytes, max_chars):
+    """
+    Extract the text of a stream=True response incrementally. Chunks are fed
+    to the parser as they arrive, and reading stops once max_chars of text
+    were collected or max_bytes were read, so memory and transfer are
+    bounded whatever the document size. Returns the collected text.
+    """
+    collector = _TextCollector(max_chars)
+    parser = _feed_parser(collector)
+    decoder = _decoder(resp)
+    try:
+        for chunk in _iter_chunks(resp, max_bytes):
+            parser.feed(decoder.decode(chunk))
+            if collector.done:
+                break
+    finally:
+        resp.close()
+    try:
+        parser.close()
+    except Exception:
+        # lxml raises on a document cut off mid-way; the text is still there
+        pass
+    return collector.close()
@@ -1,9 +1,10 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import os
 from datetime import datetime
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 MAIN_SITEMAP = "https://htn.co.uk/wp-sitemap.xml"
 SOURCE_NAME = "HTN_CO"
@@ -35,8 +36,8 @@ def _parse_htn_date(raw: str) -> str:
 # Scrape a single article
 # ----------------------------------------------------------
 def scrape_article(url):
-    resp = requests.get(url, headers=headers)
-    soup = BeautifulSoup(resp.text, "html.parser")
+    resp = http_client.get(url, headers=headers)
+    soup = html_parse.soup(resp.text)
 
     title_tag = soup.find("h1", class_="entry-title")
     date_tag = soup.find("time", class_="entry-date")
@@ -75,7 +76,7 @@ def scrape_article(url):
 # Get the latest "post" sitemap
 # ----------------------------------------------------------
 def get_latest_post_sitemap():
-    resp = requests.get(MAIN_SITEMAP, headers=headers)
+    resp = http_client.get(MAIN_SITEMAP, headers=headers)
     soup = BeautifulSoup(resp.text, "xml")
 
     links = []
@@ -95,7 +96,7 @@ def get_latest_post_sitemap():
 # Read article URLs + lastmod timestamps
 # ----------------------------------------------------------
 def get_articles_from_sitemap(sitemap_url):
-    resp = requests.get(sitemap_url, headers=headers)
+    resp = http_client.get(sitemap_url, headers=headers)
     soup = BeautifulSoup(resp.text, "xml")
 
     articles = []
@@ -167,7 +168,7 @@ def main():
         # Insert articles into database
         if scraped_articles:
             company_articles = [dict(a, company_id=company_id) for a in scraped_articles]
-            inserted_count = insert_articles(company_articles)
+            inserted_count = insert_articles(company_articles, dedupe_near=True)
             print(f"✅ Inserted {inserted_count} articles for {label}")
 
         # Update timestamp
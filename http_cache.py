@@ -0,0 +1,121 @@
+"""
+On-disk HTTP validator cache for conditional requests.
+
+Sitemaps and listing feeds are re-downloaded on every scheduled run even when
+nothing has changed. This module stores each URL's ETag / Last-Modified per
+scraper so the next fetch can send If-None-Match / If-Modified-Since and get
+a body-less 304 back.
+
+Usage:
+
+    cache_headers = http_cache.validator_headers(SCRAPER_ID, SITEMAP_URL)
+    resp = http_client.get(SITEMAP_URL, headers={**HEADERS, **cache_headers})
+    if http_cache.is_not_modified(resp):
+        return  # nothing new
+    ... parse, scrape, insert ...
+    http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, resp)
+
+Validators are only saved once the response has been fully processed, so a
+run that crashes half-way re-downloads the document next time.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+CACHE_PATH = CACHE_DIR / "http_cache.sqlite3"
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    if not _initialized:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_validators (
+                scraper_id    INTEGER NOT NULL,
+                url           TEXT NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                updated_at    TEXT NOT NULL,
+                PRIMARY KEY (scraper_id, url)
+            )
+            """
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def validator_headers(scraper_id, url):
+    """
+    Return the conditional request headers for a URL (empty dict if the URL
+    has never been fetched successfully by this scraper).
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT etag, last_modified FROM http_validators WHERE scraper_id = ? AND url = ?",
+                    (int(scraper_id), url),
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  HTTP cache read failed: {e}")
+        return {}
+
+    if not row:
+        return {}
+
+    etag, last_modified = row
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def is_not_modified(resp):
+    """True if the server answered a conditional request with 304 Not Modified."""
+    return resp is not None and resp.status_code == 304
+
+
+def save_validators(scraper_id, url, resp):
+    """Store the ETag / Last-Modified of a processed 200 response."""
+    if resp is None or resp.status_code != 200:
+        return
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO http_validators (scraper_id, url, etag, last_modified, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (scraper_id, url) DO UPDATE SET
+                        etag = excluded.etag,
+                        last_modified = excluded.last_modified,
+                        updated_at = excluded.updated_at
+                    """,
+                    (int(scraper_id), url, etag, last_modified, datetime.utcnow().isoformat()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  HTTP cache write failed: {e}")
@@ -0,0 +1,100 @@
+"""
+Shared pooled HTTP client used by every scraper.
+
+Module-level requests.get / cffi_requests.get open a fresh TCP+TLS connection
+per call, which is expensive through the SCRAPER_PROXY gateway. This module
+keeps long-lived sessions instead, so the handshake is paid once per host per
+run:
+
+- get() / post()           plain `requests`, one Session shared by all threads
+                           (urllib3 connection pools are thread-safe)
+- cffi_get() / cffi_post() curl_cffi browser impersonation, one Session per
+                           thread and impersonation target (curl handles are
+                           not thread-safe)
+
+Every call goes through rate_limiter.throttle() for the target URL unless
+rate_limit=False is passed (e.g. Scrappey API calls, which throttle the
+page they proxy for instead).
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import throttle
+
+DEFAULT_IMPERSONATE = "chrome131"
+
+# Connections kept alive per host; should cover the largest scraper thread pool
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 20
+
+_session = None
+_session_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_proxies():
+    """Return the SCRAPER_PROXY mapping, or None when no proxy is configured."""
+    proxy = os.getenv("SCRAPER_PROXY")
+    return {"http": proxy, "https": proxy} if proxy else None
+
+
+def get_session():
+    """Return the process-wide pooled requests.Session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def get_cffi_session(impersonate=DEFAULT_IMPERSONATE):
+    """Return this thread's curl_cffi Session for the given impersonation target."""
+    sessions = getattr(_local, "cffi_sessions", None)
+    if sessions is None:
+        sessions = _local.cffi_sessions = {}
+    session = sessions.get(impersonate)
+    if session is None:
+        # Imported lazily so requests-only scrapers don't need curl_cffi loaded
+        from curl_cffi import requests as cffi_requests
+
+        session = sessions[impersonate] = cffi_requests.Session(impersonate=impersonate)
+    return session
+
+
+def request(method, url, rate_limit=True, **kwargs):
+    """Send a request through the shared requests.Session."""
+    if rate_limit:
+        throttle(url)
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, rate_limit=True, **kwargs):
+    return request("GET", url, rate_limit=rate_limit, **kwargs)
+
+
+def post(url, rate_limit=True, **kwargs):
+    return request("POST", url, rate_limit=rate_limit, **kwargs)
+
+
+def cffi_request(method, url, impersonate=DEFAULT_IMPERSONATE, rate_limit=True, **kwargs):
+    """Send a request through this thread's curl_cffi Session."""
+    if rate_limit:
+        throttle(url)
+    return get_cffi_session(impersonate).request(method, url, **kwargs)
+
+
+def cffi_get(url, impersonate=DEFAULT_IMPERSONATE, rate_limit=True, **kwargs):
+    return cffi_request("GET", url, impersonate=impersonate, rate_limit=rate_limit, **kwargs)
+
+
+def cffi_post(url, impersonate=DEFAULT_IMPERSONATE, rate_limit=True, **kwargs):
+    return cffi_request("POST", url, impersonate=impersonate, rate_limit=rate_limit, **kwargs)
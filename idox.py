@@ -0,0 +1,420 @@
+"""
+Shared engine for Idox Public Access planning portals.
+
+Council planning portals built on Idox (…/online-applications/) all work
+the same way: GET the search form for its tokens, POST a monthly list
+search, page through the results, then read each application's
+applicationDetails.do?activeTab=printPreview page. Each council module only
+describes its portal:
+
+    PORTAL = {
+        "label": "Greater Cambridge",
+        "base_url": "https://applications.greatercambridgeplanning.org",
+        "scraper_id": SCRAPER_ID,
+        "company_id": COMPANY_ID,
+        "section_heading": "h1",        # tag heading each details table
+        "search_fields": {"searchCriteria.localAuthority": ""},  # optional
+    }
+
+    def main():
+        idox.run(PORTAL)
+
+Optional keys: "date_types" (default DC_Validated and DC_Decided),
+"results_per_page" (default 50) and "verify_ssl" (default False; several
+portals serve incomplete certificate chains).
+
+The date types are searched in parallel, one session each, because the
+search state lives in the session. Print-preview pages are then fetched
+concurrently over the session that found them, at plain-HTTP speed
+within the host's rate_limiter budget. Only pages that come back
+challenged (adaptive_fetch.block_reason) are re-fetched through Scrappey.
+After CHALLENGE_LIMIT challenged pages in a run the portal is clearly
+blocking plain requests, so the remaining pages go straight to Scrappey.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from db import get_known_article_urls, insert_articles
+from rate_limiter import throttle
+import adaptive_fetch
+import html_parse
+import scrappey_client
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_DATE_TYPES = ("DC_Validated", "DC_Decided")
+DEFAULT_RESULTS_PER_PAGE = 50
+
+MAX_WORKERS = int(os.getenv("IDOX_MAX_WORKERS", "8"))
+CHALLENGE_LIMIT = 3
+SCRAPPEY_RETRIES = 3
+
+# Marker the print-preview parser needs; a page without it is a challenge
+PRINT_PREVIEW_MARKER = "popupContainer"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
+}
+FORM_HEADERS = HEADERS | {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+# ----------------------------------------------------------
+# Portal URLs
+# ----------------------------------------------------------
+def _url(portal, path):
+    return f"{portal['base_url']}/online-applications/{path}"
+
+
+def details_url(portal, key_val, tab="summary"):
+    return _url(portal, f"applicationDetails.do?activeTab={tab}&keyVal={key_val}")
+
+
+def url_slug(url: str) -> str:
+    """Extract keyVal from a planning portal URL as a dedup key."""
+    for part in url.split("&"):
+        if part.startswith("keyVal="):
+            return part.split("=", 1)[1]
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def current_month_label() -> str:
+    """Return month label in the format the site expects, e.g. 'Apr 26'."""
+    now = datetime.now()
+    return now.strftime("%b") + " " + now.strftime("%y")
+
+
+# ----------------------------------------------------------
+# Search session
+# ----------------------------------------------------------
+def make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _request(session, portal, method, url, **kwargs):
+    throttle(url)
+    return session.request(
+        method, url, timeout=30, verify=portal.get("verify_ssl", False), **kwargs
+    )
+
+
+def get_tokens(html: str) -> tuple[str, str]:
+    """Extract _csrf and org.apache.struts.taglib.html.TOKEN from page HTML."""
+    soup = html_parse.soup(html)
+    csrf_tag = soup.find("input", {"name": lambda n: n and ("csrf" in n.lower() or "token" in n.lower())})
+    csrf = csrf_tag.get("value", "") if csrf_tag else ""
+    if not csrf:
+        meta = soup.find("meta", {"name": lambda n: n and "csrf" in n.lower()})
+        csrf = meta.get("content", "") if meta else ""
+    struts_tag = soup.find("input", {"name": "org.apache.struts.taglib.html.TOKEN"})
+    struts = struts_tag.get("value", "") if struts_tag else ""
+    return csrf, struts
+
+
+def init_search(session: requests.Session, portal: dict, date_type: str) -> str:
+    """GET the search form for its tokens, then POST the monthly list search. Returns the csrf token."""
+    r = _request(session, portal, "GET", _url(portal, "search.do?action=monthlyList"), headers=HEADERS)
+    r.raise_for_status()
+    csrf, struts = get_tokens(r.text)
+
+    form_data = {
+        "action": "firstPage",
+        "org.apache.struts.taglib.html.TOKEN": struts,
+        "_csrf": csrf,
+        **portal.get("search_fields", {}),
+        "searchCriteria.parish": "",
+        "searchCriteria.ward": "",
+        "month": current_month_label(),
+        "dateType": date_type,
+        "searchType": "Application",
+    }
+    r2 = _request(
+        session, portal, "POST",
+        _url(portal, "monthlyListResults.do?action=firstPage"),
+        data=form_data,
+        headers=FORM_HEADERS,
+    )
+    r2.raise_for_status()
+    # Re-extract csrf from response in case it rotated
+    csrf2, _ = get_tokens(r2.text)
+    return csrf2 or csrf
+
+
+def fetch_page(session: requests.Session, portal: dict, csrf: str, page: int) -> str | None:
+    """POST to pagedSearchResults.do. Returns None on a 500 (no results for this period)."""
+    r = _request(
+        session, portal, "POST",
+        _url(portal, "pagedSearchResults.do"),
+        data={
+            "_csrf": csrf,
+            "searchCriteria.page": page,
+            "action": "page",
+            "orderBy": "DateReceived",
+            "orderByDirection": "Descending",
+            "searchCriteria.resultsPerPage": portal.get("results_per_page", DEFAULT_RESULTS_PER_PAGE),
+        },
+        headers=FORM_HEADERS,
+    )
+    if r.status_code == 500:
+        return None
+    r.raise_for_status()
+    return r.text
+
+
+def parse_results(portal: dict, html: str) -> list[tuple[str, str, str]]:
+    """Parse a results page into (full_summary_url, key_val, description)."""
+    soup = html_parse.parse(html)
+    results = []
+    for li in soup.select("ul#searchresults li.searchresult"):
+        a = li.select_one("a.summaryLink")
+        if not a:
+            continue
+        href = a.get("href", "")
+        if not href:
+            continue
+        full_url = portal["base_url"] + href if href.startswith("/") else href
+        key_val = ""
+        for part in href.split("&"):
+            if "keyVal=" in part:
+                key_val = part.split("keyVal=")[-1]
+                break
+        desc_el = a.select_one("div.summaryLinkTextClamp")
+        description = desc_el.get_text(strip=True) if desc_el else a.get_text(strip=True)
+        if key_val:
+            results.append((full_url, key_val, description))
+    return results
+
+
+def search(portal: dict, date_type: str):
+    """Run one monthly list search on its own session. Returns (session, items)."""
+    session = make_session()
+    print(f"  Step: Initialising session + submitting search ({date_type})...")
+    csrf = init_search(session, portal, date_type)
+
+    html = fetch_page(session, portal, csrf, page=1)
+    if html is None:
+        print(f"  ⛔ No results for {date_type} this period, moving on.")
+        return session, []
+
+    items = parse_results(portal, html)
+    print(f"  📄 {date_type}: {len(items)} application(s) found.")
+    return session, items
+
+
+# ----------------------------------------------------------
+# Print preview pages
+# ----------------------------------------------------------
+def parse_print_preview(portal: dict, html: str, key_val: str):
+    """Return (title, date, body) from a print-preview page, or Nones if it has no details."""
+    soup = html_parse.soup(html)
+
+    container = soup.select_one("div#popupContainer")
+    if not container:
+        return None, None, None
+
+    # Remove noisy elements
+    for el in container.select("script, style, img"):
+        el.decompose()
+
+    rows = []
+    for tr in container.select("table#simpleDetailsTable tr"):
+        th = tr.select_one("th")
+        td = tr.select_one("td")
+        if th and td:
+            rows.append((th.get_text(), td.get_text(strip=True)))
+
+    # Title = Proposal field from the summary table
+    title = next((value for key, value in rows if "Proposal" in key), "")
+    if not title:
+        h2 = container.select_one("h2")
+        title = h2.get_text(strip=True) if h2 else key_val
+
+    # Date = Application Received from summary table
+    date = ""
+    for key, raw in rows:
+        if "Application Received" in key and "Date" not in key:
+            # e.g. "Mon 13 Apr 2026" → "2026-04-13T00:00:00"
+            try:
+                date = datetime.strptime(raw, "%a %d %b %Y").strftime("%Y-%m-%dT%H:%M:%S")
+            except ValueError:
+                date = raw
+            break
+
+    # Body = all table rows as key: value lines, per section
+    lines = []
+    for heading in container.select(portal.get("section_heading", "h1")):
+        lines.append(f"\n=== {heading.get_text(strip=True)} ===")
+        table = heading.find_next("table")
+        if table:
+            for tr in table.select("tr"):
+                th = tr.select_one("th")
+                td = tr.select_one("td")
+                if th and td:
+                    k = th.get_text(strip=True)
+                    v = td.get_text(strip=True)
+                    if v:
+                        lines.append(f"{k}: {v}")
+
+    return title, date, "\n".join(lines).strip()
+
+
+def fetch_print_preview_scrappey(url: str) -> str | None:
+    """Fetch a challenged print-preview page through Scrappey (captcha solving)."""
+    if not os.getenv("SCRAPPEY_API_KEY"):
+        print("  ⚠️  SCRAPPEY_API_KEY not set — cannot retry challenged page")
+        return None
+
+    payload = {
+        "cmd": "request.get",
+        "url": url,
+        "premiumProxy": True,
+        "retries": 1,
+        "automaticallySolveCaptcha": True,
+        "browserActions": [
+            {"type": "wait_for_load_state", "waitForLoadState": "networkidle"},
+            {"type": "wait", "wait": 1500, "when": "after_captcha"},
+        ],
+    }
+    for attempt in range(SCRAPPEY_RETRIES):
+        try:
+            data = scrappey_client.request(payload, timeout=90)
+            html = data.get("solution", {}).get("response", "")
+            if not html:
+                raise RuntimeError("Empty Scrappey response")
+            return html
+        except Exception as e:
+            if attempt < SCRAPPEY_RETRIES - 1:
+                print(f"  ⚠️  Scrappey retry {attempt + 1}/{SCRAPPEY_RETRIES} for {url}: {e}")
+                scrappey_client.backoff(attempt)
+            else:
+                print(f"  ❌ Scrappey failed for {url}: {e}")
+    return None
+
+
+class _Challenges:
+    """Thread-safe count of challenged pages in one run."""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self):
+        with self.lock:
+            self.count += 1
+
+    @property
+    def blocking(self):
+        return self.count >= CHALLENGE_LIMIT
+
+
+def scrape_print_preview(session, portal, key_val, challenges):
+    """Fetch and parse one print-preview page. Returns (title, date, body) or Nones."""
+    url = details_url(portal, key_val, tab="printPreview")
+
+    html = None
+    if not challenges.blocking:
+        try:
+            resp = _request(session, portal, "GET", url, headers=HEADERS)
+            reason = adaptive_fetch.block_reason(
+                resp.status_code, resp.text, accept=lambda h: PRINT_PREVIEW_MARKER in h
+            )
+            if reason:
+                print(f"  ⚠️  {key_val} challenged ({reason}) — retrying via Scrappey")
+                challenges.add()
+            elif resp.status_code >= 400:
+                print(f"  ❌ HTTP {resp.status_code} for {key_val}")
+                return None, None, None
+            else:
+                html = resp.text
+        except requests.RequestException as e:
+            print(f"  ⚠️  Fetch failed for {key_val} ({e}) — retrying via Scrappey")
+
+    if html is None:
+        html = fetch_print_preview_scrappey(url)
+        if html is None:
+            return None, None, None
+
+    return parse_print_preview(portal, html, key_val)
+
+
+# ----------------------------------------------------------
+# Run
+# ----------------------------------------------------------
+def run(portal: dict) -> None:
+    label = portal["label"]
+    scraper_id = portal["scraper_id"]
+    print(f"🔍 Fetching {label} planning applications...")
+
+    known_urls = get_known_article_urls(scraper_id)
+    print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
+    seen_slugs = {url_slug(u) for u in known_urls}
+
+    # One session per date type — the search state lives in the session
+    date_types = portal.get("date_types", DEFAULT_DATE_TYPES)
+    with ThreadPoolExecutor(max_workers=len(date_types)) as executor:
+        searches = list(executor.map(lambda dt: search(portal, dt), date_types))
+
+    new_items = []
+    for session, items in searches:
+        for full_url, key_val, description in items:
+            if full_url in known_urls or key_val in seen_slugs:
+                print(f"  ⏭️  Skipping (already in DB): {key_val}")
+                continue
+            new_items.append((session, full_url, key_val))
+            seen_slugs.add(key_val)
+
+    if not new_items:
+        print("\n⛔ No new applications found.")
+        return
+
+    print(f"  🆕 {len(new_items)} new application(s) to scrape.")
+
+    challenges = _Challenges()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(
+            lambda item: scrape_print_preview(item[0], portal, item[2], challenges),
+            new_items,
+        ))
+
+    articles = []
+    for (_, full_url, key_val), (title, date, body) in zip(new_items, results):
+        if title is None:
+            continue
+        articles.append({
+            "url": full_url,
+            "date": date,
+            "title": title,
+            "text": body,
+            "company_id": portal["company_id"],
+            "scraper_id": scraper_id,
+        })
+        print(f"  ✅ {title[:60]}...")
+
+    elapsed = time.monotonic() - started
+    print(f"  ⏱️  {len(new_items)} page(s) in {elapsed:.1f}s, {challenges.count} challenged")
+
+    if not articles:
+        print("\n⛔ No applications scraped successfully.")
+        return
+
+    print(f"\n🆕 Found {len(articles)} new application(s) in total.")
+    inserted_count = insert_articles(articles)
+    print(f"✅ Inserted {inserted_count} applications into database")
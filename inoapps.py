@@ -7,6 +7,8 @@ from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -54,8 +56,7 @@ def is_insight_article(url):
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
             resp.raise_for_status()
             return resp.text
         except requests.RequestException as e:
@@ -96,7 +97,7 @@ def scrape_article(entry):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     for tag in soup.select("script, style, iframe"):
         tag.decompose()
@@ -3,11 +3,11 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -50,8 +50,7 @@ def fetch_with_cffi(url, max_retries=MAX_RETRIES):
     proxies = get_proxies()
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 headers=HEADERS,
                 impersonate="chrome131",
@@ -75,7 +74,7 @@ def url_slug(url):
 
 def parse_listing_html(html):
     """Extract article links and titles from a listing page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     items = []
     seen = set()
 
@@ -101,7 +100,7 @@ def scrape_article(url, fallback_title=""):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     article = soup.find("article", class_="article")
     if not article:
@@ -159,7 +158,7 @@ def scrape_article(url, fallback_title=""):
 def main():
     print("🔍 Fetching Insider Media listings...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
@@ -239,7 +238,7 @@ def main():
             continue
 
         company_articles = [dict(a, company_id=company_id) for a in all_articles]
-        inserted_count = insert_articles(company_articles)
+        inserted_count = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted_count} articles for {label}")
 
 
@@ -1,18 +1,18 @@
 import os
 import json
-import time
-from bs4 import BeautifulSoup
-import requests as std_requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import scrappey_client
+import html_parse
 
 load_dotenv()
 
 LISTING_URL = "https://www.jisc.ac.uk/intelligence-ideas-insights"
 BASE_URL = "https://www.jisc.ac.uk"
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 SOURCE_NAME = "JISC"
 SCRAPER_ID = 46
+MAX_WORKERS = 5
 
 COMPANY_CONFIGS = [
     {
@@ -23,8 +23,7 @@ COMPANY_CONFIGS = [
 
 def fetch_next_data(url, max_retries=3):
     """Fetch a page via Scrappey and extract the __NEXT_DATA__ JSON."""
-    api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not api_key:
+    if not os.getenv("SCRAPPEY_API_KEY"):
         raise RuntimeError("SCRAPPEY_API_KEY not set")
 
     payload = {
@@ -39,20 +38,13 @@ def fetch_next_data(url, max_retries=3):
 
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = std_requests.post(
-                f"{SCRAPPEY_API_URL}?key={api_key}",
-                json=payload,
-                timeout=60,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = scrappey_client.request(payload, timeout=60)
             solution = data.get("solution", {})
             html = solution.get("response", "")
             if not html:
                 raise RuntimeError("Empty Scrappey response")
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = html_parse.soup(html)
             script_tag = soup.find("script", {"id": "__NEXT_DATA__"})
             if not script_tag:
                 raise RuntimeError("__NEXT_DATA__ script tag not found")
@@ -60,7 +52,7 @@ def fetch_next_data(url, max_retries=3):
         except Exception as e:
             if attempt < max_retries - 1:
                 print(f"⚠️  Retry {attempt + 1}/{max_retries} for {url}: {e}")
-                time.sleep(2)
+                scrappey_client.backoff(attempt)
             else:
                 print(f"❌ Failed after {max_retries} attempts: {e}")
                 return None
@@ -68,7 +60,7 @@ def fetch_next_data(url, max_retries=3):
 
 def clean_html(html):
     """Strip HTML tags and return clean text."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     text = soup.get_text(" ", strip=True)
     return " ".join(text.split())
 
@@ -175,10 +167,15 @@ def main():
 
         print(f"🆕 Found {len(new_entries)} new articles.")
 
-        scraped_articles = []
-        for entry in new_entries:
+        def scrape_one(entry):
             print("Scraping:", entry["url"])
-            article = scrape_article(entry["url"])
+            return scrape_article(entry["url"])
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = list(executor.map(scrape_one, new_entries))
+
+        scraped_articles = []
+        for entry, article in zip(new_entries, results):
             if article:
                 article["lastmod"] = entry["first_published_at"]
                 scraped_articles.append(article)
@@ -3,11 +3,13 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_cache
+import http_client
+import html_parse
+from sitemap_stream import iter_sitemap, response_stream
 
 load_dotenv()
 
@@ -31,9 +33,6 @@ HEADERS = {
 PROXY = os.getenv("SCRAPER_PROXY")
 PROXIES = {"http": PROXY, "https": PROXY} if PROXY else None
 
-NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-
-
 def parse_lastmod(lastmod_str):
     """Convert lastmod to YYYY-MM-DDTHH:MM:SS format."""
     if not lastmod_str:
@@ -45,16 +44,16 @@ def parse_lastmod(lastmod_str):
         return None
 
 
-def fetch_url(url, max_retries=3):
+def fetch_url(url, max_retries=3, extra_headers=None, stream=False):
     """Fetch URL content with retries."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(
+            resp = http_client.get(
                 url,
-                headers=HEADERS,
+                headers={**HEADERS, **(extra_headers or {})},
                 proxies=PROXIES,
                 timeout=60,
+                stream=stream,
             )
             resp.raise_for_status()
             return resp
@@ -66,44 +65,51 @@ def fetch_url(url, max_retries=3):
     return None
 
 
-def parse_sitemap(xml_content):
-    """Parse sitemap XML and return list of (url, lastmod) tuples."""
-    import xml.etree.ElementTree as ET
-
-    root = ET.fromstring(xml_content)
-    entries = []
-
-    for url_elem in root.findall("sm:url", NS):
-        loc = url_elem.find("sm:loc", NS)
-        lastmod = url_elem.find("sm:lastmod", NS)
-
-        if loc is None:
-            continue
-
-        url = loc.text.strip()
-
-        # Only include insights articles
-        if "/our-insights/" not in url:
-            continue
-
-        lastmod_str = lastmod.text if lastmod is not None else ""
-        lastmod_normalized = parse_lastmod(lastmod_str)
-
-        if lastmod_normalized:
-            entries.append({"url": url, "lastmod": lastmod_normalized})
+def parse_sitemap(stream, since=None):
+    """
+    Stream-parse the sitemap and return insights entries newer than `since`
+    as {url, lastmod} dicts.
+    """
+    # Only include insights articles
+    entries = [
+        {"url": url, "lastmod": lastmod}
+        for url, lastmod in iter_sitemap(
+            stream,
+            path_contains="/our-insights/",
+            since=since,
+            normalize_lastmod=parse_lastmod,
+        )
+    ]
 
     # Sort by lastmod descending (newest first)
     entries.sort(key=lambda x: x["lastmod"], reverse=True)
     return entries
 
 
-def scrape_article(url):
-    """Scrape individual article page."""
-    resp = fetch_url(url)
+def scrape_article(url, fetched=None):
+    """
+    Scrape individual article page. The page is fetched conditionally; an
+    unchanged page (304) returns None. Each downloaded page whose processing
+    finished — article or not — is appended to `fetched` as (url, response)
+    so main() can save its validators at the end of the run.
+    """
+    resp = fetch_url(url, extra_headers=http_cache.validator_headers(SCRAPER_ID, url))
     if not resp:
         return None
+    if http_cache.is_not_modified(resp):
+        print(f"[KPMG] Unchanged since last scrape: {url}")
+        return None
+
+    article = parse_article(resp.content)
+    # Hub and listing pages are remembered too, so they cost a 304 next time
+    if fetched is not None:
+        fetched.append((url, resp))
+    return article
+
 
-    soup = BeautifulSoup(resp.content, "html.parser")
+def parse_article(content):
+    """Extract {title, content} from an article page, or None for hub/listing pages."""
+    soup = html_parse.parse(content)
 
     # Only scrape real articles — hub/listing pages lack a hero title
     hero_title = soup.select_one(".cmp-hero-csi__title")
@@ -141,27 +147,24 @@ def main():
 
     print("[KPMG] Starting KPMG scraper...")
 
-    # Fetch sitemap
-    sitemap_resp = fetch_url(SITEMAP_URL)
+    # Fetch sitemap (conditional — a 304 means nothing changed since last run)
+    cache_headers = http_cache.validator_headers(SCRAPER_ID, SITEMAP_URL)
+    sitemap_resp = fetch_url(SITEMAP_URL, extra_headers=cache_headers, stream=True)
     if not sitemap_resp:
         print("[KPMG] Failed to fetch sitemap")
         return
-
-    # Parse sitemap
-    entries = parse_sitemap(sitemap_resp.content)
-    print(f"[KPMG] Found {len(entries)} insights articles")
-
-    if not entries:
+    if http_cache.is_not_modified(sitemap_resp):
+        sitemap_resp.close()
+        print("[KPMG] Sitemap unchanged since last run — no new articles.")
         return
 
     # Get latest timestamp from DB
     latest_timestamp = get_latest_timestamp(SCRAPER_ID, COMPANY_ID)
     print(f"[KPMG] Latest timestamp: {latest_timestamp}")
 
-    # Filter entries newer than latest timestamp
-    new_entries = [
-        e for e in entries if latest_timestamp is None or e["lastmod"] > latest_timestamp
-    ]
+    # Parse sitemap — entries at or below the timestamp are dropped while streaming
+    with sitemap_resp:
+        new_entries = parse_sitemap(response_stream(sitemap_resp), since=latest_timestamp)
     print(f"[KPMG] New articles to scrape: {len(new_entries)}")
 
     # First run - only update timestamp, don't insert
@@ -170,15 +173,17 @@ def main():
             newest_timestamp = new_entries[0]["lastmod"]
             update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
             print(f"[KPMG] First run - timestamp updated to {newest_timestamp}")
+        http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, sitemap_resp)
         return
 
     # Scrape new articles
     articles_to_insert = []
+    fetched_pages = []
     newest_timestamp = new_entries[0]["lastmod"] if new_entries else None
 
     with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
         future_to_entry = {
-            executor.submit(scrape_article, entry["url"]): entry for entry in new_entries
+            executor.submit(scrape_article, entry["url"], fetched_pages): entry for entry in new_entries
         }
 
         for future in as_completed(future_to_entry):
@@ -202,11 +207,16 @@ def main():
         insert_articles(articles_to_insert, COMPANY_ID, SCRAPER_ID)
         print(f"[KPMG] Inserted {len(articles_to_insert)} articles")
 
+    # Every processed page, including rejected hub/listing pages
+    for page_url, page_resp in fetched_pages:
+        http_cache.save_validators(SCRAPER_ID, page_url, page_resp)
+
     # Update timestamp
     if newest_timestamp:
         update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
         print(f"[KPMG] Timestamp updated to {newest_timestamp}")
 
+    http_cache.save_validators(SCRAPER_ID, SITEMAP_URL, sitemap_resp)
     print("[KPMG] Done.")
 
 
@@ -3,11 +3,11 @@ import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -37,8 +37,7 @@ def fetch_url(url, max_retries=3):
     proxies = get_proxies()
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = requests.get(url, headers=HEADERS, proxies=proxies, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, proxies=proxies, timeout=30)
             resp.raise_for_status()
             return resp.text
         except Exception as e:
@@ -88,7 +87,7 @@ def scrape_article(url, lastmod):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title
     h1 = soup.find("h1")
@@ -198,7 +197,7 @@ def main():
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted_count = insert_articles(all_articles)
+    inserted_count = insert_articles(all_articles, dedupe_near=True)
     print(f"✅ Inserted {inserted_count} articles into database")
 
     if newest_timestamp:
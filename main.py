@@ -1,81 +1,33 @@
 #!/usr/bin/env python3
 """
 Main scheduler script that runs all scrapers every hour.
-Executes scrapers sequentially and handles errors gracefully.
+Executes scrapers concurrently (one serial lane per target host)
+and handles errors gracefully.
 """
 
 import time
+import argparse
 import schedule
 from datetime import datetime
 import sys
 import traceback
 import io
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import notifier
 import db
+import browser_pool
+import scrappey_client
+from registry import SCRAPERS, DEFAULT_SCHEDULE_HOURS, find_scrapers, load_scraper
 
-# Import all scraper modules
-import digital_health
-import contract_finder
-import find_tender
-import htn_co
-import startups_co
-import ukri
-import eu_startups
-import businesscloud
-import htworld
-import energyvoice
-import marineindustrynews
-import themanufacturer
-import prnewswire
-import ukdefencejournal
-import consultancy_eu
-import consultancy_uk
-import erp_today
-import computable_nl
-import capgemini
-import oracle
-import deloitte
-import homes_england
-import bidstats
-import huntingdonshire
-import planning_inspectorate
-import eastcambs
-import greater_cambridge
-import cambridge_news
-import companies_house
-import thedrum
-import businesswire
-import marketingweek
-import prolificnorth
-import thegrocer
-import fca_news
-import finextra
-import cityam
-import lawgazette
-import datacenterdynamics
-import heatmap_news
-import utilitydive
-import boem
-import energy_gov
-import sec_gov
-import universitybusiness
-import jisc
-import ucisa
-import publictechnology
-import balderton
-import silicon_canals
-import tech_eu
-import inoapps
-import ey
-import kpmg
-import theengineer
-import adsgroup
-import business_live
-import clearwater
-import insidermedia
-import privateequitywire
+# Worker threads used by run_all_scrapers. Threads, not processes: run-level
+# state (Scrappey usage, pooled browsers, watermark and subscription caches)
+# lives in this process.
+SCRAPER_WORKERS = int(os.getenv("SCRAPER_WORKERS", "8"))
+
+# Pause between two scrapers that hit the same host
+HOST_DELAY_SECONDS = 5
 
 
 class TeeStream:
@@ -109,6 +61,7 @@ def run_scraper(scraper_name, scraper_function, scraper_module=None):
     Run a single scraper with error handling and logging.
     For single-company scrapers, pass the module so the subscription
     is_active check can be performed before running.
+    Returns the run status: "success", "failed" or "skipped".
     """
     # Check subscription status for single-company scrapers
     if scraper_module is not None:
@@ -117,8 +70,7 @@ def run_scraper(scraper_name, scraper_function, scraper_module=None):
         if scraper_id is not None and company_id is not None:
             if not db.is_subscription_active(scraper_id, company_id):
                 print(f"\n⏭️  Skipping {scraper_name} — subscription is inactive")
-                _run_results.append((scraper_name, "skipped"))
-                return
+                return "skipped"
 
     print("\n" + "=" * 80)
     print(f"🚀 Starting {scraper_name}")
@@ -128,21 +80,111 @@ def run_scraper(scraper_name, scraper_function, scraper_module=None):
     try:
         scraper_function()
         print(f"✅ {scraper_name} completed successfully")
-        _run_results.append((scraper_name, "success"))
+        status = "success"
     except Exception as e:
         print(f"❌ {scraper_name} failed with error:")
         print(f"Error: {str(e)}")
         traceback.print_exc()
         notifier.notify_error(scraper_name, e)
         print(f"Continuing with next scraper...")
-        _run_results.append((scraper_name, "failed"))
+        status = "failed"
 
     print("=" * 80)
+    return status
+
+
+def run_registered_scraper(entry):
+    """
+    Run one registry entry. The scraper module is imported only here, after
+    the subscription check for single-company scrapers has passed.
+    Returns the run status.
+    """
+    scraper_name = entry["name"]
+    company_env = entry.get("company_env")
+    if entry["single_company"] and company_env:
+        company_id = os.getenv(company_env)
+        if company_id and not db.is_subscription_active(entry["scraper_id"], company_id):
+            print(f"\n⏭️  Skipping {scraper_name} — subscription is inactive")
+            return "skipped"
+
+    try:
+        module = load_scraper(entry)
+    except Exception as e:
+        print(f"❌ {scraper_name} failed to import: {e}")
+        traceback.print_exc()
+        notifier.notify_error(scraper_name, e)
+        return "failed"
+
+    try:
+        return run_scraper(scraper_name, module.main)
+    finally:
+        flush_scraper_watermarks(scraper_name, entry["scraper_id"])
 
 
-def run_all_scrapers():
+def flush_scraper_watermarks(scraper_name, scraper_id=None):
+    """
+    Write the timestamps a scraper saved during its run in one bulk upsert.
+    Also runs after a failed scraper, so companies it finished are kept.
+    """
+    try:
+        db.flush_watermarks(scraper_id)
+    except Exception as e:
+        print(f"❌ Failed to save timestamps for {scraper_name}: {e}")
+        notifier.notify_error(scraper_name, e)
+
+
+def run_host_lane(lane):
+    """
+    Run every registry entry that targets one host, one after another.
+    Entries are plain dicts, so the lane can be sent to a worker process.
+    Returns a list of (name, status) tuples.
+    """
+    results = []
+    for i, entry in enumerate(lane):
+        if i > 0:
+            time.sleep(HOST_DELAY_SECONDS)
+        results.append((entry["name"], run_registered_scraper(entry)))
+    return results
+
+
+def run_scrapers_concurrently(entries):
+    """
+    Run registry entries in a worker pool. Entries sharing a host are grouped
+    into a single lane so politeness is kept per host; independent hosts run
+    in parallel. Results are appended to _run_results in registry order.
     """
-    Run all scrapers sequentially.
+    lanes = {}
+    for entry in entries:
+        lanes.setdefault(entry["host"], []).append(entry)
+
+    # Longest lanes first so they don't end up as the tail of the run
+    ordered_lanes = sorted(lanes.values(), key=len, reverse=True)
+
+    workers = max(1, min(SCRAPER_WORKERS, len(ordered_lanes)))
+    print(f"🧵 Running {len(entries)} scrapers on {len(ordered_lanes)} host lane(s) "
+          f"with {workers} worker thread(s)")
+
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_host_lane, lane): lane for lane in ordered_lanes}
+        for future in as_completed(futures):
+            try:
+                for scraper_name, status in future.result():
+                    statuses[scraper_name] = status
+            except Exception as e:
+                # Only reachable if run_host_lane itself raised
+                for entry in futures[future]:
+                    print(f"❌ {entry['name']} lane crashed: {e}")
+                    statuses.setdefault(entry["name"], "failed")
+
+    for entry in entries:
+        _run_results.append((entry["name"], statuses.get(entry["name"], "failed")))
+
+
+def run_all_scrapers(entries=None):
+    """
+    Run the given registry entries (default: all scrapers) concurrently,
+    one lane per target host.
     """
     global _run_results
     _run_results = []
@@ -170,188 +212,16 @@ def run_all_scrapers():
     # Load subscription statuses from DB once for the entire run
     print("🔍 Loading company-scraper subscription statuses...")
     db.load_active_subscriptions()
+    scrappey_client.start_run()
     print()
 
-    # Run each scraper
-    run_scraper("Digital Health", digital_health.main, digital_health)
-    time.sleep(5)  # Small delay between scrapers
-    
-    run_scraper("Contract Finder", contract_finder.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Find Tender", find_tender.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("HTN.co", htn_co.main, htn_co)
-    time.sleep(5)
-
-    run_scraper("Startups.co", startups_co.main, startups_co)
-    time.sleep(5)
-
-    run_scraper("UKRI", ukri.main, ukri)
-    time.sleep(5)
-
-    run_scraper("EU-Startups", eu_startups.main, eu_startups)
-    time.sleep(5)
-
-    run_scraper("BusinessCloud", businesscloud.main, businesscloud)
-    time.sleep(5)
-
-    run_scraper("HT World", htworld.main, htworld)
-    time.sleep(5)
-
-    run_scraper("Energy Voice", energyvoice.main, energyvoice)
-    time.sleep(5)
-
-    run_scraper("Marine Industry News", marineindustrynews.main, marineindustrynews)
-    time.sleep(5)
-
-    run_scraper("The Manufacturer", themanufacturer.main, themanufacturer)
-    time.sleep(5)
-
-    run_scraper("PR Newswire UK", prnewswire.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("UK Defence Journal", ukdefencejournal.main, ukdefencejournal)
-    time.sleep(5)
-
-    run_scraper("Consultancy EU", consultancy_eu.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Consultancy UK", consultancy_uk.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("ERP Today", erp_today.main, erp_today)
-    time.sleep(5)
-
-    run_scraper("Computable NL", computable_nl.main, computable_nl)
-    time.sleep(5)
-
-    run_scraper("Capgemini", capgemini.main, capgemini)
-    time.sleep(5)
-
-    run_scraper("Oracle", oracle.main, oracle)
-    time.sleep(5)
-
-    run_scraper("Deloitte", deloitte.main, deloitte)
-    time.sleep(5)
-
-    run_scraper("Homes England", homes_england.main, homes_england)
-    time.sleep(5)
-
-    run_scraper("Bidstats", bidstats.main, bidstats)
-    time.sleep(5)
-
-    run_scraper("Huntingdonshire", huntingdonshire.main, huntingdonshire)
-    time.sleep(5)
+    # Run scrapers concurrently, one serial lane per target host
+    run_scrapers_concurrently(entries if entries is not None else SCRAPERS)
 
-    run_scraper("Planning Inspectorate", planning_inspectorate.main, planning_inspectorate)
-    time.sleep(5)
-
-    run_scraper("East Cambs", eastcambs.main, eastcambs)
-    time.sleep(5)
-
-    run_scraper("Greater Cambridge", greater_cambridge.main, greater_cambridge)
-    time.sleep(5)
-
-    run_scraper("Cambridge News", cambridge_news.main, cambridge_news)
-    time.sleep(5)
-
-    run_scraper("Companies House", companies_house.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("The Drum", thedrum.main, thedrum)
-    time.sleep(5)
-
-    run_scraper("Business Wire", businesswire.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Marketing Week", marketingweek.main, marketingweek)
-    time.sleep(5)
-
-    run_scraper("Prolific North", prolificnorth.main, prolificnorth)
-    time.sleep(5)
-
-    run_scraper("The Grocer", thegrocer.main, thegrocer)
-    time.sleep(5)
-
-    run_scraper("FCA News", fca_news.main, fca_news)
-    time.sleep(5)
-
-    run_scraper("Finextra", finextra.main, finextra)
-    time.sleep(5)
-
-    run_scraper("City AM", cityam.main, cityam)
-    time.sleep(5)
-
-    run_scraper("Law Gazette", lawgazette.main, lawgazette)
-    time.sleep(5)
-
-    run_scraper("Data Center Dynamics", datacenterdynamics.main, datacenterdynamics)
-    time.sleep(5)
-
-    run_scraper("Heatmap News", heatmap_news.main, heatmap_news)
-    time.sleep(5)
-
-    run_scraper("Utility Dive", utilitydive.main, utilitydive)
-    time.sleep(5)
-
-    run_scraper("BOEM", boem.main, boem)
-    time.sleep(5)
-
-    run_scraper("Energy.gov", energy_gov.main, energy_gov)
-    time.sleep(5)
-
-    run_scraper("SEC EDGAR", sec_gov.main, sec_gov)
-    time.sleep(5)
-
-    run_scraper("University Business", universitybusiness.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Jisc", jisc.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("UCISA", ucisa.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Public Technology", publictechnology.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Balderton", balderton.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Silicon Canals", silicon_canals.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Tech.eu", tech_eu.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Inoapps", inoapps.main, inoapps)
-    time.sleep(5)
-
-    run_scraper("EY", ey.main, ey)
-    time.sleep(5)
-
-    run_scraper("KPMG", kpmg.main, kpmg)
-    time.sleep(5)
-
-    run_scraper("The Engineer", theengineer.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("ADS Group", adsgroup.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Business Live", business_live.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Clearwater", clearwater.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Insider Media", insidermedia.main)  # multi-company: checked internally
-    time.sleep(5)
-
-    run_scraper("Private Equity Wire", privateequitywire.main)  # multi-company: checked internally
-    time.sleep(5)
+    # Anything still buffered (e.g. a module writing under another scraper ID)
+    flush_scraper_watermarks("scraper run")
+    scrappey_client.log_usage()
+    print()
 
     elapsed_time = time.time() - start_time
     minutes = int(elapsed_time // 60)
@@ -360,7 +230,6 @@ def run_all_scrapers():
     print("\n" + "🎉" * 40)
     print(f"All scrapers completed!")
     print(f"Total time: {minutes}m {seconds}s")
-    print(f"Next run scheduled in 1 hour")
     print("🎉" * 40 + "\n")
 
     # ── Flush + restore streams, then send log to Slack ──────────────────────
@@ -372,35 +241,71 @@ def run_all_scrapers():
     # ─────────────────────────────────────────────────────────────────────────
 
 
+def schedule_scrapers():
+    """
+    Register one scheduled job per distinct schedule_hours in the registry.
+    """
+    groups = {}
+    for entry in SCRAPERS:
+        groups.setdefault(entry.get("schedule_hours", DEFAULT_SCHEDULE_HOURS), []).append(entry)
+
+    for hours, entries in sorted(groups.items()):
+        schedule.every(hours).hours.do(run_all_scrapers, entries)
+        print(f"🗓️  {len(entries)} scraper(s) scheduled every {hours} hour(s)")
+
+
 def main():
     """
     Main function that sets up the schedule and runs continuously.
+    Pass scraper names, module paths or IDs to run just those scrapers once,
+    e.g. `python main.py kpmg "HT World" 14`.
     """
-    print("=" * 80)
-    print("📊 SCRAPER SCHEDULER STARTED")
-    print("=" * 80)
-    print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("Schedule: Every 2 hour")
-    print("Press Ctrl+C to stop")
-    print("=" * 80 + "\n")
-    
-    # Run immediately on start
-    print("Running initial scrape...")
-    run_all_scrapers()
-    
-    # Schedule to run every hour
-    schedule.every(5).hours.do(run_all_scrapers)
-    
-    # Keep running
+    parser = argparse.ArgumentParser(description="Run the scraper scheduler or selected scrapers once.")
+    parser.add_argument("scrapers", nargs="*", help="Scraper name, module or ID (default: start the scheduler)")
+    parser.add_argument("--once", action="store_true", help="Run all scrapers once and exit")
+    args = parser.parse_args()
+
+    # The scheduler owns the pooled browsers; close them however we exit
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(120)  # Check every minute
-    except KeyboardInterrupt:
-        print("\n\n" + "=" * 80)
-        print("🛑 Scheduler stopped by user")
+        if args.scrapers:
+            try:
+                entries = find_scrapers(args.scrapers)
+            except ValueError as e:
+                parser.error(str(e))
+            run_all_scrapers(entries)
+            return
+
+        if args.once:
+            run_all_scrapers()
+            return
+
+        print("=" * 80)
+        print("📊 SCRAPER SCHEDULER STARTED")
         print("=" * 80)
-        sys.exit(0)
+        print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Schedule: Every {DEFAULT_SCHEDULE_HOURS} hours (per-scraper overrides in registry.py)")
+        print("Press Ctrl+C to stop")
+        print("=" * 80 + "\n")
+
+        # Run immediately on start
+        print("Running initial scrape...")
+        run_all_scrapers()
+
+        # Schedule each group of scrapers by its interval
+        schedule_scrapers()
+
+        # Keep running
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(120)  # Check every minute
+        except KeyboardInterrupt:
+            print("\n\n" + "=" * 80)
+            print("🛑 Scheduler stopped by user")
+            print("=" * 80)
+            sys.exit(0)
+    finally:
+        browser_pool.shutdown()
 
 
 if __name__ == "__main__":
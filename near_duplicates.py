@@ -0,0 +1,226 @@
+"""
+Cross-source near-duplicate detection.
+
+The same press release arrives through prnewswire, businesswire and
+globenewswire, and again from trade outlets that republish it. Every copy
+has its own URL, so URL dedup stores each one and queues it per company.
+This module keeps a 64-bit SimHash of every stored article's text and maps
+a new article onto the earlier (canonical) URL when the two signatures are
+within MAX_DISTANCE bits:
+
+    mapping = near_duplicates.canonical_urls(articles)   # {duplicate url: canonical url}
+    ...
+    near_duplicates.record(canonical_articles)           # once they are stored
+
+db.insert_articles(..., dedupe_near=True) does this before company_articles
+rows are created, so a republished copy links the company to the canonical
+article instead of queueing a second one. Only wire and news scrapers pass
+the flag; templated sources (tenders, filings) look alike without being
+the same item.
+
+Signatures live in memory as a table {url: simhash} plus a banded index
+(BANDS slices of the hash → urls). Two hashes within MAX_DISTANCE bits share
+at least one band exactly when BANDS > MAX_DISTANCE, so a lookup only
+compares against the few urls in matching buckets. The table is persisted to
+cache/near_duplicates.sqlite3 and signatures older than RETENTION_DAYS are
+dropped, which keeps it small — republished copies appear within days.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+STORE_PATH = CACHE_DIR / "near_duplicates.sqlite3"
+
+HASH_BITS = 64
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+SHINGLE_WORDS = 3
+
+# Max differing bits for two texts to count as the same article
+MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))
+# Shorter texts (teasers, stubs) are too alike to compare safely
+MIN_WORDS = int(os.getenv("NEAR_DUP_MIN_WORDS", "80"))
+# Only the opening of long texts is hashed; wires append different boilerplate
+MAX_WORDS = int(os.getenv("NEAR_DUP_MAX_WORDS", "1500"))
+RETENTION_DAYS = int(os.getenv("NEAR_DUP_RETENTION_DAYS", "30"))
+
+_WORD_RE = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_signatures = None  # {url: simhash}
+_buckets = None     # [{band value: set of urls}] per band
+
+
+# ----------------------------------------------------------
+# SimHash
+# ----------------------------------------------------------
+def _words(text):
+    return _WORD_RE.findall((text or "").casefold())
+
+
+def simhash(text):
+    """64-bit SimHash over word shingles, or None if the text is too short."""
+    words = _words(text)
+    if len(words) < MIN_WORDS:
+        return None
+    words = words[:MAX_WORDS]
+
+    weights = [0] * HASH_BITS
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        shingle = " ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8")
+        h = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(HASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+# SQLite integers are signed 64-bit
+def _to_db(value):
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _from_db(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+# ----------------------------------------------------------
+# Signature table (in memory, persisted to local SQLite)
+# ----------------------------------------------------------
+def _connect():
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH, timeout=30)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS signatures (
+            url         TEXT PRIMARY KEY,
+            simhash     INTEGER NOT NULL,
+            created_at  TEXT NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _index(url, value):
+    _signatures[url] = value
+    for band, key in enumerate(_bands(value)):
+        _buckets[band].setdefault(key, set()).add(url)
+
+
+def _load():
+    """Load unexpired signatures into memory (once per process)."""
+    global _signatures, _buckets
+    if _signatures is not None:
+        return
+    _signatures = {}
+    _buckets = [{} for _ in range(BANDS)]
+
+    cutoff = (datetime.utcnow() - timedelta(days=RETENTION_DAYS)).isoformat()
+    try:
+        conn = _connect()
+        try:
+            conn.execute("DELETE FROM signatures WHERE created_at < ?", (cutoff,))
+            conn.commit()
+            rows = conn.execute("SELECT url, simhash FROM signatures").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Near-duplicate index read failed: {e}")
+        return
+
+    for url, value in rows:
+        _index(url, _from_db(value))
+
+
+def _nearest(url, value, pending):
+    best_url, best_distance = None, MAX_DISTANCE + 1
+    candidates = set()
+    for band, key in enumerate(_bands(value)):
+        candidates |= _buckets[band].get(key, set())
+    candidates.discard(url)
+    stored = [(candidate, _signatures[candidate]) for candidate in candidates]
+    for candidate, candidate_value in stored + pending:
+        d = distance(value, candidate_value)
+        # Ties go to the lexically smallest URL so the choice is stable
+        if d < best_distance or (d == best_distance and best_url is not None and candidate < best_url):
+            best_url, best_distance = candidate, d
+    return best_url
+
+
+def canonical_urls(articles):
+    """
+    Map the URL of every near-duplicate among articles (dicts with url and
+    text) to the URL of its canonical copy. Articles are compared with the
+    stored signatures and with the articles before them in the list, so the
+    first copy within one batch is the canonical one.
+    """
+    mapping = {}
+    pending = []  # [(url, simhash)] of non-duplicates earlier in this call
+    seen = set()
+    with _lock:
+        _load()
+        for article in articles:
+            url = article["url"]
+            if url in seen or url in _signatures:
+                continue
+            seen.add(url)
+            value = simhash(article.get("text"))
+            if value is None:
+                continue
+            canonical = _nearest(url, value, pending)
+            if canonical:
+                mapping[url] = canonical
+            else:
+                pending.append((url, value))
+    return mapping
+
+
+def record(articles):
+    """Add the signatures of stored canonical articles (dicts with url and text)."""
+    rows = []
+    with _lock:
+        _load()
+        for article in articles:
+            url = article["url"]
+            if url in _signatures:
+                continue
+            value = simhash(article.get("text"))
+            if value is None:
+                continue
+            _index(url, value)
+            rows.append((url, _to_db(value), datetime.utcnow().isoformat()))
+
+        if not rows:
+            return
+        try:
+            conn = _connect()
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO signatures (url, simhash, created_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️  Near-duplicate index write failed: {e}")
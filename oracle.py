@@ -1,8 +1,8 @@
 import os
 import time
-from curl_cffi import requests
 from dotenv import load_dotenv
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
 
 load_dotenv()
 
@@ -43,8 +43,7 @@ def fetch_page(country, locale, offset, max_retries=3):
     hdrs = {**HEADERS, "referer": f"https://www.oracle.com/{locale}/news/"}
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            response = requests.post(
+            response = http_client.cffi_post(
                 API_URL,
                 json=payload,
                 headers=hdrs,
@@ -128,7 +127,7 @@ def main():
     print("🔍 Fetching articles from Oracle News API (all regions)...")
 
     # Full URLs already in DB — primary dedup against historic data
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
 
     # Slugs seen this run — deduplicates same article under different regional URLs
@@ -7,6 +7,9 @@ from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import routing
+import html_parse
 
 load_dotenv()
 
@@ -16,7 +19,8 @@ SCRAPER_ID = 14
 
 # ----------------------------------------------------------
 # All companies that receive PR Newswire articles.
-# No per-company filters — every company gets all articles.
+# A config may add "keywords" (routing.py query syntax) to receive
+# only matching articles; without it the company gets everything.
 # ----------------------------------------------------------
 COMPANY_CONFIGS = [
     {
@@ -83,8 +87,7 @@ def fetch_url(url, max_retries=3):
     proxies = {"http": proxy, "https": proxy} if proxy else None
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            response = requests.get(url, headers=HEADERS, proxies=proxies, timeout=30)
+            response = http_client.get(url, headers=HEADERS, proxies=proxies, timeout=30)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -140,7 +143,7 @@ def scrape_article(url, date, title):
         print(f"❌ Failed to fetch {url}")
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Remove scripts and styles
     for tag in soup.select("script, style, iframe"):
@@ -233,6 +236,13 @@ def main():
                     if result:
                         scraped_cache[url] = result
 
+        # Route each scraped article once against every company's keywords
+        router = routing.compile_rules(configs)
+        routed_companies = {
+            url: router.route(f"{article.get('title', '')}\n{article.get('text', '')}")
+            for url, article in scraped_cache.items()
+        }
+
         for config in configs:
             company_id = config["company_id"]
             label = config["label"]
@@ -265,13 +275,13 @@ def main():
             company_articles = []
             for entry in new_entries:
                 cached = scraped_cache.get(entry["url"])
-                if cached:
+                if cached and company_id in routed_companies[entry["url"]]:
                     article = dict(cached)
                     article["company_id"] = company_id
                     company_articles.append(article)
 
             if company_articles:
-                inserted_count = insert_articles(company_articles)
+                inserted_count = insert_articles(company_articles, dedupe_near=True)
                 print(f"✅ Inserted {inserted_count} articles for {label}")
 
             update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
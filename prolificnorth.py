@@ -2,12 +2,11 @@ import os
 import time
 from datetime import datetime
 
-import requests
-from curl_cffi import requests as cffi_requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -41,8 +40,7 @@ def fetch_with_cffi(url, max_retries=3):
 
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = cffi_requests.get(
+            resp = http_client.cffi_get(
                 url,
                 headers=HEADERS,
                 impersonate="chrome131",
@@ -65,8 +63,7 @@ def fetch_with_cffi(url, max_retries=3):
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
             return resp.text
         except Exception as e:
@@ -78,7 +75,7 @@ def fetch_url(url, max_retries=3):
 
 
 def parse_listing_html(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     urls = []
     seen = set()
 
@@ -113,7 +110,7 @@ def scrape_article(url):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     # Title
     h1 = soup.find("h1", class_="elementor-heading-title")
@@ -157,7 +154,7 @@ def scrape_article(url):
 def main():
     print("🔍 Fetching Prolific North listing pages...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
@@ -225,7 +222,7 @@ def main():
         return
 
     print(f"\n🆕 Found {len(articles)} new article(s) in total.")
-    inserted_count = insert_articles(articles)
+    inserted_count = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted_count} articles into database")
 
 
@@ -0,0 +1,93 @@
+"""
+Per-host token-bucket rate limiter shared by every fetch helper.
+
+Call throttle(url) right before sending a request. Each host has a bucket of
+`burst` tokens refilled at `rate` tokens per second, so a request only waits
+when that host's budget is actually used up. Buckets are shared by all
+threads in the process, which keeps the ThreadPoolExecutor scrapers within
+the same per-host budget.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+# (requests per second, burst) used for any host not listed below
+DEFAULT_RATE = (2.0, 4)
+
+# Per-domain overrides. A domain also covers its subdomains, so "gov.uk"
+# applies to www.gov.uk and every council portal under it.
+DOMAIN_RATES = {
+    "sec.gov": (10.0, 10),                      # SEC fair-access limit
+    "gov.uk": (2.0, 4),
+    "kpmg.com": (2.0, 5),
+    "ey.com": (2.0, 5),
+    "prnewswire.co.uk": (4.0, 10),
+    "prnewswire.com": (4.0, 10),
+    "businesswire.com": (1.0, 2),
+    "clearwatercf.com": (1.0, 3),
+    "insidermedia.com": (1.0, 3),
+    "business-live.co.uk": (1.0, 3),
+    "prolificnorth.co.uk": (1.0, 2),
+    "thegrocer.co.uk": (1.0, 2),
+    "lawgazette.co.uk": (1.0, 2),
+    "htworld.co.uk": (0.5, 1),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until a token is available."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping if the bucket is empty. Returns seconds waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token now (the balance may go negative) so concurrent
+            # callers queue up behind each other instead of all waking at once.
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_buckets: dict = {}
+_buckets_lock = threading.Lock()
+
+
+def _rate_key(host):
+    """Return (bucket key, (rate, burst)) for a host, matching parent domains."""
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        domain = ".".join(parts[i:])
+        if domain in DOMAIN_RATES:
+            # gov.uk subdomains are separate services, so each gets its own bucket
+            key = host if domain == "gov.uk" else domain
+            return key, DOMAIN_RATES[domain]
+    return host, DEFAULT_RATE
+
+
+def get_bucket(url):
+    """Return the shared bucket for the URL's host, creating it on first use."""
+    host = (urlparse(url).hostname or "").lower()
+    key, (rate, burst) = _rate_key(host)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(rate, burst)
+    return bucket
+
+
+def throttle(url):
+    """Wait until the URL's host has budget for one more request."""
+    return get_bucket(url).acquire()
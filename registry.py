@@ -0,0 +1,566 @@
+"""
+Declarative scraper registry.
+
+Each entry describes one scraper without importing it, so the scheduler can
+start (and a single scraper can be run from the CLI) without pulling in every
+scraper's dependencies. Modules are imported by load_scraper() only when the
+scraper is about to run.
+
+Entry keys:
+    name            Display name used in logs and the Slack run summary
+    module          Module path of the scraper (must expose main())
+    scraper_id      scrapers.id in the DB
+    host            Target host; scrapers sharing a host run on one serial lane
+    schedule_hours  How often the scheduler runs this scraper
+    single_company  True if main.py performs the is_active check for it;
+                    multi-company scrapers check each company internally
+    company_env     (single-company only) env var holding the company ID, so
+                    inactive subscriptions are skipped before the import
+"""
+
+import importlib
+
+DEFAULT_SCHEDULE_HOURS = 5
+
+SCRAPERS = [
+    {
+        "name": "Digital Health",
+        "module": "digital_health",
+        "scraper_id": 3,
+        "host": "www.digitalhealth.net",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "Contract Finder",
+        "module": "contract_finder",
+        "scraper_id": 2,
+        "host": "www.contractsfinder.service.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Find Tender",
+        "module": "find_tender",
+        "scraper_id": 5,
+        "host": "www.find-tender.service.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "HTN.co",
+        "module": "htn_co",
+        "scraper_id": 7,
+        "host": "htn.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "Startups.co",
+        "module": "startups_co",
+        "scraper_id": 8,
+        "host": "startups.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "SOLO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "UKRI",
+        "module": "ukri",
+        "scraper_id": 11,
+        "host": "www.ukri.org",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "EU-Startups",
+        "module": "eu_startups",
+        "scraper_id": 4,
+        "host": "www.eu-startups.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "BusinessCloud",
+        "module": "businesscloud",
+        "scraper_id": 1,
+        "host": "businesscloud.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "SOLO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "HT World",
+        "module": "htworld",
+        "scraper_id": 6,
+        "host": "www.htworld.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "SOLO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "Energy Voice",
+        "module": "energyvoice",
+        "scraper_id": 13,
+        "host": "www.energyvoice.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ARDEN_EXEC_COMPANY_ID",
+    },
+    {
+        "name": "Marine Industry News",
+        "module": "marineindustrynews",
+        "scraper_id": 12,
+        "host": "marineindustrynews.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ARDEN_EXEC_COMPANY_ID",
+    },
+    {
+        "name": "The Manufacturer",
+        "module": "themanufacturer",
+        "scraper_id": 9,
+        "host": "www.themanufacturer.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "PR Newswire UK",
+        "module": "prnewswire",
+        "scraper_id": 14,
+        "host": "www.prnewswire.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "UK Defence Journal",
+        "module": "ukdefencejournal",
+        "scraper_id": 10,
+        "host": "ukdefencejournal.org.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ARDEN_EXEC_COMPANY_ID",
+    },
+    {
+        "name": "Consultancy EU",
+        "module": "consultancy_eu",
+        "scraper_id": 15,
+        "host": "www.consultancy.eu",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Consultancy UK",
+        "module": "consultancy_uk",
+        "scraper_id": 16,
+        "host": "www.consultancy.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "ERP Today",
+        "module": "erp_today",
+        "scraper_id": 17,
+        "host": "erp.today",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "Computable NL",
+        "module": "computable_nl",
+        "scraper_id": 18,
+        "host": "computable.nl",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "Capgemini",
+        "module": "capgemini",
+        "scraper_id": 19,
+        "host": "www.capgemini.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "Oracle",
+        "module": "oracle",
+        "scraper_id": 20,
+        "host": "search-api.oracle.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "Deloitte",
+        "module": "deloitte",
+        "scraper_id": 21,
+        "host": "www.deloitte.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "Homes England",
+        "module": "homes_england",
+        "scraper_id": 22,
+        "host": "www.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Bidstats",
+        "module": "bidstats",
+        "scraper_id": 23,
+        "host": "bidstats.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Huntingdonshire",
+        "module": "huntingdonshire",
+        "scraper_id": 24,
+        "host": "publicaccess.huntingdonshire.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Planning Inspectorate",
+        "module": "planning_inspectorate",
+        "scraper_id": 25,
+        "host": "www.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "East Cambs",
+        "module": "eastcambs",
+        "scraper_id": 26,
+        "host": "eastcambs.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Greater Cambridge",
+        "module": "greater_cambridge",
+        "scraper_id": 27,
+        "host": "applications.greatercambridgeplanning.org",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Cambridge News",
+        "module": "cambridge_news",
+        "scraper_id": 28,
+        "host": "api.mantis-intelligence.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "PLEA_COMPANY_ID",
+    },
+    {
+        "name": "Companies House",
+        "module": "companies_house",
+        "scraper_id": 29,
+        "host": "www.gov.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "The Drum",
+        "module": "thedrum",
+        "scraper_id": 30,
+        "host": "www.thedrum.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "HEADLINERS_COMPANY_ID",
+    },
+    {
+        "name": "Business Wire",
+        "module": "businesswire",
+        "scraper_id": 31,
+        "host": "www.businesswire.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Marketing Week",
+        "module": "marketingweek",
+        "scraper_id": 32,
+        "host": "www.marketingweek.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "HEADLINERS_COMPANY_ID",
+    },
+    {
+        "name": "Prolific North",
+        "module": "prolificnorth",
+        "scraper_id": 33,
+        "host": "www.prolificnorth.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "HEADLINERS_COMPANY_ID",
+    },
+    {
+        "name": "The Grocer",
+        "module": "thegrocer",
+        "scraper_id": 34,
+        "host": "www.thegrocer.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "HEADLINERS_COMPANY_ID",
+    },
+    {
+        "name": "FCA News",
+        "module": "fca_news",
+        "scraper_id": 35,
+        "host": "www.fca.org.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "MIDDLESEX_PARTNERSHIP_COMPANY_ID",
+    },
+    {
+        "name": "Finextra",
+        "module": "finextra",
+        "scraper_id": 36,
+        "host": "www.finextra.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+    },
+    {
+        "name": "City AM",
+        "module": "cityam",
+        "scraper_id": 37,
+        "host": "www.cityam.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "MIDDLESEX_PARTNERSHIP_COMPANY_ID",
+    },
+    {
+        "name": "Law Gazette",
+        "module": "lawgazette",
+        "scraper_id": 38,
+        "host": "www.lawgazette.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "MIDDLESEX_PARTNERSHIP_COMPANY_ID",
+    },
+    {
+        "name": "Data Center Dynamics",
+        "module": "datacenterdynamics",
+        "scraper_id": 39,
+        "host": "www.datacenterdynamics.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "Heatmap News",
+        "module": "heatmap_news",
+        "scraper_id": 40,
+        "host": "heatmap.news",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "Utility Dive",
+        "module": "utilitydive",
+        "scraper_id": 41,
+        "host": "www.utilitydive.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "BOEM",
+        "module": "boem",
+        "scraper_id": 42,
+        "host": "www.boem.gov",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "Energy.gov",
+        "module": "energy_gov",
+        "scraper_id": 43,
+        "host": "www.energy.gov",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "SEC EDGAR",
+        "module": "sec_gov",
+        "scraper_id": 44,
+        "host": "www.sec.gov",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "NET_ZERO_SEARCH_COMPANY_ID",
+    },
+    {
+        "name": "University Business",
+        "module": "universitybusiness",
+        "scraper_id": 45,
+        "host": "universitybusiness.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Jisc",
+        "module": "jisc",
+        "scraper_id": 46,
+        "host": "www.jisc.ac.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "UCISA",
+        "module": "ucisa",
+        "scraper_id": 47,
+        "host": "www.ucisa.ac.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Public Technology",
+        "module": "publictechnology",
+        "scraper_id": 48,
+        "host": "www.publictechnology.net",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Balderton",
+        "module": "balderton",
+        "scraper_id": 49,
+        "host": "www.balderton.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Silicon Canals",
+        "module": "silicon_canals",
+        "scraper_id": 57,
+        "host": "siliconcanals.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Tech.eu",
+        "module": "tech_eu",
+        "scraper_id": 62,
+        "host": "tech.eu",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Inoapps",
+        "module": "inoapps",
+        "scraper_id": 64,
+        "host": "www.inoapps.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "EY",
+        "module": "ey",
+        "scraper_id": 65,
+        "host": "www.ey.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "KPMG",
+        "module": "kpmg",
+        "scraper_id": 66,
+        "host": "kpmg.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": True,
+        "company_env": "ERP_RECRUIT_COMPANY_ID",
+    },
+    {
+        "name": "The Engineer",
+        "module": "theengineer",
+        "scraper_id": 73,
+        "host": "www.theengineer.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "ADS Group",
+        "module": "adsgroup",
+        "scraper_id": 68,
+        "host": "www.adsgroup.org.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Business Live",
+        "module": "business_live",
+        "scraper_id": 69,
+        "host": "www.business-live.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Clearwater",
+        "module": "clearwater",
+        "scraper_id": 71,
+        "host": "www.clearwatercf.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Insider Media",
+        "module": "insidermedia",
+        "scraper_id": 72,
+        "host": "www.insidermedia.com",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+    {
+        "name": "Private Equity Wire",
+        "module": "privateequitywire",
+        "scraper_id": 70,
+        "host": "www.privateequitywire.co.uk",
+        "schedule_hours": DEFAULT_SCHEDULE_HOURS,
+        "single_company": False,
+    },
+]
+
+
+def find_scrapers(refs):
+    """
+    Return the registry entries matching the given names, module paths or
+    scraper IDs (case-insensitive). Raises ValueError for unknown refs.
+    """
+    entries = []
+    for ref in refs:
+        ref_key = str(ref).strip().lower()
+        match = next(
+            (
+                e for e in SCRAPERS
+                if ref_key in (e["name"].lower(), e["module"].lower(), str(e["scraper_id"]))
+            ),
+            None,
+        )
+        if match is None:
+            raise ValueError(f"Unknown scraper: {ref}")
+        entries.append(match)
+    return entries
+
+
+def load_scraper(entry):
+    """Import (or fetch from sys.modules) the module for a registry entry."""
+    return importlib.import_module(entry["module"])
@@ -0,0 +1,188 @@
+"""
+Local company routing.
+
+Scrapers that serve several companies used to decide who gets an article by
+running one fetch per company with that company's filters, or by giving
+every article to everyone. This module lets a scraper fetch once and route
+locally: every company's keyword query is compiled into a single
+multi-pattern matcher, each article is scanned once, and the set of matched
+terms is then checked against each company's query with set operations.
+Routing cost is one pass over the text regardless of how many companies
+there are.
+
+    router = routing.compile_rules([
+        {"company_id": ..., "keywords": '"public realm" OR landscape -maintenance'},
+        {"company_id": ..., "keywords": "defence AND (aerospace OR naval)"},
+        {"company_id": ..., "keywords": ""},          # empty query → everything
+    ])
+    company_ids = router.route(title + "\n" + text)
+
+Query syntax (the portal-style strings already used in COMPANY_CONFIGS):
+  - bare words and "quoted phrases" are terms; adjacent terms are ORed
+  - AND joins groups that must all match; OR is accepted and ignored
+  - -term or NOT term excludes articles containing it
+  - parentheses are ignored (grouping is AND-of-ORs)
+  - all-caps terms of up to 4 letters (IT, PR, MOD, NHS) match case-sensitively,
+    everything else case-insensitively, always on word boundaries
+
+pyahocorasick is used as the scanner when installed; otherwise all terms are
+combined into one alternation regex, which is still a single pass.
+"""
+
+import re
+
+_TOKEN_RE = re.compile(r'-?"[^"]+"|[()]|[^\s()]+')
+
+
+class Query:
+    """A parsed keyword query: every group needs a hit, no excluded term may appear."""
+
+    def __init__(self):
+        self.groups = []      # [set of term keys]
+        self.excluded = set()
+
+    @property
+    def terms(self):
+        return set().union(self.excluded, *self.groups)
+
+    def matches(self, found):
+        if self.excluded & found:
+            return False
+        return all(group & found for group in self.groups)
+
+
+def term_key(term):
+    """Normalised key for a term: acronyms keep their case, the rest is lowercased."""
+    term = " ".join(term.split())
+    return term if _case_sensitive(term) else term.lower()
+
+
+def _case_sensitive(term):
+    return term.isupper() and len(term) <= 4
+
+
+def parse_query(query):
+    """Parse a keyword query string into a Query."""
+    parsed = Query()
+    current = set()
+    negate = False
+
+    for token in _TOKEN_RE.findall(query or ""):
+        if token in ("(", ")", "OR"):
+            continue
+        if token == "AND":
+            if current:
+                parsed.groups.append(current)
+            current = set()
+            continue
+        if token == "NOT":
+            negate = True
+            continue
+
+        if token.startswith("-") and len(token) > 1:
+            negate, token = True, token[1:]
+        term = token.strip('"').strip()
+        if not term:
+            continue
+
+        if negate:
+            parsed.excluded.add(term_key(term))
+            negate = False
+        else:
+            current.add(term_key(term))
+
+    if current:
+        parsed.groups.append(current)
+    return parsed
+
+
+# ----------------------------------------------------------
+# Scanners — find every known term in a text in one pass
+# ----------------------------------------------------------
+class _RegexScanner:
+    def __init__(self, terms):
+        parts = []
+        # Longest first so a phrase wins over a word it starts with
+        for term in sorted(terms, key=len, reverse=True):
+            pattern = r"\s+".join(re.escape(word) for word in term.split())
+            parts.append(pattern if _case_sensitive(term) else f"(?i:{pattern})")
+        # Zero-width lookahead so overlapping terms ("public realm", "realm") all match
+        self._pattern = re.compile(r"(?=(\b(?:" + "|".join(parts) + r")\b))") if parts else None
+
+    def scan(self, text):
+        found = set()
+        if self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                words = m.group(1).split()
+                # The longest term wins at each position; shorter terms it
+                # starts with are its word prefixes. Keys of both a
+                # case-sensitive and a case-insensitive term are added.
+                for i in range(1, len(words) + 1):
+                    matched = " ".join(words[:i])
+                    found.update((matched, matched.lower()))
+        return found
+
+
+class _AhoCorasickScanner:
+    def __init__(self, terms, ahocorasick):
+        keys = {}
+        for term in terms:
+            keys.setdefault(term.lower(), set()).add(term)
+        self._automaton = ahocorasick.Automaton()
+        for word, word_keys in keys.items():
+            self._automaton.add_word(word, (word, word_keys))
+        self._automaton.make_automaton()
+
+    def scan(self, text):
+        found = set()
+        lowered = " ".join(text.split()).lower()
+        normalised = " ".join(text.split())
+        for end, (word, keys) in self._automaton.iter(lowered):
+            start = end - len(word) + 1
+            # Word boundaries, and exact case for acronyms
+            if start > 0 and lowered[start - 1].isalnum():
+                continue
+            if end + 1 < len(lowered) and lowered[end + 1].isalnum():
+                continue
+            for key in keys:
+                if not _case_sensitive(key) or normalised[start:end + 1] == key:
+                    found.add(key)
+        return found
+
+
+def _make_scanner(terms):
+    try:
+        import ahocorasick
+    except ImportError:
+        return _RegexScanner(terms)
+    return _AhoCorasickScanner(terms, ahocorasick)
+
+
+# ----------------------------------------------------------
+# Router
+# ----------------------------------------------------------
+class Router:
+    """Compiled set of company queries (see compile_rules)."""
+
+    def __init__(self, rules):
+        self.rules = []
+        terms = set()
+        for rule in rules:
+            query = parse_query(rule.get("keywords", ""))
+            self.rules.append((rule["company_id"], query))
+            terms |= query.terms
+        self._scanner = _make_scanner(terms)
+
+    def matched_terms(self, text):
+        """Return the set of term keys found in the text."""
+        return self._scanner.scan(text or "")
+
+    def route(self, text):
+        """Return the set of company IDs whose query matches the text."""
+        found = self.matched_terms(text)
+        return {company_id for company_id, query in self.rules if query.matches(found)}
+
+
+def compile_rules(rules):
+    """Compile rule dicts ({"company_id", "keywords"}) into a Router."""
+    return Router(rules)
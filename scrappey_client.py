@@ -0,0 +1,215 @@
+"""
+Central Scrappey client.
+
+Every Scrappey call in the repo goes through request() so that:
+  - at most SCRAPPEY_CONCURRENCY calls are in flight across all scrapers
+    (threads of one process share the limit)
+  - identical payloads already in flight are sent once and the response is
+    shared with every caller waiting on it
+  - the target URL is throttled per host (rate_limiter), not the API host
+  - each call's latency and outcome is recorded, and usage_summary() /
+    log_usage() report calls, failures, latency and credits spent
+
+    data = scrappey_client.request({"cmd": "request.get", "url": url, ...}, timeout=90)
+    html = data.get("solution", {}).get("response", "")
+
+Call-site retry loops sleep with backoff(attempt) rather than a fixed delay.
+Credits are measured from the balance endpoint at start_run() / log_usage(),
+since responses do not report per-call cost.
+"""
+
+import json
+import math
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+import http_client
+from rate_limiter import throttle
+
+SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
+SCRAPPEY_CONCURRENCY = int(os.getenv("SCRAPPEY_CONCURRENCY", "10"))
+RETRY_BACKOFF_SECONDS = 2
+RETRY_BACKOFF_MAX_SECONDS = 30
+
+_slots = threading.BoundedSemaphore(SCRAPPEY_CONCURRENCY)
+
+_in_flight = {}  # {payload key: Future}
+_in_flight_lock = threading.Lock()
+
+_calls = []  # [{"host", "cmd", "seconds", "ok", "shared"}]
+_stats_lock = threading.Lock()
+_start_balance = None
+
+
+def _api_key():
+    api_key = os.getenv("SCRAPPEY_API_KEY")
+    if not api_key:
+        raise RuntimeError("SCRAPPEY_API_KEY not set")
+    return api_key
+
+
+def _record(payload, seconds, ok, shared=False):
+    with _stats_lock:
+        _calls.append({
+            "host": urlparse(payload.get("url", "")).hostname or "",
+            "cmd": payload.get("cmd", ""),
+            "seconds": seconds,
+            "ok": ok,
+            "shared": shared,
+        })
+
+
+def _send(payload, timeout):
+    api_key = _api_key()
+    # Wait for the target host's budget before taking a slot, so a slot
+    # never sits idle while calls for other hosts queue behind it
+    if payload.get("url"):
+        throttle(payload["url"])
+    with _slots:
+        started = time.monotonic()
+        try:
+            resp = http_client.post(
+                f"{SCRAPPEY_API_URL}?key={api_key}",
+                rate_limit=False,
+                json=payload,
+                timeout=timeout,
+            )
+        except Exception:
+            _record(payload, time.monotonic() - started, ok=False)
+            raise
+
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {}
+    ok = resp.ok and data.get("data") != "error"
+    _record(payload, time.monotonic() - started, ok=ok)
+    return resp, data
+
+
+def request_response(payload, timeout=90):
+    """
+    Send one Scrappey call and return (http response, parsed JSON dict).
+    Identical payloads already in flight share a single call.
+    """
+    key = json.dumps(payload, sort_keys=True, default=str)
+
+    with _in_flight_lock:
+        pending = _in_flight.get(key)
+        owner = pending is None
+        if owner:
+            pending = Future()
+            _in_flight[key] = pending
+
+    if not owner:
+        started = time.monotonic()
+        ok = False
+        try:
+            result = pending.result()
+            ok = True
+            return result
+        finally:
+            _record(payload, time.monotonic() - started, ok=ok, shared=True)
+
+    try:
+        result = _send(payload, timeout)
+        pending.set_result(result)
+        return result
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+
+def request(payload, timeout=90):
+    """
+    Send one Scrappey call and return its JSON body. Raises for HTTP errors,
+    like resp.raise_for_status() did at the old call sites.
+    """
+    resp, data = request_response(payload, timeout)
+    resp.raise_for_status()
+    return data
+
+
+def backoff(attempt):
+    """Sleep before retry number attempt + 1 (exponential, with jitter)."""
+    delay = min(RETRY_BACKOFF_SECONDS * (2 ** attempt), RETRY_BACKOFF_MAX_SECONDS)
+    time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+# ----------------------------------------------------------
+# Usage accounting
+# ----------------------------------------------------------
+def get_balance():
+    """Return the account's credit balance, or None if it can't be read."""
+    try:
+        resp = http_client.get(
+            f"{SCRAPPEY_API_URL}/balance",
+            rate_limit=False,
+            params={"key": _api_key()},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json().get("balance")
+    except Exception as e:
+        print(f"⚠️  Could not read Scrappey balance: {e}")
+        return None
+
+
+def start_run():
+    """Reset call stats and remember the balance at the start of a run."""
+    global _start_balance
+    with _stats_lock:
+        _calls.clear()
+    _start_balance = get_balance() if os.getenv("SCRAPPEY_API_KEY") else None
+
+
+def usage_summary():
+    """Return a dict of call counts, latency and credits for this run."""
+    with _stats_lock:
+        calls = list(_calls)
+
+    sent = [c for c in calls if not c["shared"]]
+    latencies = sorted(c["seconds"] for c in sent)
+    by_host = {}
+    for c in sent:
+        by_host[c["host"]] = by_host.get(c["host"], 0) + 1
+
+    summary = {
+        "calls": len(sent),
+        "failed": sum(1 for c in sent if not c["ok"]),
+        "deduped": len(calls) - len(sent),
+        "avg_seconds": round(statistics.mean(latencies), 1) if latencies else 0,
+        # Nearest-rank percentile: the smallest latency at or above 95% of calls
+        "p95_seconds": round(latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.95) - 1)], 1) if latencies else 0,
+        "by_host": by_host,
+        "credits_used": None,
+    }
+    if _start_balance is not None and summary["calls"]:
+        end_balance = get_balance()
+        if end_balance is not None:
+            summary["credits_used"] = round(_start_balance - end_balance, 2)
+    return summary
+
+
+def log_usage():
+    """Print this run's Scrappey usage."""
+    summary = usage_summary()
+    if not summary["calls"] and not summary["deduped"]:
+        return
+    credits = summary["credits_used"]
+    print(
+        f"💳 Scrappey: {summary['calls']} call(s), {summary['failed']} failed, "
+        f"{summary['deduped']} deduped, avg {summary['avg_seconds']}s, "
+        f"p95 {summary['p95_seconds']}s"
+        + (f", {credits} credits" if credits is not None else "")
+    )
+    for host, count in sorted(summary["by_host"].items(), key=lambda kv: -kv[1]):
+        print(f"   {host}: {count}")
@@ -1,13 +1,19 @@
 import os
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import date
+from datetime import date, datetime, timedelta
 
-from curl_cffi import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import (
+    get_known_article_urls,
+    get_latest_timestamp,
+    insert_articles,
+    is_subscription_active,
+    update_latest_timestamp,
+)
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -19,6 +25,23 @@ BASE_URL = "https://www.sec.gov"
 PAGE_SIZE = 100
 MAX_PAGES = 5
 
+# "index": EDGAR daily master.idx files for every day since the watermark,
+#          filtered locally — no hit ceiling, catch-up costs one file per day
+# "search": the full-text search API for today only (capped at MAX_PAGES)
+MODE = os.getenv("SEC_GOV_MODE", "index")
+FORM_TYPES = {"8-K", "D"}
+DAILY_INDEX_URL = f"{BASE_URL}/Archives/edgar/daily-index"
+# Days looked back on the first run, and the most a catch-up will cover
+FIRST_RUN_DAYS = 1
+MAX_CATCHUP_DAYS = 14
+# Requests are throttled to the sec.gov budget (10/s) by rate_limiter
+MAX_WORKERS = 8
+
+# Filing documents (exhibits can be many MB) are streamed: reading stops
+# after MAX_BODY_CHARS of text or MAX_DOC_BYTES of transfer
+MAX_DOC_BYTES = 3_000_000
+MAX_BODY_CHARS = 100_000
+
 PROXIES = None
 
 HEADERS = {
@@ -74,7 +97,7 @@ def fetch_page(filing_date: str, page: int) -> list[dict]:
     """Fetch one page of search results and return list of {url, title, date}."""
     url = build_api_url(filing_date, page)
     try:
-        resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30, impersonate="chrome131")
+        resp = http_client.cffi_get(url, headers=HEADERS, proxies=PROXIES, timeout=30, impersonate="chrome131")
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
@@ -103,37 +126,167 @@ def fetch_page(filing_date: str, page: int) -> list[dict]:
 
 
 def scrape_body(url: str) -> str:
-    """Fetch and extract text from an SEC filing document page."""
+    """Stream an SEC filing document and extract its text (size-capped)."""
     try:
-        time.sleep(0.5)
-        resp = requests.get(url, headers=DOC_HEADERS, proxies=PROXIES, timeout=30, impersonate="chrome131")
+        resp = http_client.cffi_get(
+            url, headers=DOC_HEADERS, proxies=PROXIES, timeout=30, impersonate="chrome131", stream=True
+        )
         resp.raise_for_status()
     except Exception as e:
         print(f"  ❌ Failed to fetch {url}: {e}")
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    return html_parse.stream_text(resp, MAX_DOC_BYTES, MAX_BODY_CHARS)
+
+
+# ----------------------------------------------------------
+# Daily index mode
+# ----------------------------------------------------------
+def daily_index_url(day: date) -> str:
+    quarter = (day.month - 1) // 3 + 1
+    return f"{DAILY_INDEX_URL}/{day.year}/QTR{quarter}/master.{day:%Y%m%d}.idx"
+
+
+def fetch_daily_index(day: date) -> list[dict] | None:
+    """
+    Download one day's master.idx (gzip transfer encoding) and return its
+    FORM_TYPES filings as {cik, company, form, date, path}. Returns None if
+    the index doesn't exist (404: weekend, holiday, or not yet published).
+    Any other failure raises — a 403 is sec.gov throttling us, not a
+    missing day.
+    """
+    url = daily_index_url(day)
+    resp = http_client.cffi_get(
+        url,
+        headers={**DOC_HEADERS, "Accept-Encoding": "gzip"},
+        proxies=PROXIES,
+        timeout=60,
+        impersonate="chrome131",
+    )
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+
+    filings = []
+    in_rows = False
+    for line in resp.text.splitlines():
+        if not in_rows:
+            # Header block ends with a dashed rule under "CIK|Company Name|..."
+            in_rows = line.startswith("-----")
+            continue
+        parts = line.split("|")
+        if len(parts) != 5 or parts[2] not in FORM_TYPES:
+            continue
+        cik, company, form_type, filed, path = parts
+        filings.append({
+            "cik": cik,
+            "company": company.strip(),
+            "form": form_type,
+            "date": f"{filed[:4]}-{filed[4:6]}-{filed[6:8]}T00:00:00",
+            "path": path.strip(),
+        })
+    return filings
+
+
+def filing_index_url(filing: dict) -> str:
+    """URL of a filing's -index.htm page from its master.idx path."""
+    # path: edgar/data/<cik>/<accession with dashes>.txt
+    accession = filing["path"].rsplit("/", 1)[-1].removesuffix(".txt")
+    folder = accession.replace("-", "")
+    return f"{BASE_URL}/Archives/edgar/data/{filing['cik']}/{folder}/{accession}-index.htm"
+
+
+def find_primary_document(filing: dict) -> str | None:
+    """
+    Return the primary document URL listed first on the filing's index page,
+    or None if it lists none. Raises if the index page can't be fetched.
+    """
+    url = filing_index_url(filing)
+    resp = http_client.cffi_get(url, headers=DOC_HEADERS, proxies=PROXIES, timeout=30, impersonate="chrome131")
+    resp.raise_for_status()
+
+    doc = html_parse.parse(resp.text)
+    for link in doc.select("table.tableFile a"):
+        href = link.get("href", "")
+        if not href:
+            continue
+        # Inline XBRL documents are linked through the viewer
+        href = href.removeprefix("/ix?doc=")
+        return BASE_URL + href if href.startswith("/") else href
+    return None
 
-    for tag in soup.select("script, style"):
-        tag.decompose()
 
-    body = soup.find("body")
-    if body:
-        return body.get_text(" ", strip=True)
+def index_dates(latest_ts: str | None) -> list[date]:
+    """Days to read: the day after the watermark up to today, capped at MAX_CATCHUP_DAYS."""
+    today = date.today()
+    if latest_ts:
+        start = datetime.fromisoformat(latest_ts[:10]).date() + timedelta(days=1)
+    else:
+        start = today - timedelta(days=FIRST_RUN_DAYS)
+    start = max(start, today - timedelta(days=MAX_CATCHUP_DAYS))
+    return [start + timedelta(days=i) for i in range((today - start).days + 1)]
+
+
+def hold_watermark(watermark: str | None, failed_dates: list[str]) -> str | None:
+    """
+    Keep the watermark before the earliest day holding a filing that failed
+    to resolve or scrape, so that day's index is read again next run.
+    """
+    if not watermark or not failed_dates:
+        return watermark
+    earliest = date.fromisoformat(min(failed_dates)[:10])
+    return min(watermark, f"{earliest - timedelta(days=1)}T00:00:00")
+
+
+def fetch_index_items() -> tuple[list[dict], str | None]:
+    """
+    Read the daily indexes since the watermark. Returns (items, watermark)
+    where watermark is the end of the unbroken run of days read — the walk
+    stops at the first index that fails with anything but a 404 — held back
+    before any filing whose index page couldn't be fetched.
+    """
+    latest_ts = get_latest_timestamp(SCRAPER_ID, COMPANY_ID)
+    filings, watermark = [], None
+    for day in index_dates(latest_ts):
+        try:
+            day_filings = fetch_daily_index(day)
+        except Exception as e:
+            print(f"  ❌ Failed to fetch daily index for {day}: {e} — stopping, retried next run.")
+            break
+        if day_filings is None:
+            print(f"  💤 No daily index for {day} (yet).")
+            continue
+        print(f"  📄 {day}: {len(day_filings)} {'/'.join(sorted(FORM_TYPES))} filing(s).")
+        filings.extend(day_filings)
+        watermark = f"{day}T00:00:00"
 
-    return soup.get_text(" ", strip=True)
+    known_urls = get_known_article_urls(SCRAPER_ID)
 
+    failed_dates = []
 
-def main():
-    if not is_subscription_active(SCRAPER_ID, COMPANY_ID):
-        print("⏭️  Skipping SEC EDGAR — subscription is inactive")
-        return
+    def resolve(filing: dict):
+        try:
+            doc_url = find_primary_document(filing)
+        except Exception as e:
+            print(f"  ❌ Failed to fetch filing index {filing_index_url(filing)}: {e}")
+            failed_dates.append(filing["date"])
+            return None
+        if not doc_url or doc_url in known_urls:
+            return None
+        return {
+            "url": doc_url,
+            "title": f"{filing['form']} — {filing['company']}",
+            "date": filing["date"],
+        }
 
-    filing_date = date.today().isoformat()
-    print(f"🔍 Scraping SEC EDGAR (8-K & D filings) for {filing_date}...")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        items = [item for item in executor.map(resolve, filings) if item]
+    return items, hold_watermark(watermark, failed_dates)
 
-    recent_urls = set(get_recent_article_urls(SCRAPER_ID, limit=500))
 
+def fetch_search_items() -> list[dict]:
+    """Page the full-text search API for today's filings."""
+    filing_date = date.today().isoformat()
     all_items = []
     for page in range(1, MAX_PAGES + 1):
         print(f"  📄 Fetching page {page}...")
@@ -143,12 +296,30 @@ def main():
             break
         all_items.extend(items)
         time.sleep(1)
+    return all_items
+
+
+def main():
+    if not is_subscription_active(SCRAPER_ID, COMPANY_ID):
+        print("⏭️  Skipping SEC EDGAR — subscription is inactive")
+        return
 
-    print(f"  📰 {len(all_items)} filing(s) found across {MAX_PAGES} page(s).")
+    watermark = None
+    if MODE == "index":
+        print("🔍 Scraping SEC EDGAR (8-K & D filings) from the daily indexes...")
+        new_items, watermark = fetch_index_items()
+        print(f"  📰 {len(new_items)} new filing(s) found in the daily indexes.")
+    else:
+        print(f"🔍 Scraping SEC EDGAR (8-K & D filings) for {date.today().isoformat()}...")
+        recent_urls = get_known_article_urls(SCRAPER_ID)
+        all_items = fetch_search_items()
+        print(f"  📰 {len(all_items)} filing(s) found across {MAX_PAGES} page(s).")
+        new_items = [it for it in all_items if it["url"] not in recent_urls]
 
-    new_items = [it for it in all_items if it["url"] not in recent_urls]
     if not new_items:
         print("⛔ No new filings since last run.")
+        if watermark:
+            update_latest_timestamp(SCRAPER_ID, COMPANY_ID, watermark)
         return
 
     print(f"  🆕 {len(new_items)} new filing(s) to scrape.")
@@ -171,19 +342,26 @@ def main():
         print(f"  ✅ {result['title'][:70]}")
         return result
 
-    with ThreadPoolExecutor(max_workers=2) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         futures = {executor.submit(scrape_one, item): item for item in new_items}
         for future in as_completed(futures):
             result = future.result()
             if result:
                 articles.append(result)
 
-    if not articles:
+    # Filings whose body failed keep their day in the next run's walk
+    scraped_urls = {a["url"] for a in articles}
+    watermark = hold_watermark(watermark, [it["date"] for it in new_items if it["url"] not in scraped_urls])
+
+    if articles:
+        inserted = insert_articles(articles)
+        print(f"✅ Inserted {inserted} filings into database.")
+    else:
         print("⛔ No filings scraped successfully.")
-        return
 
-    inserted = insert_articles(articles)
-    print(f"✅ Inserted {inserted} filings into database.")
+    if watermark:
+        update_latest_timestamp(SCRAPER_ID, COMPANY_ID, watermark)
+        print(f"🕒 Daily indexes read up to {watermark[:10]}")
 
 
 if __name__ == "__main__":
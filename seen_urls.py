@@ -0,0 +1,136 @@
+"""
+Local persistent index of article URLs already stored, per scraper.
+
+Scrapers without usable timestamps dedup by URL. Rebuilding that set from
+the articles table on every run costs a query and only ever sees the most
+recent N rows, so older URLs that reappear on a listing page get scraped
+again. This module keeps every URL ever inserted in a SQLite file instead.
+
+The index is filled from two sides:
+  - db.insert_articles() records every URL it writes
+  - db.get_known_article_urls() pulls rows created elsewhere, incrementally
+    from articles.created_at, at most once per SYNC_INTERVAL_SECONDS
+
+This module only touches the local file; the Supabase side lives in db.py.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+INDEX_PATH = CACHE_DIR / "seen_urls.sqlite3"
+
+# How often the index is reconciled with the articles table
+SYNC_INTERVAL_SECONDS = int(os.getenv("SEEN_URLS_SYNC_SECONDS", str(24 * 3600)))
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    CACHE_DIR.mkdir(exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH, timeout=30)
+    if not _initialized:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                scraper_id INTEGER NOT NULL,
+                url        TEXT NOT NULL,
+                PRIMARY KEY (scraper_id, url)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS seen_urls_sync (
+                scraper_id    INTEGER PRIMARY KEY,
+                synced_until  TEXT,
+                synced_at     TEXT NOT NULL
+            );
+            """
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def get_urls(scraper_id):
+    """Return the set of every URL recorded for a scraper."""
+    with _lock:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT url FROM seen_urls WHERE scraper_id = ?",
+                (int(scraper_id),),
+            ).fetchall()
+        finally:
+            conn.close()
+    return {row[0] for row in rows}
+
+
+def add_urls(scraper_id, urls):
+    """Record URLs as stored for a scraper (already-known URLs are ignored)."""
+    urls = [u for u in urls if u]
+    if not urls:
+        return
+
+    with _lock:
+        conn = _connect()
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_urls (scraper_id, url) VALUES (?, ?)",
+                [(int(scraper_id), u) for u in urls],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def get_sync_state(scraper_id):
+    """
+    Return (synced_until, synced_at) for a scraper, or (None, None) if the
+    index has never been synced from the articles table.
+    """
+    with _lock:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT synced_until, synced_at FROM seen_urls_sync WHERE scraper_id = ?",
+                (int(scraper_id),),
+            ).fetchone()
+        finally:
+            conn.close()
+    return row if row else (None, None)
+
+
+def set_sync_state(scraper_id, synced_until):
+    """Store the newest articles.created_at pulled into the index."""
+    with _lock:
+        conn = _connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO seen_urls_sync (scraper_id, synced_until, synced_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (scraper_id) DO UPDATE SET
+                    synced_until = excluded.synced_until,
+                    synced_at = excluded.synced_at
+                """,
+                (int(scraper_id), synced_until, datetime.utcnow().isoformat()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def needs_sync(scraper_id):
+    """True if the scraper was never synced or its last sync is older than the interval."""
+    _, synced_at = get_sync_state(scraper_id)
+    if not synced_at:
+        return True
+    try:
+        last = datetime.fromisoformat(synced_at)
+    except ValueError:
+        return True
+    return datetime.utcnow() - last >= timedelta(seconds=SYNC_INTERVAL_SECONDS)
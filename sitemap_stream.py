@@ -0,0 +1,131 @@
+"""
+Streaming sitemap reader.
+
+ET.fromstring() holds the whole document, then every entry, in memory before
+anything is filtered. iter_sitemap() instead reads a byte stream with
+iterparse, yields one (loc, lastmod) per <url> and clears each element as it
+goes, so memory stays flat however large the sitemap is.
+
+    resp = http_client.get(SITEMAP_URL, headers=HEADERS, timeout=60, stream=True)
+    with resp:
+        for loc, lastmod in iter_sitemap(
+            response_stream(resp),
+            path_prefixes=("/newsroom/",),
+            since=saved_timestamp,
+            normalize_lastmod=parse_lastmod,
+        ):
+            ...
+
+Works with or without the sitemaps.org namespace. Sitemap indexes are read
+with iter_sitemap_index(), which yields child sitemap locs; iter_entries()
+handles documents that may be either.
+"""
+
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+
+def _local(tag):
+    """Strip the {namespace} part of an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def response_stream(resp):
+    """
+    Return a file-like object reading the (decompressed) body of a
+    streamed requests response (http_client.get(..., stream=True)).
+    """
+    resp.raw.decode_content = True
+    return resp.raw
+
+
+def _matches(loc, path_prefixes, path_contains):
+    if not path_prefixes and not path_contains:
+        return True
+    path = urlparse(loc).path
+    if path_prefixes and not path.startswith(tuple(path_prefixes)):
+        return False
+    if path_contains and path_contains not in path:
+        return False
+    return True
+
+
+def iter_entries(stream):
+    """
+    Yield (kind, loc, lastmod) for every <url> ("url") and <sitemap>
+    ("sitemap") entry in the stream, in document order. Use this when the
+    document may be either a urlset or a sitemap index.
+    """
+    root = None
+    loc = None
+    lastmod = None
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+
+        tag = _local(elem.tag)
+
+        # Only the first <loc> of an entry counts (image:loc etc. come later)
+        if tag == "loc" and loc is None:
+            loc = (elem.text or "").strip()
+        elif tag == "lastmod" and lastmod is None:
+            lastmod = (elem.text or "").strip()
+        elif tag in ("url", "sitemap"):
+            entry_loc, entry_lastmod = loc, lastmod
+            loc = lastmod = None
+            # Detach processed entries so the tree never grows
+            root.clear()
+            if entry_loc:
+                yield tag, entry_loc, entry_lastmod
+
+
+def iter_sitemap(
+    stream,
+    path_prefixes=None,
+    path_contains=None,
+    since=None,
+    newest_first=False,
+    normalize_lastmod=None,
+):
+    """
+    Yield (loc, lastmod) for each <url> entry in a sitemap byte stream.
+
+    path_prefixes      only yield URLs whose path starts with one of these
+    path_contains      only yield URLs whose path contains this substring
+    since              skip entries whose lastmod is <= this watermark
+    newest_first       the sitemap is ordered newest-first, so stop reading
+                       at the first entry at or below `since`
+    normalize_lastmod  callable applied to the raw lastmod text before
+                       comparing/yielding (e.g. a scraper's parse_lastmod);
+                       entries it maps to a falsy value are skipped
+
+    lastmod is None when the entry has no <lastmod> and no normalizer is given.
+    """
+    for kind, loc, lastmod in iter_entries(stream):
+        if kind != "url":
+            continue
+
+        if normalize_lastmod is not None:
+            lastmod = normalize_lastmod(lastmod or "")
+            if not lastmod:
+                continue
+
+        if since and lastmod and lastmod <= since:
+            if newest_first:
+                return
+            continue
+
+        if not _matches(loc, path_prefixes, path_contains):
+            continue
+
+        yield loc, lastmod
+
+
+def iter_sitemap_index(stream):
+    """Yield (loc, lastmod) for each <sitemap> entry in a sitemap index stream."""
+    for kind, loc, lastmod in iter_entries(stream):
+        if kind == "sitemap":
+            yield loc, lastmod
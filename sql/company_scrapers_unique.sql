@@ -0,0 +1,9 @@
+-- ----------------------------------------------------------
+-- Unique (company_id, scraper_id) on company_scrapers
+--
+-- db.flush_watermarks() writes a scraper's buffered timestamps with a
+-- single upsert on_conflict="company_id,scraper_id", which needs this
+-- index to exist.
+-- ----------------------------------------------------------
+create unique index if not exists company_scrapers_company_scraper_key
+    on public.company_scrapers (company_id, scraper_id);
@@ -0,0 +1,50 @@
+-- ----------------------------------------------------------
+-- insert_articles_batch(p_articles jsonb, p_now timestamptz)
+--
+-- Upserts a batch of articles and links them to their companies in a
+-- single round trip. Called from db.insert_articles via supabase.rpc().
+--
+-- p_articles is a JSON array of objects shaped like the rows built in
+-- db.insert_articles:
+--   {company_id, scraper_id, url, date, title, text,
+--    categories, tags, lastmod}
+--
+-- Returns the number of company_articles rows inserted.
+-- ----------------------------------------------------------
+create or replace function public.insert_articles_batch(
+    p_articles jsonb,
+    p_now timestamptz default now()
+)
+returns integer
+language plpgsql
+as $$
+declare
+    inserted_links integer;
+begin
+    -- Global dedupe by URL — existing articles are left untouched
+    insert into public.articles (
+        scraper_id, url, date, title, text,
+        categories, tags, lastmod, created_at, updated_at
+    )
+    select distinct on (a.url)
+        a.scraper_id, a.url, a.date, a.title, a.text,
+        a.categories, a.tags, a.lastmod, p_now, p_now
+    from jsonb_populate_recordset(null::public.articles, p_articles) as a
+    where a.url is not null
+    on conflict (url) do nothing;
+
+    -- Link every article (new or pre-existing) to its company
+    insert into public.company_articles (
+        company_id, article_id, scraper_id, discovered_at, status
+    )
+    select distinct on (l.company_id, art.id)
+        l.company_id, art.id, l.scraper_id, p_now, 'queued'
+    from jsonb_array_elements(p_articles) as e(item)
+    cross join lateral jsonb_populate_record(null::public.company_articles, e.item) as l
+    join public.articles as art on art.url = e.item ->> 'url'
+    on conflict (company_id, article_id) do nothing;
+
+    get diagnostics inserted_links = row_count;
+    return inserted_links;
+end;
+$$;
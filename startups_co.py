@@ -5,6 +5,9 @@ import os
 import time
 from datetime import datetime
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles
+import http_cache
+import http_client
+import html_parse
 
 MAIN_SITEMAP = "https://startups.co.uk/sitemap_index.xml"
 SOURCE_NAME = "STARTUPS_CO"
@@ -21,8 +24,7 @@ def scrape_article(url):
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = http_client.get(url, headers=headers, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
@@ -33,7 +35,7 @@ def scrape_article(url):
                 print(f"❌ Failed to fetch {url} after {max_retries} attempts")
                 return None
     
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.soup(resp.text)
 
     # Get the article tag
     article_tag = soup.select_one("article")
@@ -93,8 +95,7 @@ def get_latest_post_sitemap():
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(MAIN_SITEMAP, headers=headers, timeout=30)
+            resp = http_client.get(MAIN_SITEMAP, headers=headers, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
@@ -135,12 +136,15 @@ def get_latest_post_sitemap():
 # ----------------------------------------------------------
 # Read article URLs + lastmod timestamps
 # ----------------------------------------------------------
-def get_articles_from_sitemap(sitemap_url):
+def get_articles_from_sitemap(sitemap_url, extra_headers=None):
+    """
+    Return (articles, response). articles is None when the server answered
+    a conditional request with 304 Not Modified.
+    """
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(sitemap_url, headers=headers, timeout=30)
+            resp = http_client.get(sitemap_url, headers={**headers, **(extra_headers or {})}, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
@@ -149,6 +153,9 @@ def get_articles_from_sitemap(sitemap_url):
                 time.sleep(2)
             else:
                 raise Exception(f"Failed to fetch sitemap URL after {max_retries} attempts: {str(e)}")
+
+    if http_cache.is_not_modified(resp):
+        return None, resp
     
     soup = BeautifulSoup(resp.text, "xml")
 
@@ -158,7 +165,7 @@ def get_articles_from_sitemap(sitemap_url):
         lastmod = url_tag.find("lastmod").text
         articles.append({"url": loc, "lastmod": lastmod})
 
-    return articles
+    return articles, resp
 
 
 # ----------------------------------------------------------
@@ -171,7 +178,13 @@ def main():
     latest_sitemap = get_latest_post_sitemap()
     print("Using sitemap:", latest_sitemap)
 
-    article_entries = get_articles_from_sitemap(latest_sitemap)
+    # Conditional fetch once a timestamp exists — a 304 means no new posts
+    cache_headers = http_cache.validator_headers(SCRAPER_ID, latest_sitemap) if saved_timestamp else {}
+    article_entries, sitemap_resp = get_articles_from_sitemap(latest_sitemap, cache_headers)
+    if article_entries is None:
+        print("⛔ Sitemap unchanged since last run — no new articles.")
+        return
+
     article_entries.sort(key=lambda x: x["lastmod"], reverse=True)
 
     newest_timestamp = article_entries[0]["lastmod"]
@@ -184,6 +197,7 @@ def main():
         print("Saving latest timestamp:", newest_timestamp)
 
         update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
+        http_cache.save_validators(SCRAPER_ID, latest_sitemap, sitemap_resp)
         return
 
     # ----------------------------
@@ -195,6 +209,7 @@ def main():
 
     if not new_articles:
         print("⛔ No new articles found.")
+        http_cache.save_validators(SCRAPER_ID, latest_sitemap, sitemap_resp)
         return
 
     print(f"🆕 Found {len(new_articles)} new articles.")
@@ -209,11 +224,12 @@ def main():
 
     # Insert articles into database
     if scraped_articles:
-        inserted_count = insert_articles(scraped_articles)
+        inserted_count = insert_articles(scraped_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted_count} articles into database")
 
     # Update timestamp
     update_latest_timestamp(SCRAPER_ID, COMPANY_ID, newest_timestamp)
+    http_cache.save_validators(SCRAPER_ID, latest_sitemap, sitemap_resp)
     print("🕒 New latest timestamp saved:", newest_timestamp)
 
 
@@ -7,6 +7,8 @@ from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+from wordpress import clean_html_content
 
 load_dotenv()
 
@@ -36,21 +38,11 @@ def parse_pubdate(date_str):
         return None
 
 
-def clean_html_content(html_content):
-    """Convert HTML content to clean text."""
-    soup = BeautifulSoup(html_content, "html.parser")
-    for tag in soup.select("script, style, iframe"):
-        tag.decompose()
-    text = soup.get_text(" ", strip=True)
-    return " ".join(text.split())
-
-
 def fetch_feed(max_retries=3):
     """Fetch the Tech.eu RSS feed XML."""
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(FEED_URL, headers=HEADERS, timeout=30)
+            resp = http_client.get(FEED_URL, headers=HEADERS, timeout=30)
             resp.raise_for_status()
             return resp.text
         except requests.RequestException as e:
@@ -155,7 +147,7 @@ def main():
         print(f"🆕 Found {len(new_articles)} new articles.")
 
         company_articles = [dict(a, company_id=company_id) for a in new_articles]
-        inserted_count = insert_articles(company_articles)
+        inserted_count = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted_count} articles for {label}")
 
         update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
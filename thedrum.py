@@ -3,10 +3,11 @@ import os
 import time
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles
+from db import get_known_article_urls, insert_articles
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -29,8 +30,7 @@ HEADERS = {
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(1)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
             return resp.text
         except requests.RequestException as e:
@@ -48,7 +48,7 @@ def get_listing_urls():
     if not html:
         return []
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     for script in soup.find_all("script", type="application/ld+json"):
         try:
             data = json.loads(script.string or "")
@@ -77,7 +77,7 @@ def scrape_article(url):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     for script in soup.find_all("script", type="application/ld+json"):
         try:
             data = json.loads(script.string or "")
@@ -116,7 +116,7 @@ def url_slug(url):
 def main():
     print("🔍 Fetching The Drum latest page...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
@@ -167,7 +167,7 @@ def main():
         return
 
     print(f"\n🆕 Found {len(articles)} new article(s) in total.")
-    inserted_count = insert_articles(articles)
+    inserted_count = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted_count} articles into database")
 
 
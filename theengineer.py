@@ -1,13 +1,12 @@
 import os
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import adaptive_fetch
+import html_parse
 
 load_dotenv()
 
@@ -23,57 +22,18 @@ COMPANY_CONFIGS = [
     },
 ]
 
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 SCRAPPEY_PROXY_COUNTRY = "UnitedKingdom"
 
-MAX_RETRIES = 3
 MAX_WORKERS = 5
 
 
-def fetch_with_scrappey(url, max_retries=MAX_RETRIES):
-    scrappey_api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not scrappey_api_key:
-        raise RuntimeError("Please set SCRAPPEY_API_KEY in your environment")
-
-    payload = {
-        "cmd": "request.get",
-        #"requestType": "request",
-        "url": url,
-        "proxyCountry": SCRAPPEY_PROXY_COUNTRY,
-        "premiumProxy": True,
-    }
-
-    for attempt in range(max_retries):
-        try:
-            time.sleep(2)
-            response = requests.post(
-                f"{SCRAPPEY_API_URL}?key={scrappey_api_key}",
-                json=payload,
-                timeout=90,
-            )
-            response.raise_for_status()
-
-            scrappey_response = response.json()
-            solution = scrappey_response.get("solution", {})
-            status_code = solution.get("statusCode")
-
-            if status_code and status_code != 200:
-                print(f"❌ Scrappey returned status {status_code} for {url}")
-                return None
-
-            if scrappey_response.get("data") == "error" or not solution.get("verified", False):
-                error_message = scrappey_response.get("error", "Unknown Scrappey error")
-                raise RuntimeError(error_message)
-
-            return solution.get("response") or ""
-
-        except (requests.RequestException, RuntimeError) as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️  Retry {attempt + 1}/{max_retries} for {url}: {str(e)}")
-                time.sleep(2)
-            else:
-                print(f"❌ Failed after {max_retries} attempts for {url}: {str(e)}")
-                return None
+def fetch_html(url, marker):
+    """Fetch a page from the cheapest tier that gets through (Scrappey only when blocked)."""
+    return adaptive_fetch.fetch(
+        url,
+        accept=lambda html: marker in html,
+        scrappey_options={"proxyCountry": SCRAPPEY_PROXY_COUNTRY},
+    )
 
 
 def url_slug(url):
@@ -84,7 +44,7 @@ def parse_listing_html(html):
     """Extract article links, titles, and dates from the news listing page."""
     from urllib.parse import urljoin
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
     items = []
     seen_urls = set()
 
@@ -113,7 +73,7 @@ def parse_listing_html(html):
 
 def scrape_article_text(html):
     """Extract article body text from article page HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.parse(html)
 
     article_body = soup.select_one("div.articleBody")
     if not article_body:
@@ -140,7 +100,7 @@ def scrape_article_text(html):
 def scrape_article(url, fallback_title="", fallback_date=""):
     """Fetch an article page and extract only the body text.
     Title and date come from the listing page."""
-    html = fetch_with_scrappey(url)
+    html = fetch_html(url, "articleBody")
     if not html:
         return None
 
@@ -175,11 +135,11 @@ def scrape_article(url, fallback_title="", fallback_date=""):
 def main():
     print("🔍 Fetching The Engineer news listing...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=200)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs loaded from DB.")
     seen_slugs = {url_slug(u) for u in known_urls}
 
-    html = fetch_with_scrappey(LISTING_URL)
+    html = fetch_html(LISTING_URL, "schema.org/Article")
     if not html:
         print("⛔ Failed to fetch listing page.")
         return
@@ -249,7 +209,7 @@ def main():
             continue
 
         company_articles = [dict(a, company_id=company_id) for a in all_articles]
-        inserted_count = insert_articles(company_articles)
+        inserted_count = insert_articles(company_articles, dedupe_near=True)
         print(f"✅ Inserted {inserted_count} articles for {label}")
 
 
@@ -1,12 +1,13 @@
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import adaptive_fetch
+import html_parse
 
 load_dotenv()
 
@@ -23,69 +24,32 @@ COMPANY_CONFIGS = [
         "company_id": os.getenv("1492_SEARCH_COMPANY_ID"),
     },
 ]
-SCRAPPEY_API_URL = "https://publisher.scrappey.com/api/v1"
 SCRAPPEY_PROXY_COUNTRY = "UnitedKingdom"
+MAX_WORKERS = 5
 
 
 # ----------------------------------------------------------
-# Fetch a URL through Scrappey with retry logic
+# Fetch a URL from the cheapest tier that gets through
+# (Scrappey only when the site is actually blocking)
 # ----------------------------------------------------------
-def fetch_with_scrappey(url, max_retries=3):
-    scrappey_api_key = os.getenv("SCRAPPEY_API_KEY")
-    if not scrappey_api_key:
-        raise RuntimeError("Please set SCRAPPEY_API_KEY in your environment")
-
-    payload = {
-        "cmd": "request.get",
-        "requestType": "request",
-        "url": url,
-        "proxyCountry": SCRAPPEY_PROXY_COUNTRY,
-        "premiumProxy": True,
-    }
-
-    for attempt in range(max_retries):
-        try:
-            time.sleep(2)
-            response = requests.post(
-                f"{SCRAPPEY_API_URL}?key={scrappey_api_key}",
-                json=payload,
-                timeout=90,
-            )
-            response.raise_for_status()
-
-            scrappey_response = response.json()
-            solution = scrappey_response.get("solution", {})
-            status_code = solution.get("statusCode")
-
-            if status_code and status_code != 200:
-                print(f"❌ Scrappey returned status {status_code} for {url}")
-                return None
-
-            if scrappey_response.get("data") == "error" or not solution.get("verified", False):
-                error_message = scrappey_response.get("error", "Unknown Scrappey error")
-                raise RuntimeError(error_message)
-
-            return solution.get("response") or ""
-
-        except (requests.RequestException, RuntimeError) as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️  Retry {attempt + 1}/{max_retries}: {str(e)}")
-                time.sleep(2)
-            else:
-                print(f"❌ Failed after {max_retries} attempts: {str(e)}")
-                return None
+def fetch_html(url, marker):
+    return adaptive_fetch.fetch(
+        url,
+        accept=lambda html: marker in html,
+        scrappey_options={"requestType": "request", "proxyCountry": SCRAPPEY_PROXY_COUNTRY},
+    )
 
 
 # ----------------------------------------------------------
 # Scrape a single article
 # ----------------------------------------------------------
 def scrape_article(url):
-    html = fetch_with_scrappey(url)
+    html = fetch_html(url, "post-content")
     if not html:
         print(f"❌ Failed to fetch {url}")
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.parse(html)
 
     # -----------------------------
     # TITLE
@@ -122,7 +86,7 @@ def scrape_article(url):
     if not content_div:
         return None
 
-    paragraphs = [p.get_text(" ", strip=True) for p in content_div.find_all("p") if p.get_text(strip=True)]
+    paragraphs = [p.get_text(" ", strip=True) for p in content_div.select("p") if p.get_text(strip=True)]
     text = "\n\n".join(paragraphs)
 
     return {
@@ -140,9 +104,9 @@ def scrape_article(url):
 # Get the latest "articles-sitemap" from the main sitemap
 # ----------------------------------------------------------
 def get_latest_articles_sitemap():
-    html = fetch_with_scrappey(MAIN_SITEMAP)
+    html = fetch_html(MAIN_SITEMAP, "<loc>")
     if not html:
-        raise Exception("Failed to fetch main sitemap via Scrappey.")
+        raise Exception("Failed to fetch main sitemap.")
     soup = BeautifulSoup(html, "xml")
     links = []
     for sitemap in soup.find_all("sitemap"):
@@ -171,9 +135,9 @@ def get_latest_articles_sitemap():
 # Read article URLs + lastmod timestamps from a sitemap
 # ----------------------------------------------------------
 def get_articles_from_sitemap(sitemap_url):
-    html = fetch_with_scrappey(sitemap_url)
+    html = fetch_html(sitemap_url, "<loc>")
     if not html:
-        raise Exception(f"Failed to fetch sitemap via Scrappey: {sitemap_url}")
+        raise Exception(f"Failed to fetch sitemap: {sitemap_url}")
     soup = BeautifulSoup(html, "xml")
 
     articles = []
@@ -222,9 +186,15 @@ def main():
     if urls_to_scrape:
         entries_to_scrape = [e for e in article_entries if e["url"] in urls_to_scrape]
         print(f"🔎 Scraping {len(entries_to_scrape)} unique article(s)...")
-        for entry in entries_to_scrape:
+
+        def scrape_one(entry):
             print("Scraping:", entry["url"])
-            result = scrape_article(entry["url"])
+            return scrape_article(entry["url"])
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = list(executor.map(scrape_one, entries_to_scrape))
+
+        for entry, result in zip(entries_to_scrape, results):
             if result:
                 result["lastmod"] = entry["lastmod"]
                 scraped_cache[entry["url"]] = result
@@ -268,7 +238,7 @@ def main():
                 company_articles.append(article)
 
         if company_articles:
-            inserted_count = insert_articles(company_articles)
+            inserted_count = insert_articles(company_articles, dedupe_near=True)
             print(f"✅ Inserted {inserted_count} articles for {label}")
 
         update_latest_timestamp(SCRAPER_ID, company_id, newest_timestamp)
@@ -5,6 +5,8 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 from dotenv import load_dotenv
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 load_dotenv()
 
@@ -30,8 +32,7 @@ HEADERS = {
 def fetch_url(url, max_retries=3):
     for attempt in range(max_retries):
         try:
-            time.sleep(2)
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http_client.get(url, headers=HEADERS, timeout=30)
             resp.raise_for_status()
             return resp.text
         except requests.RequestException as e:
@@ -76,7 +77,7 @@ def scrape_article(url):
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = html_parse.soup(html)
 
     content_div = soup.select_one("section.container div.aimUCISA")
     if not content_div:
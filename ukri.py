@@ -3,6 +3,8 @@ import requests
 from bs4 import BeautifulSoup
 import time
 from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import html_parse
 
 MAIN_SITEMAP = "https://www.ukri.org/sitemap.xml"
 SOURCE_NAME = "UKRI"
@@ -29,8 +31,7 @@ def scrape_article(url):
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = http_client.get(url, headers=headers, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
@@ -41,7 +42,7 @@ def scrape_article(url):
                 print(f"❌ Failed to fetch {url} after {max_retries} attempts")
                 return None
     
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.soup(resp.text)
 
     # Extract title from h1
     title_tag = soup.select_one("h1.main-area__page-title")
@@ -98,8 +99,7 @@ def get_latest_news_sitemap():
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(MAIN_SITEMAP, headers=headers, timeout=30)
+            resp = http_client.get(MAIN_SITEMAP, headers=headers, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
@@ -142,8 +142,7 @@ def get_articles_from_sitemap(sitemap_url):
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            time.sleep(2)  # Sleep 2 seconds before request
-            resp = requests.get(sitemap_url, headers=headers, timeout=30)
+            resp = http_client.get(sitemap_url, headers=headers, timeout=30)
             resp.raise_for_status()
             break
         except requests.RequestException as e:
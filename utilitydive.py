@@ -1,16 +1,14 @@
 import os
 import re
-import time
-import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import requests
-from bs4 import BeautifulSoup
-from curl_cffi import requests as cffi_requests
 from dotenv import load_dotenv
 
-from db import get_recent_article_urls, insert_articles, is_subscription_active
+from db import get_known_article_urls, insert_articles, is_subscription_active
+import http_client
+import html_parse
+from sitemap_stream import iter_sitemap, iter_sitemap_index, response_stream
 
 load_dotenv()
 
@@ -32,8 +30,6 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-
 # Matches archive sitemaps like /news/archive/2026/may.xml
 ARCHIVE_RE = re.compile(r"/news/archive/(\d{4})/(\w+)\.xml$")
 
@@ -44,11 +40,12 @@ MONTH_ORDER = {
 }
 
 
-def fetch_xml(url: str) -> ET.Element | None:
+def fetch_xml(url: str):
+    """Open a streamed response for an XML document (caller closes it)."""
     try:
-        resp = requests.get(url, headers=HEADERS, proxies=PROXIES, timeout=30)
+        resp = http_client.get(url, headers=HEADERS, proxies=PROXIES, timeout=30, stream=True)
         resp.raise_for_status()
-        return ET.fromstring(resp.content)
+        return resp
     except Exception as e:
         print(f"  ❌ Failed to fetch XML {url}: {e}")
         return None
@@ -57,20 +54,20 @@ def fetch_xml(url: str) -> ET.Element | None:
 def get_latest_archive_sitemap() -> str | None:
     """Fetch sitemap index and return the URL of the most recent monthly archive."""
     print(f"  📡 Fetching sitemap index: {SITEMAP_INDEX}")
-    root = fetch_xml(SITEMAP_INDEX)
-    if root is None:
+    resp = fetch_xml(SITEMAP_INDEX)
+    if resp is None:
         return None
 
     # Collect all archive sitemap locs
-    archive_locs = []
-    for loc_el in root.findall(".//sm:loc", NS):
-        if loc_el.text and ARCHIVE_RE.search(loc_el.text):
-            archive_locs.append(loc_el.text.strip())
-    # Also try without namespace
-    if not archive_locs:
-        for loc_el in root.findall(".//loc"):
-            if loc_el.text and ARCHIVE_RE.search(loc_el.text):
-                archive_locs.append(loc_el.text.strip())
+    try:
+        with resp:
+            archive_locs = [
+                loc for loc, _ in iter_sitemap_index(response_stream(resp))
+                if ARCHIVE_RE.search(loc)
+            ]
+    except Exception as e:
+        print(f"  ❌ Failed to parse sitemap index: {e}")
+        return None
 
     if not archive_locs:
         print("  ❌ No archive sitemaps found in index.")
@@ -90,43 +87,24 @@ def get_latest_archive_sitemap() -> str | None:
 
 
 def parse_archive_sitemap(sitemap_url: str) -> list[dict]:
-    """Parse a monthly archive sitemap and return [{url, date}]."""
-    root = fetch_xml(sitemap_url)
-    if root is None:
+    """Stream-parse a monthly archive sitemap and return [{url, date}]."""
+    resp = fetch_xml(sitemap_url)
+    if resp is None:
         return []
 
     items = []
-    for url_el in root.findall(".//sm:url", NS):
-        loc_el = url_el.find("sm:loc", NS)
-        lastmod_el = url_el.find("sm:lastmod", NS)
-        if loc_el is None or not loc_el.text:
-            continue
-        loc = loc_el.text.strip()
-        # Only /news/ articles
-        if "/news/" not in loc:
-            continue
-        date = ""
-        if lastmod_el is not None and lastmod_el.text:
-            raw = lastmod_el.text.strip()
-            # lastmod is like "2026-05-15"
-            date = raw if "T" in raw else raw + "T00:00:00"
-        items.append({"url": loc, "date": date})
-
-    # Fallback: no namespace
-    if not items:
-        for url_el in root.findall(".//url"):
-            loc_el = url_el.find("loc")
-            lastmod_el = url_el.find("lastmod")
-            if loc_el is None or not loc_el.text:
-                continue
-            loc = loc_el.text.strip()
-            if "/news/" not in loc:
-                continue
-            date = ""
-            if lastmod_el is not None and lastmod_el.text:
-                raw = lastmod_el.text.strip()
-                date = raw if "T" in raw else raw + "T00:00:00"
-            items.append({"url": loc, "date": date})
+    try:
+        with resp:
+            # Only /news/ articles
+            for loc, raw in iter_sitemap(response_stream(resp), path_contains="/news/"):
+                date = ""
+                if raw:
+                    # lastmod is like "2026-05-15"
+                    date = raw if "T" in raw else raw + "T00:00:00"
+                items.append({"url": loc, "date": date})
+    except Exception as e:
+        print(f"  ❌ Failed to parse archive sitemap {sitemap_url}: {e}")
+        return []
 
     print(f"  📰 {len(items)} article(s) found in archive sitemap.")
     return items
@@ -135,8 +113,7 @@ def parse_archive_sitemap(sitemap_url: str) -> list[dict]:
 def scrape_article(url: str, date: str) -> dict | None:
     """Scrape a Utility Dive article page."""
     try:
-        time.sleep(1)
-        resp = cffi_requests.get(
+        resp = http_client.cffi_get(
             url,
             impersonate="chrome131",
             proxies=PROXIES,
@@ -147,7 +124,7 @@ def scrape_article(url: str, date: str) -> dict | None:
         print(f"  ❌ Failed to fetch article {url}: {e}")
         return None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = html_parse.parse(resp.text)
 
     # Title
     title_el = soup.select_one("h1.display-heading-04")
@@ -197,7 +174,7 @@ def main():
 
     print("🔍 Scraping Utility Dive...")
 
-    known_urls = get_recent_article_urls(SCRAPER_ID, limit=500)
+    known_urls = get_known_article_urls(SCRAPER_ID)
     print(f"🗄️  {len(known_urls)} known URLs in DB.")
 
     archive_url = get_latest_archive_sitemap()
@@ -237,7 +214,7 @@ def main():
         print("⛔ No articles scraped successfully.")
         return
 
-    inserted = insert_articles(articles)
+    inserted = insert_articles(articles, dedupe_near=True)
     print(f"✅ Inserted {inserted} articles into database.")
 
 
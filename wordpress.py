@@ -0,0 +1,352 @@
+"""
+Shared WordPress REST API engine.
+
+Most news sources are WordPress sites. Each scraper used to carry its own
+copy of the /wp-json/wp/v2/posts pagination loop and clean_html_content();
+a scraper now only describes its source and hands it to run():
+
+    SOURCE = {
+        "name": "ADS Group",                 # used in log lines
+        "api_url": API_URL,
+        "scraper_id": SCRAPER_ID,
+        "company_configs": COMPANY_CONFIGS,  # or "company_id": COMPANY_ID
+        "fetch": "scrappey",                 # see FETCHERS, or callable(url) -> posts
+        "max_pages": 1,
+    }
+
+    def main():
+        wordpress.run(SOURCE)
+
+Optional keys: "params" (extra query params, e.g. {"categories": 1282}),
+"headers" (direct fetch), "proxy_country" / "request_type" (Scrappey),
+"page_workers" (concurrent page fetches).
+
+Requests ask only for the fields that are stored (_fields=...) and, once a
+watermark exists, only for posts published after it (after=...), so a
+normal run is a single small page. When more pages are needed they are
+fetched concurrently, never past max_pages.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from db import get_latest_timestamp, update_latest_timestamp, insert_articles, is_subscription_active
+import http_client
+import scrappey_client
+import html_parse
+
+# Only what ends up in the articles table
+POST_FIELDS = "link,date_gmt,modified_gmt,title,content"
+PER_PAGE = 100
+DEFAULT_MAX_PAGES = 2
+PAGE_WORKERS = 4
+
+# `after` is compared against the site's local post date, not date_gmt, so
+# it is sent a day early; the exact cut is done on date_gmt afterwards
+AFTER_MARGIN = timedelta(days=1)
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+# ----------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------
+def clean_html_content(html_content):
+    """Convert HTML content to clean text"""
+    soup = html_parse.soup(html_content or "")
+
+    # Remove unwanted elements
+    for tag in soup.select("script, style, iframe"):
+        tag.decompose()
+
+    # Get text and clean up whitespace
+    text = soup.get_text(" ", strip=True)
+    return " ".join(text.split())
+
+
+def _after_param(watermark):
+    """Return the `after` query value for a saved date_gmt watermark."""
+    try:
+        dt = datetime.fromisoformat(watermark.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    dt = dt.replace(tzinfo=None) - AFTER_MARGIN
+    return dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def build_posts_url(source, page, after=None, per_page=PER_PAGE, fields=POST_FIELDS):
+    """Build the posts endpoint URL for one page."""
+    params = {
+        "per_page": per_page,
+        "page": page,
+        "orderby": "date",
+        "order": "desc",
+        "_fields": fields,
+        **source.get("params", {}),
+    }
+    if after:
+        params["after"] = after
+    return f"{source['api_url']}?{urlencode(params)}"
+
+
+def parse_posts_payload(text):
+    """Parse a posts JSON body, unwrapping the <pre> a browser renders it in."""
+    text = (text or "").strip()
+    if text.startswith("<"):
+        pre_tag = html_parse.soup(text).find("pre")
+        if pre_tag:
+            text = pre_tag.get_text(strip=True)
+    return json.loads(text)
+
+
+# ----------------------------------------------------------
+# Fetchers — each returns (posts or None, total_pages or None)
+# ----------------------------------------------------------
+def fetch_direct(url, headers=None, max_retries=3):
+    """Fetch a posts page straight from the site."""
+    for attempt in range(max_retries):
+        try:
+            resp = http_client.get(url, headers=headers or DEFAULT_HEADERS, timeout=30)
+
+            if resp.status_code == 400:
+                return None, None  # No more pages
+
+            resp.raise_for_status()
+            total_pages = resp.headers.get("X-WP-TotalPages", "")
+            return resp.json(), int(total_pages) if total_pages.isdigit() else None
+
+        except Exception as e:
+            if attempt < max_retries - 1:
+                print(f"⚠️  Retry {attempt + 1}/{max_retries}: {str(e)}")
+                time.sleep(2)
+            else:
+                print(f"❌ Failed after {max_retries} attempts: {str(e)}")
+                return None, None
+
+
+def fetch_scrappey(url, proxy_country="UnitedKingdom", request_type=None, browser=False, max_retries=3):
+    """
+    Fetch a posts page through Scrappey request.get. browser=True waits for
+    the page to settle and requires a verified solution (anti-bot sites).
+    """
+    if not os.getenv("SCRAPPEY_API_KEY"):
+        raise RuntimeError("SCRAPPEY_API_KEY not set")
+
+    payload = {
+        "cmd": "request.get",
+        "url": url,
+        "premiumProxy": True,
+        "proxyCountry": proxy_country,
+        "retries": 1,
+    }
+    if request_type:
+        payload["requestType"] = request_type
+    if browser:
+        payload["browserActions"] = [
+            {"type": "wait_for_load_state", "waitForLoadState": "networkidle"},
+            {"type": "wait", "wait": 1500, "when": "after_captcha"},
+        ]
+    else:
+        payload["automaticallySolveCaptcha"] = True
+
+    for attempt in range(max_retries):
+        try:
+            resp, data = scrappey_client.request_response(payload, timeout=90 if browser else 60)
+            if resp.status_code == 400:
+                return None, None  # No more pages
+            resp.raise_for_status()
+
+            solution = data.get("solution", {})
+            if solution.get("statusCode") == 400:
+                return None, None  # No more pages
+
+            if browser and (data.get("data") == "error" or not solution.get("verified", False)):
+                raise RuntimeError(data.get("error", "Unknown Scrappey error"))
+
+            body = solution.get("innerText") or solution.get("response") or ""
+            if not body.strip():
+                raise RuntimeError("Empty Scrappey response")
+            return parse_posts_payload(body), None
+
+        except Exception as e:
+            if attempt < max_retries - 1:
+                print(f"⚠️  Retry {attempt + 1}/{max_retries}: {str(e)}")
+                scrappey_client.backoff(attempt)
+            else:
+                print(f"❌ Failed after {max_retries} attempts: {str(e)}")
+                return None, None
+
+
+FETCHERS = {
+    "direct": lambda source, url: fetch_direct(url, source.get("headers")),
+    "scrappey": lambda source, url: fetch_scrappey(
+        url, source.get("proxy_country", "UnitedKingdom"), source.get("request_type")
+    ),
+    "scrappey_browser": lambda source, url: fetch_scrappey(
+        url, source.get("proxy_country", "UnitedKingdom"), source.get("request_type"), browser=True
+    ),
+}
+
+
+def _fetch_page(source, url):
+    fetch = source.get("fetch", "direct")
+    if callable(fetch):
+        return fetch(url), None
+    return FETCHERS[fetch](source, url)
+
+
+# ----------------------------------------------------------
+# Posts
+# ----------------------------------------------------------
+def fetch_posts(source, after=None):
+    """
+    Return posts newest first. Page 1 is fetched alone; if more are needed
+    (X-WP-TotalPages, or a full page when the header is unavailable) the
+    rest up to max_pages are fetched concurrently.
+    """
+    max_pages = source.get("max_pages", DEFAULT_MAX_PAGES)
+
+    print("📄 Fetching page 1...")
+    posts, total_pages = _fetch_page(source, build_posts_url(source, 1, after))
+    if not posts:
+        print("⛔ No articles found on page 1.")
+        return []
+
+    if total_pages is not None:
+        last_page = min(total_pages, max_pages)
+    else:
+        last_page = max_pages if len(posts) >= PER_PAGE else 1
+
+    pages = [posts]
+    if last_page > 1:
+        print(f"📄 Fetching pages 2-{last_page}...")
+        workers = max(1, min(source.get("page_workers", PAGE_WORKERS), last_page - 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda page: _fetch_page(source, build_posts_url(source, page, after))[0],
+                range(2, last_page + 1),
+            ))
+        for page_posts in results:
+            if not page_posts:
+                break
+            pages.append(page_posts)
+
+    seen = set()
+    all_posts = []
+    for page_posts in pages:
+        for post in page_posts:
+            if post.get("link") in seen:
+                continue
+            seen.add(post.get("link"))
+            all_posts.append(post)
+
+    all_posts.sort(key=lambda p: p.get("date_gmt") or "", reverse=True)
+    return all_posts
+
+
+def fetch_newest_timestamp(source):
+    """Return date_gmt of the newest post (one-post request, for first runs)."""
+    posts, _ = _fetch_page(source, build_posts_url(source, 1, per_page=1, fields="date_gmt"))
+    return posts[0]["date_gmt"] if posts else None
+
+
+def posts_to_articles(posts, scraper_id):
+    """Convert REST posts into article dicts (without company_id)."""
+    articles = []
+    for post in posts:
+        timestamp = post["date_gmt"]
+        title = post["title"]["rendered"]
+        articles.append({
+            "url": post["link"],
+            "date": timestamp,
+            "title": title,
+            "text": clean_html_content(post["content"]["rendered"]),
+            "lastmod": post.get("modified_gmt") or timestamp,
+            "scraper_id": scraper_id,
+        })
+        print(f"Fetched: {title[:60]}...")
+    return articles
+
+
+# ----------------------------------------------------------
+# Run
+# ----------------------------------------------------------
+def _company_targets(source):
+    if "company_configs" in source:
+        return [(c["label"], c["company_id"]) for c in source["company_configs"]]
+    return [(source["name"], source["company_id"])]
+
+
+def run(source):
+    """Fetch new posts once and save them for every subscribed company."""
+    scraper_id = source["scraper_id"]
+    multi_company = "company_configs" in source
+
+    targets = []
+    for label, company_id in _company_targets(source):
+        if not is_subscription_active(scraper_id, company_id):
+            print(f"⏭️  Skipping {label} — subscription is inactive")
+            continue
+        targets.append((label, company_id, get_latest_timestamp(scraper_id, company_id)))
+
+    if not targets:
+        return
+
+    print(f"🔍 Fetching articles from {source['name']} API...")
+
+    # One fetch serves every company: everything after the oldest watermark
+    saved_timestamps = [ts for _, _, ts in targets if ts]
+    articles = []
+    newest_timestamp = None
+    if saved_timestamps:
+        watermark = min(saved_timestamps)
+        posts = [
+            p for p in fetch_posts(source, after=_after_param(watermark))
+            if (p.get("date_gmt") or "") > watermark
+        ]
+        if posts:
+            newest_timestamp = posts[0]["date_gmt"]
+        articles = posts_to_articles(posts, scraper_id)
+
+    if newest_timestamp is None and len(saved_timestamps) < len(targets):
+        newest_timestamp = fetch_newest_timestamp(source)
+
+    for label, company_id, saved_timestamp in targets:
+        if multi_company:
+            print(f"\n{'='*60}")
+            print(f"🏢 Processing: {label}")
+            print(f"{'='*60}")
+
+        # ----------------------------
+        # FIRST RUN — NO SCRAPING
+        # ----------------------------
+        if saved_timestamp is None:
+            print("🟢 First run detected — NOT saving any articles.")
+            if newest_timestamp:
+                print("Saving latest timestamp:", newest_timestamp)
+                update_latest_timestamp(scraper_id, company_id, newest_timestamp)
+            continue
+
+        # ----------------------------
+        # SUBSEQUENT RUNS — save new
+        # ----------------------------
+        print("Previously saved timestamp:", saved_timestamp)
+
+        new_articles = [a for a in articles if a["date"] > saved_timestamp]
+
+        if not new_articles:
+            print("⛔ No new articles found.")
+            continue
+
+        print(f"🆕 Found {len(new_articles)} new articles.")
+
+        company_articles = [dict(a, company_id=company_id) for a in new_articles]
+        inserted_count = insert_articles(company_articles, dedupe_near=True)
+        print(f"✅ Inserted {inserted_count} articles for {label}")
+
+        update_latest_timestamp(scraper_id, company_id, newest_timestamp)
+        print("🕒 New latest timestamp saved:", newest_timestamp)